@@ -1,9 +1,11 @@
 import os
-from flask import request, jsonify, current_app, redirect
+from flask import request, jsonify, current_app
 import logging
-from utils.helper import css_height_calc, data_caching, format_date, format_description, upload_pdf_to_supabase
-import json
-import hashlib
+from utils.helper import css_height_calc, format_date, format_description, preview_css, generate_response
+from utils.fragment_cache import cached_section
+from utils.html_builder import HtmlBuilder
+from utils.thumbnail_helper import thumbnail_response
+from utils.timing import span
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
@@ -13,67 +15,157 @@ max_attempts = 50 # maximum attempts in loop
 supabase_bucket_name = os.getenv("SUPABASE_BUCKET_NAME", "bucket_name")
 
 def generate_pdf():
+    return generate_response("andromeda")
+
+def fit_params(data):
+    """Buffer and increment for this template's height search"""
+    return 0, (len(data.get('experience', [])) / 5) * 50
+
+def build_fitted_resume(data):
+    """Generate the resume HTML and the CSS fitted to a single page"""
+    with span("html"):
+        html_content = generate_resume_html(data)
+    buffer, increment = fit_params(data)
+    final_css = css_height_calc(
+        html_content,
+        get_default_css,
+        data.get('personal', {}).get('email'),
+        'andromeda',
+        buffer,
+        max_attempts,
+        increment
+    )
+    return html_content, final_css
+
+def generate_preview():
+    """Return the resume HTML and CSS sized from the cached or predicted height, without rendering a PDF"""
     try:
         data = request.get_json()
         if not data:
             return jsonify({'error': 'No resume data provided'}), 400
 
-        name = data.get('personal', {}).get('name')
-        cached_pdf = data_caching(data, "andromeda")
-        if cached_pdf:
-            # If we have a cached URL, redirect to it
-            if cached_pdf.startswith("http"):
-                return redirect(cached_pdf)
-            # If we have a cached storage path, get the URL
-            else:
-                supabase = current_app.supabase
-                url_res = supabase.storage.from_(supabase_bucket_name).get_public_url(cached_pdf)
-                return redirect(url_res)
-
         html_content = generate_resume_html(data)
-        increment = (len(data.get('experience', [])) / 5) * 50
-        final_css = css_height_calc(
-            html_content,
-            get_default_css,
-            data.get('personal', {}).get('email'),
-            'andromeda',
-            0,
-            max_attempts,
-            increment
-        )
-
-        pdf_path = upload_pdf_to_supabase(name, "andromeda", html_content, final_css)
-
-        combined_data = {
-            "template": "andromeda",
-            "resume_data": data
-        }
-
-        redis_client = current_app.redis_client
-        data_str = json.dumps(combined_data, sort_keys=True)
-        data_hash = hashlib.sha256(data_str.encode()).hexdigest()
-
-        redis_client.set(f"{data['personal']['email']}_data_hash_andromeda", data_hash)
-        redis_client.set(f"{data['personal']['email']}_storage_path_andromeda", pdf_path)
-
-        supabase = current_app.supabase
-        url_res = supabase.storage.from_(supabase_bucket_name).get_public_url(pdf_path)
-        return redirect(url_res)
+        css, height = preview_css(get_default_css, data.get('personal', {}).get('email'), 'andromeda', 0, html_content)
+        return jsonify({'html': html_content, 'css': css, 'height': height})
+
+    except Exception as e:
+        current_app.logger.error(f"Preview generation error: {str(e)}")
+        return jsonify({'error': f'Failed to generate preview: {str(e)}'}), 500
+
+def generate_thumbnail():
+    """Return a compact WebP/PNG of the first page of the fitted resume, for the template picker"""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'No resume data provided'}), 400
+
+        return thumbnail_response(data, "andromeda", build_fitted_resume)
 
     except Exception as e:
-        current_app.logger.error(f"PDF generation error: {str(e)}")
-        return jsonify({'error': f'Failed to generate PDF: {str(e)}'}), 500
+        current_app.logger.error(f"Thumbnail generation error: {str(e)}")
+        return jsonify({'error': f'Failed to generate thumbnail: {str(e)}'}), 500
+
+def render_experience(resume_data):
+    """Work experience entries, inside the section opened by the caller"""
+    html = HtmlBuilder()
+    for job in resume_data.get('experience', []):
+        html.add(f'''
+                    <div class="item">
+                        <div class="item-header">
+                            <h3 class="item-title">{job.get('title', '')}</h3>
+                            <p class="item-subtitle">{job.get('company', '')}</p>
+                            <div class="item-date">{format_date(job.get('startDate', ''))} - {format_date(job.get('endDate', '')) if job.get('endDate') else 'Present'}</div>
+                        </div>
+                        <div class="item-description">
+                            <p>{format_description(job.get('description', ''))}</p>
+                        </div>
+                    </div>
+        ''')
+    return html
+
+def render_skills(resume_data):
+    """Skills section"""
+    html = HtmlBuilder()
+    if resume_data.get('skills'):
+        if len(resume_data['skills']):
+            html.add('''
+                <section class="section">
+                    <h2 class="section-title">Skills</h2>
+                    <div class="section-content">
+            ''')
+            for skill in resume_data.get('skills', []):
+                html.add(f'''
+                    <div class="skill-group">
+                        <h3 class="skill-group-title">{skill.get('name')}</h3>
+                        <div class="skill-keywords">
+                ''')
+                for keyword in skill.get('keywords', []):
+                    html.add(f'''
+                            <span class="keyword">{keyword}</span>
+                    ''')
+                html.add('''
+                        </div>
+                    </div>
+                ''')
+            html.add('''
+                    </div>
+                </section>
+            ''')
+    return html
+
+def render_projects(resume_data):
+    """Projects section"""
+    html = HtmlBuilder()
+    if resume_data.get('projects'):
+        html.add('''
+                <section class="section">
+                    <h2 class="section-title">Projects</h2>
+                    <div class="section-content">
+        ''')
+        
+        for project in resume_data.get('projects', []):
+            html.add(f'''
+                        <div class="item">
+                            <div class="item-header">
+                                <h3 class="item-title">{project.get('title', '')}</h3>
+                            </div>
+                            <div class="item-description">
+                                <p>{format_description(project.get('description', ''))}</p>
+                            </div>
+                            {f'<div class="project-technologies">' if project.get('technologies') else ''}
+            ''')
+            
+            for tech in project.get('technologies', []):
+                html.add(f'''
+                                <span class="technology">{tech}</span>
+                ''')
+                
+            if project.get('technologies'):
+                html.add('''
+                            </div>
+                ''')
+                
+            html.add('''
+                        </div>
+            ''')
+            
+        html.add('''
+                    </div>
+                </section>
+        ''')
+    return html
 
 def generate_resume_html(resume_data):
     """Generate HTML content from resume data based on Modern template"""
+    personal = resume_data.get('personal', {})
     # Modern template for a resume with two-column layout
-    html = f'''
+    html = HtmlBuilder(f'''
     <!DOCTYPE html>
     <html lang="en">
     <head>
         <meta charset="UTF-8">
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>{resume_data.get('personal', {}).get('name', 'Resume')}</title>
+        <title>{personal.get('name', 'Resume')}</title>
         <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.5.0/css/all.min.css"/><link rel="preconnect" href="https://fonts.googleapis.com">
         <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
         <link href="https://fonts.googleapis.com/css2?family=IBM+Plex+Serif:ital,wght@0,100;0,200;0,300;0,400;0,500;0,600;0,700;1,100;1,200;1,300;1,400;1,500;1,600;1,700&display=swap" rel="stylesheet">
@@ -82,24 +174,24 @@ def generate_resume_html(resume_data):
         <div class="resume-container">
             <!-- Header / Personal Info with blue gradient background -->
             <header class="header">
-                <h1 class="name">{resume_data.get('personal', {}).get('name', '')}</h1>
-                <h2 class="headline">{resume_data.get('personal', {}).get('headline', '')}</h2>
+                <h1 class="name">{personal.get('name', '')}</h1>
+                <h2 class="headline">{personal.get('headline', '')}</h2>
                 <div class="contact-info">
-                    {f'<p class="email">{resume_data.get("personal", {}).get("email", "")}</p>' if resume_data.get('personal', {}).get('email') else ''}
-                    {f'<p class="location">{resume_data.get("personal", {}).get("location", "")}</p>' if resume_data.get('personal', {}).get('location') else ''}
-                    {f'<p class="website"><a href="{resume_data.get("personal", {}).get("website", {}).get("link", "")}">{resume_data.get("personal", {}).get("website", {}).get("name", "") or resume_data.get("personal", {}).get("website", {}).get("link", "")}</a></p>' if resume_data.get('personal', {}).get('website', {}).get('link') else ''}
+                    {f'<p class="email">{personal.get("email", "")}</p>' if personal.get('email') else ''}
+                    {f'<p class="location">{personal.get("location", "")}</p>' if personal.get('location') else ''}
+                    {f'<p class="website"><a href="{personal.get("website", {}).get("link", "")}">{personal.get("website", {}).get("name", "") or personal.get("website", {}).get("link", "")}</a></p>' if personal.get('website', {}).get('link') else ''}
                 </div>
                 
                 <!-- Social Links -->
                 <div class="social-links">
-    '''
+    ''')
     for social in resume_data.get('socials', []):
-        html += f'''
+        html.add(f'''
             {f'<a href="{social.get("link")}"><i class="fab fa-{social.get("slug")} fa-xl"></i></a>' if social.get('link') else ''}
-        '''
+        ''')
 
 
-    html += f'''
+    html.add(f'''
                 </div>
             </header>
             <!-- Main Content with two-column layout -->
@@ -111,41 +203,29 @@ def generate_resume_html(resume_data):
                     
                     <!-- Work Experience -->
                     {f'<section class="section"><h2 class="section-title">Work Experience</h2><div class="section-content">' if resume_data.get('experience') else ''}
-    '''
+    ''')
     
     # Add work experience
-    for job in resume_data.get('experience', []):
-        html += f'''
-                    <div class="item">
-                        <div class="item-header">
-                            <h3 class="item-title">{job.get('title', '')}</h3>
-                            <p class="item-subtitle">{job.get('company', '')}</p>
-                            <div class="item-date">{format_date(job.get('startDate', ''))} - {format_date(job.get('endDate', '')) if job.get('endDate') else 'Present'}</div>
-                        </div>
-                        <div class="item-description">
-                            <p>{format_description(job.get('description', ''))}</p>
-                        </div>
-                    </div>
-        '''
+    html.add(cached_section('andromeda', 'experience', resume_data, render_experience))
     
     # Close experience section if it exists
     if resume_data.get('experience'):
-        html += '''
+        html.add('''
                     </div>
                 </section>
-        '''
+        ''')
     
     # Education
     if resume_data.get('experience') and len(resume_data['experience']) <= 4:
         if resume_data.get('education'):
-            html += '''
+            html.add('''
                     <section class="section">
                         <h2 class="section-title">Education</h2>
                         <div class="section-content">
-            '''
+            ''')
             
             for edu in resume_data.get('education', []):
-                html += f'''
+                html.add(f'''
                             <div class="item" style="margin-bottom:1.5rem;">
                                 <div class="item-header">
                                     <h3 class="item-title">{edu.get('degree', '')}</h3>
@@ -153,44 +233,44 @@ def generate_resume_html(resume_data):
                                     <div class="item-date">{format_date(edu.get('startDate', ''))} - {format_date(edu.get('endDate')) if edu.get('endDate') else 'Present'}</div>
                                 </div>
                             </div>
-                '''
+                ''')
                 
-            html += '''
+            html.add('''
                         </div>
                     </section>
-            '''
+            ''')
 
     # Languages
     if resume_data.get('experience') and len(resume_data['experience']) <= 2:
         if resume_data.get('languages'):
-            html += '''
+            html.add('''
                         <section class="section">
                             <h2 class="section-title">Languages</h2>
                             <div class="section-content">
                                 <div class="languages">
-            '''
+            ''')
             
             for language in resume_data.get('languages', []):
-                html += f'''
+                html.add(f'''
                                     <span class="language">{language}</span>
-                '''
+                ''')
                 
-            html += '''
+            html.add('''
                                 </div>
                             </div>
                         </section>
-            '''
+            ''')
     
         # Certifications
         if resume_data.get('certifications'):
-            html += '''
+            html.add('''
                         <section class="section">
                             <h2 class="section-title">Certifications</h2>
                             <div class="section-content">
-            '''
+            ''')
             
             for cert in resume_data.get('certifications', []):
-                html += f'''
+                html.add(f'''
                                 <div class="item">
                                     <div class="item-header">
                                         <h3 class="item-title">{cert.get('name', '')}</h3>
@@ -198,52 +278,52 @@ def generate_resume_html(resume_data):
                                         <div class="item-date">{format_date(cert.get('date', ''))}</div>
                                     </div>
                                 </div>
-                '''
+                ''')
                 
-            html += '''
+            html.add('''
                             </div>
                         </section>
-            '''
+            ''')
 
         # Interests
         if resume_data.get('interests'):
-            html += '''
+            html.add('''
                         <section class="section">
                             <h2 class="section-title">Interests</h2>
                             <div class="section-content">
                                 <div class="interests">
-            '''
+            ''')
             
             for interest in resume_data.get('interests', []):
-                html += f'''
+                html.add(f'''
                                     <span class="interest">{interest}</span>
-                '''
+                ''')
                 
-            html += '''
+            html.add('''
                                 </div>
                             </div>
                         </section>
-            '''
+            ''')
     
     # Close left column
-    html += '''
+    html.add('''
                 </div>
                 
                 <!-- Right Column: Skills, Languages, Certifications, Awards, Interests, References -->
                 <div class="right-column">
-    '''
+    ''')
     
     # Education
     if resume_data.get('experience') and len(resume_data['experience']) > 4:
         if resume_data.get('education'):
-            html += '''
+            html.add('''
                     <section class="section">
                         <h2 class="section-title">Education</h2>
                         <div class="section-content">
-            '''
+            ''')
             
             for edu in resume_data.get('education', []):
-                html += f'''
+                html.add(f'''
                             <div class="item" style="margin-bottom:1.5rem;">
                                 <div class="item-header">
                                     <h3 class="item-title">{edu.get('degree', '')}</h3>
@@ -251,110 +331,50 @@ def generate_resume_html(resume_data):
                                     <div class="item-date">{format_date(edu.get('startDate', ''))} - {format_date(edu.get('endDate')) if edu.get('endDate') else 'Present'}</div>
                                 </div>
                             </div>
-                '''
+                ''')
                 
-            html += '''
+            html.add('''
                         </div>
                     </section>
-            '''
+            ''')
 
     # Skills
-    if resume_data.get('skills'):
-        if len(resume_data['skills']):
-            html += '''
-                <section class="section">
-                    <h2 class="section-title">Skills</h2>
-                    <div class="section-content">
-            '''
-            for skill in resume_data.get('skills', []):
-                html += f'''
-                    <div class="skill-group">
-                        <h3 class="skill-group-title">{skill.get('name')}</h3>
-                        <div class="skill-keywords">
-                '''
-                for keyword in skill.get('keywords', []):
-                    html += f'''
-                            <span class="keyword">{keyword}</span>
-                    '''
-                html += '''
-                        </div>
-                    </div>
-                '''
-            html += '''
-                    </div>
-                </section>
-            '''
+    html.add(cached_section('andromeda', 'skills', resume_data, render_skills))
 
     # Projects
-    if resume_data.get('projects'):
-        html += '''
-                <section class="section">
-                    <h2 class="section-title">Projects</h2>
-                    <div class="section-content">
-        '''
-        
-        for project in resume_data.get('projects', []):
-            html += f'''
-                        <div class="item">
-                            <div class="item-header">
-                                <h3 class="item-title">{project.get('title', '')}</h3>
-                            </div>
-                            <div class="item-description">
-                                <p>{format_description(project.get('description', ''))}</p>
-                            </div>
-                            {f'<div class="project-technologies">' if project.get('technologies') else ''}
-            '''
-            
-            for tech in project.get('technologies', []):
-                html += f'''
-                                <span class="technology">{tech}</span>
-                '''
-                
-            if project.get('technologies'):
-                html += '''
-                            </div>
-                '''
-                
-            html += '''
-                        </div>
-            '''
-            
-        html += '''
-                    </div>
-                </section>
-        '''
+    html.add(cached_section('andromeda', 'projects', resume_data, render_projects))
     
     # Languages
     if len(resume_data['experience']) > 2:
         if resume_data.get('languages'):
-            html += '''
+            html.add('''
                         <section class="section">
                             <h2 class="section-title">Languages</h2>
                             <div class="section-content">
                                 <div class="languages">
-            '''
+            ''')
             
             for language in resume_data.get('languages', []):
-                html += f'''
+                html.add(f'''
                                     <span class="language">{language}</span>
-                '''
+                ''')
                 
-            html += '''
+            html.add('''
                                 </div>
                             </div>
                         </section>
-            '''
+            ''')
     
         # Certifications
         if resume_data.get('certifications'):
-            html += '''
+            html.add('''
                         <section class="section">
                             <h2 class="section-title">Certifications</h2>
                             <div class="section-content">
-            '''
+            ''')
             
             for cert in resume_data.get('certifications', []):
-                html += f'''
+                html.add(f'''
                                 <div class="item">
                                     <div class="item-header">
                                         <h3 class="item-title">{cert.get('name', '')}</h3>
@@ -362,43 +382,43 @@ def generate_resume_html(resume_data):
                                         <div class="item-date">{format_date(cert.get('date', ''))}</div>
                                     </div>
                                 </div>
-                '''
+                ''')
                 
-            html += '''
+            html.add('''
                             </div>
                         </section>
-            '''
+            ''')
 
         # Interests
         if resume_data.get('interests'):
-            html += '''
+            html.add('''
                         <section class="section">
                             <h2 class="section-title">Interests</h2>
                             <div class="section-content">
                                 <div class="interests">
-            '''
+            ''')
             
             for interest in resume_data.get('interests', []):
-                html += f'''
+                html.add(f'''
                                     <span class="interest">{interest}</span>
-                '''
+                ''')
                 
-            html += '''
+            html.add('''
                                 </div>
                             </div>
                         </section>
-            '''
+            ''')
     
     # Awards
     if resume_data.get('awards'):
-        html += '''
+        html.add('''
                     <section class="section">
                         <h2 class="section-title">Awards</h2>
                         <div class="section-content">
-        '''
+        ''')
         
         for award in resume_data.get('awards', []):
-            html += f'''
+            html.add(f'''
                             <div class="item">
                                 <div class="item-header">
                                     <h3 class="item-title">{award.get('title', '')}</h3>
@@ -406,23 +426,23 @@ def generate_resume_html(resume_data):
                                 </div>
                                 {f'<div class="item-description"><p>{award.get("description", "")}</p></div>' if award.get('description') else ''}
                             </div>
-            '''
+            ''')
             
-        html += '''
+        html.add('''
                         </div>
                     </section>
-        '''
+        ''')
     
     # References
     if resume_data.get('references'):
-        html += '''
+        html.add('''
                     <section class="section">
                         <h2 class="section-title">References</h2>
                         <div class="section-content">
-        '''
+        ''')
         
         for ref in resume_data.get('references', []):
-            html += f'''
+            html.add(f'''
                             <div class="reference">
                                 <h3 class="item-title">{ref.get('name', '')}</h3>
                                 <p class="item-subtitle">{ref.get('title', '')} at {ref.get('company', '')}</p>
@@ -431,23 +451,23 @@ def generate_resume_html(resume_data):
                                     {f'<p>Phone: {ref.get("phone")}</p>' if ref.get("phone") else ''}
                                 </div>
                             </div>
-            '''
+            ''')
             
-        html += '''
+        html.add('''
                         </div>
                     </section>
-        '''
+        ''')
     
     # Close right column and main content
-    html += '''
+    html.add('''
                 </div>
             </div>
         </div>
     </body>
     </html>
-    '''
+    ''')
 
-    return html
+    return html.build()
 
 
 def get_default_css(dynamic_height=None):
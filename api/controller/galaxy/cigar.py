@@ -1,10 +1,12 @@
 import os
-from flask import redirect, request, jsonify, current_app
+from flask import request, jsonify, current_app
 import logging
 from utils.cigar_helper import buff_calc
-from utils.helper import css_height_calc, data_caching, format_date, format_description, upload_pdf_to_supabase, increment_calc
-import json
-import hashlib
+from utils.helper import css_height_calc, format_date, format_description, preview_css, increment_calc, generate_response
+from utils.fragment_cache import cached_section
+from utils.html_builder import HtmlBuilder
+from utils.thumbnail_helper import thumbnail_response
+from utils.timing import span
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
@@ -14,64 +16,55 @@ supabase_bucket_name = os.getenv("SUPABASE_BUCKET_NAME", "bucket_name")
 
 def generate_pdf():
     """Generate a PDF resume from the provided data and return it as a preview (classic-modern style)"""
+    return generate_response("cigar")
+
+def fit_params(data):
+    """Buffer and increment for this template's height search"""
+    return buff_calc(data), increment_calc(data, 40)
+
+def build_fitted_resume(data):
+    """Generate the resume HTML and the CSS fitted to a single page"""
+    with span("html"):
+        html_content = generate_resume_html(data)
+    buffer, increment = fit_params(data)
+    final_css = css_height_calc(html_content, get_classic_css, data.get('personal', {}).get('email'), 'cigar', buffer, max_attempts, increment)
+    return html_content, final_css
+
+def generate_preview():
+    """Return the resume HTML and CSS sized from the cached or predicted height, without rendering a PDF"""
     try:
         data = request.get_json()
-
         if not data:
             return jsonify({'error': 'No resume data provided'}), 400
-        
-        name = data.get('personal', {}).get('name')
-        cached_pdf = data_caching(data, "cigar")
-        if cached_pdf:
-            # If we have a cached URL, redirect to it
-            if cached_pdf.startswith("http"):
-                return redirect(cached_pdf)
-            # If we have a cached storage path, get the URL
-            else:
-                supabase = current_app.supabase
-                url_res = supabase.storage.from_(supabase_bucket_name).get_public_url(cached_pdf)
-                return redirect(url_res)
 
         html_content = generate_resume_html(data)
-        buffer = buff_calc(data)
-        increment = increment_calc(data, 40)
-        final_css = css_height_calc(html_content, get_classic_css, data.get('personal', {}).get('email'), 'cigar', buffer, max_attempts, increment)
-        pdf_path = upload_pdf_to_supabase(name, "cigar", html_content, final_css)
-
-        combined_data = {
-            "template": "cigar",
-            "resume_data": data
-        }
-
-        # Cache new data and PDF path
-        redis_client = current_app.redis_client
-        data_str = json.dumps(combined_data, sort_keys=True)
-        data_hash = hashlib.sha256(data_str.encode()).hexdigest()
-        
-        redis_client.set(f"{data['personal']['email']}_data_hash_cigar", data_hash)
-        redis_client.set(f"{data['personal']['email']}_storage_path_cigar", pdf_path)
-
-        supabase = current_app.supabase
-        url_res = supabase.storage.from_(supabase_bucket_name).get_public_url(pdf_path)
-        return redirect(url_res)
+        css, height = preview_css(get_classic_css, data.get('personal', {}).get('email'), 'cigar', buff_calc(data), html_content)
+        return jsonify({'html': html_content, 'css': css, 'height': height})
 
     except Exception as e:
-        current_app.logger.error(f"PDF generation error: {str(e)}")
-        return jsonify({'error': f'Failed to generate PDF: {str(e)}'}), 500
+        current_app.logger.error(f"Preview generation error: {str(e)}")
+        return jsonify({'error': f'Failed to generate preview: {str(e)}'}), 500
 
-def generate_resume_html(resume_data):
-    """Generate HTML content for the classic-modern resume template"""
-    # About Me
-    about_html = ''
-    if resume_data.get('summary'):
-        about_html = f'<section class="classic-section"><h2 class="classic-section-title">About Me</h2><div class="classic-summary">{format_description(resume_data.get("summary", ""))}</div></section>'
+def generate_thumbnail():
+    """Return a compact WebP/PNG of the first page of the fitted resume, for the template picker"""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'No resume data provided'}), 400
 
-    # Work Experience
-    experience_html = ''
+        return thumbnail_response(data, "cigar", build_fitted_resume)
+
+    except Exception as e:
+        current_app.logger.error(f"Thumbnail generation error: {str(e)}")
+        return jsonify({'error': f'Failed to generate thumbnail: {str(e)}'}), 500
+
+def render_experience(resume_data):
+    """Work Experience section"""
+    experience_html = HtmlBuilder()
     if resume_data.get('experience'):
-        experience_html += '<section class="classic-section"><h2 class="classic-section-title">Work Experience</h2>'
+        experience_html.add('<section class="classic-section"><h2 class="classic-section-title">Work Experience</h2>')
         for job in resume_data.get('experience', []):
-            experience_html += f'''
+            experience_html.add(f'''
                 <div class="classic-item">
                     <div class="classic-item-header">
                         <span class="classic-item-title">{job.get('title', '')}</span>
@@ -79,125 +72,162 @@ def generate_resume_html(resume_data):
                     </div>
                     <span class="classic-item-subtitle">{job.get('company', '')}</span>
                     <div class="classic-item-description">{format_description(job.get('description', ''))}</div>
-                </div>'''
-        experience_html += '</section>'
+                </div>''')
+        experience_html.add('</section>')
+    return experience_html
 
-    # Education
-    education_html = ''
+def render_education(resume_data):
+    """Education section"""
+    education_html = HtmlBuilder()
     if resume_data.get('education'):
-        education_html += '<section class="classic-section"><h2 class="classic-section-title">Education</h2>'
+        education_html.add('<section class="classic-section"><h2 class="classic-section-title">Education</h2>')
         for edu in resume_data.get('education', []):
-            education_html += f'''
+            education_html.add(f'''
                 <div class="classic-item">
                     <div class="classic-item-header">
                         <span class="classic-item-title">{edu.get('degree', '')}</span>
                         <span class="classic-item-date">{format_date(edu.get('startDate', ''))} - {format_date(edu.get('endDate', '')) if edu.get('endDate') else 'Present'}</span>
                     </div>
                     <span class="classic-item-subtitle">{edu.get('institution', '')}</span>
-                </div>'''
-        education_html += '</section>'
+                </div>''')
+        education_html.add('</section>')
+    return education_html
 
-    # Projects
-    projects_html = ''
+def render_projects(resume_data):
+    """Projects section"""
+    projects_html = HtmlBuilder()
     if resume_data.get('projects'):
-        projects_html += '<section class="classic-section"><h2 class="classic-section-title">Projects</h2>'
+        projects_html.add('<section class="classic-section"><h2 class="classic-section-title">Projects</h2>')
         for project in resume_data.get('projects', []):
-            projects_html += f'''
+            projects_html.add(f'''
                 <div class="classic-item">
                     <div class="classic-item-header">
                         <span class="classic-item-title">{project.get('title', '')}</span>
                         <span class="classic-item-date">{', '.join(project.get('technologies', []))}</span>
                     </div>
                     <div class="classic-item-description">{format_description(project.get('description', ''))}</div>
-                </div>'''
-        projects_html += '</section>'
-
-    # Skills
-    all_keywords = []
-    for skill in resume_data.get('skills', []):
-        all_keywords.extend(skill.get('keywords', []))
-
-    skills_html = (
-        '<section class="classic-section"><h2 class="classic-section-title">Skills</h2>'
-        '<div class="classic-skills">' + ', '.join(all_keywords) + '</div></section>'
-    )
+                </div>''')
+        projects_html.add('</section>')
+    return projects_html
 
-    # Languages
-    languages_html = ''
-    if resume_data.get('languages'):
-        languages_html = f'<section class="classic-section"><h2 class="classic-section-title">Languages</h2><div class="classic-languages">' + ', '.join(resume_data.get('languages', [])) + '</div></section>'
-
-    # Certifications
-    certifications_html = ''
+def render_certifications(resume_data):
+    """Certifications section"""
+    certifications_html = HtmlBuilder()
     if resume_data.get('certifications'):
-        certifications_html += '<section class="classic-section"><h2 class="classic-section-title">Certifications</h2>'
+        certifications_html.add('<section class="classic-section"><h2 class="classic-section-title">Certifications</h2>')
         for cert in resume_data.get('certifications', []):
-            certifications_html += f'''
+            certifications_html.add(f'''
                 <div class="classic-item">
                     <div class="classic-item-header">
                         <span class="classic-item-title">{cert.get('name', '')}</span> | <span class="classic-item-subtitle">{cert.get('issuingOrganization', '')}</span>
                         <span class="classic-item-date">{format_date(cert.get('date', ''))}</span>
                     </div>
-                </div>'''
-        certifications_html += '</section>'
+                </div>''')
+        certifications_html.add('</section>')
+    return certifications_html
 
-    # Awards
-    awards_html = ''
+def render_awards(resume_data):
+    """Awards section"""
+    awards_html = HtmlBuilder()
     if resume_data.get('awards'):
-        awards_html += '<section class="classic-section"><h2 class="classic-section-title">Awards</h2>'
+        awards_html.add('<section class="classic-section"><h2 class="classic-section-title">Awards</h2>')
         for award in resume_data.get('awards', []):
-            awards_html += f'''
+            awards_html.add(f'''
                 <div class="classic-item">
                     <div class="classic-item-header">
                         <span class="classic-item-title">{award.get('title', '')}</span>
                         <span class="classic-item-date">{format_date(award.get('date', ''))}</span>
                     </div>
                     <div class="classic-item-description">{format_description(award.get('summary', ''))}</div>
-                </div>'''
-        awards_html += '</section>'
+                </div>''')
+        awards_html.add('</section>')
+    return awards_html
 
-    # References
-    references_html = ''
+def render_references(resume_data):
+    """References section"""
+    references_html = HtmlBuilder()
     if resume_data.get('references'):
-        references_html += '<section class="classic-section"><h2 class="classic-section-title">References</h2>'
+        references_html.add('<section class="classic-section"><h2 class="classic-section-title">References</h2>')
         for ref in resume_data.get('references', []):
-            references_html += f"""
+            references_html.add(f"""
                 <div class="classic-item">
                     <div class="classic-item-header">
                         <span class="classic-item-title">{ref.get("name", "")}</span> | <span class="classic-item-subtitle">{ref.get("company", "")}</span>
                     </div>
                     <div class="classic-item-description">{format_description(ref.get('contact', ''))}</div>
-                </div>"""
-        references_html += '</section>'
+                </div>""")
+        references_html.add('</section>')
+    return references_html
+
+def generate_resume_html(resume_data):
+    """Generate HTML content for the classic-modern resume template"""
+    personal = resume_data.get('personal', {})
+    # About Me
+    about_html = ''
+    if resume_data.get('summary'):
+        about_html = f'<section class="classic-section"><h2 class="classic-section-title">About Me</h2><div class="classic-summary">{format_description(resume_data.get("summary", ""))}</div></section>'
 
-    html = f'''
+    # Work Experience
+    experience_html = cached_section('cigar', 'experience', resume_data, render_experience)
+
+    # Education
+    education_html = cached_section('cigar', 'education', resume_data, render_education)
+
+    # Projects
+    projects_html = cached_section('cigar', 'projects', resume_data, render_projects)
+
+    # Skills
+    all_keywords = []
+    for skill in resume_data.get('skills', []):
+        all_keywords.extend(skill.get('keywords', []))
+
+    skills_html = (
+        '<section class="classic-section"><h2 class="classic-section-title">Skills</h2>'
+        '<div class="classic-skills">' + ', '.join(all_keywords) + '</div></section>'
+    )
+
+    # Languages
+    languages_html = ''
+    if resume_data.get('languages'):
+        languages_html = f'<section class="classic-section"><h2 class="classic-section-title">Languages</h2><div class="classic-languages">' + ', '.join(resume_data.get('languages', [])) + '</div></section>'
+
+    # Certifications
+    certifications_html = cached_section('cigar', 'certifications', resume_data, render_certifications)
+
+    # Awards
+    awards_html = cached_section('cigar', 'awards', resume_data, render_awards)
+
+    # References
+    references_html = cached_section('cigar', 'references', resume_data, render_references)
+
+    html = HtmlBuilder(f'''
     <!DOCTYPE html>
     <html lang="en">
     <head>
         <meta charset="UTF-8">
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>{resume_data.get('personal', {}).get('name', 'Resume')}</title>
+        <title>{personal.get('name', 'Resume')}</title>
         <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.5.0/css/all.min.css"/>
     </head>
     <body>
         <div class="resume-classic-container">
             <header class="classic-header">
-                <h1 class="classic-name">{resume_data.get('personal', {}).get('name', '')}</h1>
-                <h2 class="classic-headline">{resume_data.get('personal', {}).get('headline', '')}</h2>
+                <h1 class="classic-name">{personal.get('name', '')}</h1>
+                <h2 class="classic-headline">{personal.get('headline', '')}</h2>
                 <div class="classic-contact">
-                    {f'<span>{resume_data.get("personal", {}).get("email", "")}</span>' if resume_data.get('personal', {}).get('email') else ''}
-                    {f'<span>{resume_data.get("personal", {}).get("location", "")}</span>' if resume_data.get('personal', {}).get('location') else ''}
-                    {f'<span><a href="{resume_data.get("personal", {}).get("website", {}).get("link", "")}">{resume_data.get("personal", {}).get("website", {}).get("name", "") or resume_data.get("personal", {}).get("website", {}).get("link", "")}</a></span>' if resume_data.get('personal', {}).get('website', {}).get('link') else ''}
+                    {f'<span>{personal.get("email", "")}</span>' if personal.get('email') else ''}
+                    {f'<span>{personal.get("location", "")}</span>' if personal.get('location') else ''}
+                    {f'<span><a href="{personal.get("website", {}).get("link", "")}">{personal.get("website", {}).get("name", "") or personal.get("website", {}).get("link", "")}</a></span>' if personal.get('website', {}).get('link') else ''}
                 </div>
                 <div class="classic-socials">
-                '''
+                ''')
 
     for social in resume_data.get('socials', []):
-        html += f'''
+        html.add(f'''
             {f'<a href="{social.get("link")}"><i class="fab fa-{social.get("slug")} fa-lg"></i></a>' if social.get('link') else ''}
-        '''
+        ''')
 
-    html += f'''
+    html.add(f'''
                 </div>
             </header>
             <main class="classic-main">
@@ -214,8 +244,8 @@ def generate_resume_html(resume_data):
         </div>
     </body>
     </html>
-    '''
-    return html
+    ''')
+    return html.build()
 
 def get_classic_css(dynamic_height=None):
     height = f"{dynamic_height}pt" if dynamic_height else "1009pt"
@@ -1,9 +1,11 @@
-import hashlib
-import json
-from flask import request, jsonify, current_app, redirect
+from flask import request, jsonify, current_app
 import os
 import logging
-from utils.helper import data_caching, format_description, upload_pdf_to_supabase
+from utils.helper import format_description, generate_response
+from utils.fragment_cache import cached_section
+from utils.html_builder import HtmlBuilder
+from utils.thumbnail_helper import thumbnail_response
+from utils.timing import span
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
@@ -12,48 +14,62 @@ supabase_bucket_name = os.getenv("SUPABASE_BUCKET_NAME", "bucket_name")
 
 def generate_pdf():
     """Generate a minimal PDF resume for new grads/interns (summary, skills, projects, interests only)"""
+    return generate_response("comet")
+
+def build_fitted_resume(data):
+    """Generate the resume HTML and its fixed Legal-size CSS"""
+    with span("html"):
+        html_content = generate_resume_html(data)
+    final_css = get_minimal_css()
+    return html_content, final_css
+
+def generate_preview():
+    """Return the resume HTML and its fixed Legal-size CSS for a live preview, without rendering a PDF"""
     try:
         data = request.get_json()
         if not data:
             return jsonify({'error': 'No resume data provided'}), 400
 
-        name = data.get('personal', {}).get('name')
-        cached_pdf = data_caching(data, "comet")
-        if cached_pdf:
-            # If we have a cached URL, redirect to it
-            if cached_pdf.startswith("http"):
-                return redirect(cached_pdf)
-            # If we have a cached storage path, get the URL
-            else:
-                supabase = current_app.supabase
-                url_res = supabase.storage.from_(supabase_bucket_name).get_public_url(cached_pdf)
-                return redirect(url_res)
-
         html_content = generate_resume_html(data)
-        pdf_path = upload_pdf_to_supabase(name, "comet", html_content, get_minimal_css())
+        return jsonify({'html': html_content, 'css': get_minimal_css(), 'height': None})
 
-        combined_data = {
-            "template": "comet",
-            "resume_data": data
-        }
-
-        redis_client = current_app.redis_client
-        data_str = json.dumps(combined_data, sort_keys=True)
-        data_hash = hashlib.sha256(data_str.encode()).hexdigest()
+    except Exception as e:
+        current_app.logger.error(f"Preview generation error: {str(e)}")
+        return jsonify({'error': f'Failed to generate preview: {str(e)}'}), 500
 
-        redis_client.set(f"{data['personal']['email']}_data_hash_comet", data_hash)
-        redis_client.set(f"{data['personal']['email']}_storage_path_comet", pdf_path)
+def generate_thumbnail():
+    """Return a compact WebP/PNG of the first page of the fitted resume, for the template picker"""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'No resume data provided'}), 400
 
-        supabase = current_app.supabase
-        url_res = supabase.storage.from_(supabase_bucket_name).get_public_url(pdf_path)
-        return redirect(url_res)
+        return thumbnail_response(data, "comet", build_fitted_resume)
 
     except Exception as e:
-        current_app.logger.error(f"PDF generation error: {str(e)}")
-        return jsonify({'error': f'Failed to generate PDF: {str(e)}'}), 500
+        current_app.logger.error(f"Thumbnail generation error: {str(e)}")
+        return jsonify({'error': f'Failed to generate thumbnail: {str(e)}'}), 500
+
+def render_projects(resume_data):
+    """Projects section"""
+    projects_html = HtmlBuilder()
+    if resume_data.get('projects'):
+        projects_html.add('<section class="comet-section"><h2 class="comet-section-title">Projects</h2>')
+        for project in resume_data.get('projects', []):
+            projects_html.add(f'''
+                <div class="comet-item">
+                    <div class="comet-item-header">
+                        <span class="comet-item-title">{project.get('title', '')}</span>
+                        <span class="comet-item-tech">{', '.join(project.get('technologies', []))}</span>
+                    </div>
+                    <div class="comet-item-description">{format_description(project.get('description', ''))}</div>
+                </div>''')
+        projects_html.add('</section>')
+    return projects_html
 
 def generate_resume_html(resume_data):
     """Generate HTML for minimal resume (summary, skills, projects, interests)"""
+    personal = resume_data.get('personal', {})
     # About Me
     about_html = ''
     if resume_data.get('summary'):
@@ -67,19 +83,7 @@ def generate_resume_html(resume_data):
     skills_html = ('<section class="comet-section"><h2 class="comet-section-title">Skills</h2><div class="comet-skills">' + ', '.join(all_keywords) + '</div></section>')
 
     # Projects
-    projects_html = ''
-    if resume_data.get('projects'):
-        projects_html += '<section class="comet-section"><h2 class="comet-section-title">Projects</h2>'
-        for project in resume_data.get('projects', []):
-            projects_html += f'''
-                <div class="comet-item">
-                    <div class="comet-item-header">
-                        <span class="comet-item-title">{project.get('title', '')}</span>
-                        <span class="comet-item-tech">{', '.join(project.get('technologies', []))}</span>
-                    </div>
-                    <div class="comet-item-description">{format_description(project.get('description', ''))}</div>
-                </div>'''
-        projects_html += '</section>'
+    projects_html = cached_section('comet', 'projects', resume_data, render_projects)
 
     # Interests
     interests_html = ''
@@ -92,7 +96,7 @@ def generate_resume_html(resume_data):
     <head>
         <meta charset="UTF-8">
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>{resume_data.get('personal', {}).get('name', 'Resume')}</title>
+        <title>{personal.get('name', 'Resume')}</title>
         <link rel="preconnect" href="https://fonts.googleapis.com">
         <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
         <link href="https://fonts.googleapis.com/css2?family=Poppins:ital,wght@0,100;0,200;0,300;0,400;0,500;0,600;0,700;0,800;0,900;1,100;1,200;1,300;1,400;1,500;1,600;1,700;1,800;1,900&display=swap" rel="stylesheet">
@@ -100,12 +104,12 @@ def generate_resume_html(resume_data):
     <body>
         <div class="comet-container">
             <header class="comet-header">
-                <h1 class="comet-name">{resume_data.get('personal', {}).get('name', '')}</h1>
-                <h2 class="comet-headline">{resume_data.get('personal', {}).get('headline', '')}</h2>
+                <h1 class="comet-name">{personal.get('name', '')}</h1>
+                <h2 class="comet-headline">{personal.get('headline', '')}</h2>
                 <div class="comet-contact">
-                    {f'<span>{resume_data.get("personal", {}).get("email", "")}</span>' if resume_data.get('personal', {}).get('email') else ''}
-                    {f'<span>{resume_data.get("personal", {}).get("location", "")}</span>' if resume_data.get('personal', {}).get('location') else ''}
-                    {f'<span><a href="{resume_data.get("personal", {}).get("website", {}).get("link", "")}">{resume_data.get("personal", {}).get("website", {}).get("name", "") or resume_data.get("personal", {}).get("website", {}).get("link", "")}</a></span>' if resume_data.get('personal', {}).get('website', {}).get('link') else ''}
+                    {f'<span>{personal.get("email", "")}</span>' if personal.get('email') else ''}
+                    {f'<span>{personal.get("location", "")}</span>' if personal.get('location') else ''}
+                    {f'<span><a href="{personal.get("website", {}).get("link", "")}">{personal.get("website", {}).get("name", "") or personal.get("website", {}).get("link", "")}</a></span>' if personal.get('website', {}).get('link') else ''}
                 </div>
             </header>
             <main class="comet-main">
@@ -120,8 +124,8 @@ def generate_resume_html(resume_data):
     '''
     return html
 
-def get_minimal_css():
-    """Return CSS for a minimal, clean resume"""
+def get_minimal_css(dynamic_height=None):
+    """Return CSS for a minimal, clean resume (fixed Legal page, dynamic_height is ignored)"""
     css = f'''
     @page {{
         margin: 0;
@@ -1,9 +1,11 @@
-import hashlib
-from flask import redirect, request, jsonify, current_app
+from flask import request, jsonify, current_app
 import os
 import logging
-from utils.helper import css_height_calc, data_caching, filename_generator, format_date, format_description, get_output_path, upload_pdf_to_supabase
-import json
+from utils.helper import css_height_calc, filename_generator, format_date, format_description, preview_css, get_output_path, generate_response
+from utils.fragment_cache import cached_section
+from utils.html_builder import HtmlBuilder
+from utils.thumbnail_helper import thumbnail_response
+from utils.timing import span
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
@@ -13,101 +15,164 @@ supabase_bucket_name = os.getenv("SUPABASE_BUCKET_NAME", "bucket_name")
 
 def generate_pdf():
     """Generate a creative, professional PDF resume (Milky Way template)"""
+    return generate_response("milky_way")
+
+def fit_params(data):
+    """Buffer and increment for this template's height search"""
+    return 0.2, (len(data.get('experience', [])) / 2) * 50
+
+def build_fitted_resume(data):
+    """Generate the resume HTML and the CSS fitted to a single page"""
+    with span("html"):
+        html_content = generate_resume_html(data)
+    buffer, increment = fit_params(data)
+    final_css = css_height_calc(html_content, get_creative_css, data.get('personal', {}).get('email'), 'milky_way', buffer, max_attempts, increment)
+    return html_content, final_css
+
+def generate_preview():
+    """Return the resume HTML and CSS sized from the cached or predicted height, without rendering a PDF"""
     try:
         data = request.get_json()
         if not data:
             return jsonify({'error': 'No resume data provided'}), 400
-        
-        name = data.get('personal', {}).get('name')
-        cached_pdf = data_caching(data, "milky_way")
-        if cached_pdf:
-            # If we have a cached URL, redirect to it
-            if cached_pdf.startswith("http"):
-                return redirect(cached_pdf)
-            # If we have a cached storage path, get the URL
-            else:
-                supabase = current_app.supabase
-                url_res = supabase.storage.from_(supabase_bucket_name).get_public_url(cached_pdf)
-                return redirect(url_res)
 
         html_content = generate_resume_html(data)
-        buffer = 0.2
-        increment = (len(data.get('experience', [])) / 2) * 50
-        final_css = css_height_calc(html_content, get_creative_css, data.get('personal', {}).get('email'), 'milky_way', buffer, max_attempts, increment)
-        pdf_path = upload_pdf_to_supabase(name, "milky_way", html_content, final_css)
-
-        combined_data = {
-            "template": "milky_way",
-            "resume_data": data
-        }
+        css, height = preview_css(get_creative_css, data.get('personal', {}).get('email'), 'milky_way', 0.2, html_content)
+        return jsonify({'html': html_content, 'css': css, 'height': height})
 
-        # Cache new data and PDF path
-        redis_client = current_app.redis_client
-        data_str = json.dumps(combined_data, sort_keys=True)
-        data_hash = hashlib.sha256(data_str.encode()).hexdigest()
+    except Exception as e:
+        current_app.logger.error(f"Preview generation error: {str(e)}")
+        return jsonify({'error': f'Failed to generate preview: {str(e)}'}), 500
 
-        redis_client.set(f"{data['personal']['email']}_data_hash_milky_way", data_hash)
-        redis_client.set(f"{data['personal']['email']}_storage_path_milky_way", pdf_path)
+def generate_thumbnail():
+    """Return a compact WebP/PNG of the first page of the fitted resume, for the template picker"""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'No resume data provided'}), 400
 
-        supabase = current_app.supabase
-        url_res = supabase.storage.from_(supabase_bucket_name).get_public_url(pdf_path)
-        return redirect(url_res)
+        return thumbnail_response(data, "milky_way", build_fitted_resume)
 
     except Exception as e:
-        current_app.logger.error(f"PDF generation error: {str(e)}")
-        return jsonify({'error': f'Failed to generate PDF: {str(e)}'}), 500
+        current_app.logger.error(f"Thumbnail generation error: {str(e)}")
+        return jsonify({'error': f'Failed to generate thumbnail: {str(e)}'}), 500
 
-def generate_resume_html(resume_data):
-    """Generate HTML for creative resume (modern, colorful, two-column)"""
-    # About Me
-    about_html = ''
-    if resume_data.get('summary'):
-        about_html = f'<section class="mw-section"><h2 class="mw-section-title">About Me</h2><div class="mw-summary">{format_description(resume_data.get("summary", ""))}</div></section>'
-
-    # Experience
-    experience_html = ''
+def render_experience(resume_data):
+    """Experience section"""
+    experience_html = HtmlBuilder()
     if resume_data.get('experience'):
-        experience_html += '<section class="mw-section"><h2 class="mw-section-title">Experience</h2>'
+        experience_html.add('<section class="mw-section"><h2 class="mw-section-title">Experience</h2>')
         for job in resume_data.get('experience', []):
-            experience_html += f'''
+            experience_html.add(f'''
                 <div class="mw-item mw-card">
                     <div class="mw-item-header">
                         <span class="mw-item-title">{job.get('title', '')}</span> <span class="mw-item-company">@ {job.get('company', '')}</span>
                         <span class="mw-item-date">{format_date(job.get('startDate', ''))} - {format_date(job.get('endDate', '')) if job.get('endDate') else 'Present'}</span>
                     </div>
                     <div class="mw-item-description">{format_description(job.get('description', ''))}</div>
-                </div>'''
-        experience_html += '</section>'
+                </div>''')
+        experience_html.add('</section>')
+    return experience_html
 
-    # Education
-    education_html = ''
+def render_education(resume_data):
+    """Education section"""
+    education_html = HtmlBuilder()
     if resume_data.get('education'):
-        education_html += '<section class="mw-section"><h2 class="mw-section-title">Education</h2>'
+        education_html.add('<section class="mw-section"><h2 class="mw-section-title">Education</h2>')
         for edu in resume_data.get('education', []):
-            education_html += f'''
+            education_html.add(f'''
                 <div class="mw-item mw-card">
                     <span class="mw-item-title">{edu.get('degree', '')}</span> 
                     <div class="mw-item-header" style="margin-top:0.5rem;">
                         <span class="mw-item-company" style="margin-left:0;m">@ {edu.get('institution', '')}</span>
                         <span class="mw-item-date">{format_date(edu.get('startDate', ''))} - {format_date(edu.get('endDate', '')) if edu.get('endDate') else 'Present'}</span>
                     </div>
-                </div>'''
-        education_html += '</section>'
+                </div>''')
+        education_html.add('</section>')
+    return education_html
 
-    # Projects
-    projects_html = ''
+def render_projects(resume_data):
+    """Projects section"""
+    projects_html = HtmlBuilder()
     if resume_data.get('projects'):
-        projects_html += '<section class="mw-section"><h2 class="mw-section-title">Projects</h2>'
+        projects_html.add('<section class="mw-section"><h2 class="mw-section-title">Projects</h2>')
         for project in resume_data.get('projects', []):
-            projects_html += f'''
+            projects_html.add(f'''
                 <div class="mw-item mw-card">
                     <div class="mw-item-header">
                         <span class="mw-item-title">{project.get('title', '')}</span>
                         <span class="mw-item-tech">{', '.join(project.get('technologies', []))}</span>
                     </div>
                     <div class="mw-item-description">{format_description(project.get('description', ''))}</div>
-                </div>'''
-        projects_html += '</section>'
+                </div>''')
+        projects_html.add('</section>')
+    return projects_html
+
+def render_certifications(resume_data):
+    """Certifications section"""
+    certifications_html = HtmlBuilder()
+    if resume_data.get('certifications'):
+        certifications_html.add('<section class="mw-section"><h2 class="mw-section-title">Certifications</h2>')
+        for cert in resume_data.get('certifications', []):
+            certifications_html.add(f'''
+                <div class="mw-item mw-card">
+                    <div class="mw-item-header">
+                        <span class="mw-item-title">{cert.get('name', '')}</span> <span class="mw-item-company">@ {cert.get('issuingOrganization', '')}</span>
+                        <span class="mw-item-date">{format_date(cert.get('date', ''))}</span>
+                    </div>
+                </div>''')
+        certifications_html.add('</section>')
+    return certifications_html
+
+def render_awards(resume_data):
+    """Awards section"""
+    awards_html = HtmlBuilder()
+    if resume_data.get('awards'):
+        awards_html.add('<section class="mw-section"><h2 class="mw-section-title">Awards</h2>')
+        for award in resume_data.get('awards', []):
+            awards_html.add(f'''
+                <div class="mw-item mw-card">
+                    <div class="mw-item-header">
+                        <span class="mw-item-title">{award.get('title', '')}</span>
+                        <span class="mw-item-date">{format_date(award.get('date', ''))}</span>
+                    </div>
+                    <div class="mw-item-description">{format_description(award.get('summary', ''))}</div>
+                </div>''')
+        awards_html.add('</section>')
+    return awards_html
+
+def render_references(resume_data):
+    """References section"""
+    references_html = HtmlBuilder()
+    if resume_data.get('references'):
+        references_html.add('<section class="mw-section"><h2 class="mw-section-title">References</h2>')
+        for ref in resume_data.get('references', []):
+            references_html.add(f'''
+                <div class="mw-item mw-card">
+                    <div class="mw-item-header">
+                        <span class="mw-item-title">{ref.get('name', '')}</span> <span class="mw-item-company">@ {ref.get('company', '')}</span>
+                    </div>
+                    <div class="mw-item-description">{format_description(ref.get('contact', ''))}</div>
+                </div>''')
+        references_html.add('</section>')
+    return references_html
+
+def generate_resume_html(resume_data):
+    """Generate HTML for creative resume (modern, colorful, two-column)"""
+    personal = resume_data.get('personal', {})
+    # About Me
+    about_html = ''
+    if resume_data.get('summary'):
+        about_html = f'<section class="mw-section"><h2 class="mw-section-title">About Me</h2><div class="mw-summary">{format_description(resume_data.get("summary", ""))}</div></section>'
+
+    # Experience
+    experience_html = cached_section('milky_way', 'experience', resume_data, render_experience)
+
+    # Education
+    education_html = cached_section('milky_way', 'education', resume_data, render_education)
+
+    # Projects
+    projects_html = cached_section('milky_way', 'projects', resume_data, render_projects)
 
     # Skills
     all_keywords = []
@@ -127,33 +192,10 @@ def generate_resume_html(resume_data):
         languages_html = f'<section class="mw-section"><h2 class="mw-section-title">Languages</h2><div class="mw-languages">' + ' '.join([f'<span class="mw-skill-pill">{lang}</span>' for lang in resume_data.get('languages', [])]) + '</div></section>'
 
     # Certifications
-    certifications_html = ''
-    if resume_data.get('certifications'):
-        certifications_html += '<section class="mw-section"><h2 class="mw-section-title">Certifications</h2>'
-        for cert in resume_data.get('certifications', []):
-            certifications_html += f'''
-                <div class="mw-item mw-card">
-                    <div class="mw-item-header">
-                        <span class="mw-item-title">{cert.get('name', '')}</span> <span class="mw-item-company">@ {cert.get('issuingOrganization', '')}</span>
-                        <span class="mw-item-date">{format_date(cert.get('date', ''))}</span>
-                    </div>
-                </div>'''
-        certifications_html += '</section>'
+    certifications_html = cached_section('milky_way', 'certifications', resume_data, render_certifications)
 
     # Awards
-    awards_html = ''
-    if resume_data.get('awards'):
-        awards_html += '<section class="mw-section"><h2 class="mw-section-title">Awards</h2>'
-        for award in resume_data.get('awards', []):
-            awards_html += f'''
-                <div class="mw-item mw-card">
-                    <div class="mw-item-header">
-                        <span class="mw-item-title">{award.get('title', '')}</span>
-                        <span class="mw-item-date">{format_date(award.get('date', ''))}</span>
-                    </div>
-                    <div class="mw-item-description">{format_description(award.get('summary', ''))}</div>
-                </div>'''
-        awards_html += '</section>'
+    awards_html = cached_section('milky_way', 'awards', resume_data, render_awards)
 
     # Interests
     interests_html = ''
@@ -166,18 +208,7 @@ def generate_resume_html(resume_data):
         )
 
     # References
-    references_html = ''
-    if resume_data.get('references'):
-        references_html += '<section class="mw-section"><h2 class="mw-section-title">References</h2>'
-        for ref in resume_data.get('references', []):
-            references_html += f'''
-                <div class="mw-item mw-card">
-                    <div class="mw-item-header">
-                        <span class="mw-item-title">{ref.get('name', '')}</span> <span class="mw-item-company">@ {ref.get('company', '')}</span>
-                    </div>
-                    <div class="mw-item-description">{format_description(ref.get('contact', ''))}</div>
-                </div>'''
-        references_html += '</section>'
+    references_html = cached_section('milky_way', 'references', resume_data, render_references)
 
     html = f'''
     <!DOCTYPE html>
@@ -185,7 +216,7 @@ def generate_resume_html(resume_data):
     <head>
         <meta charset="UTF-8">
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>{resume_data.get('personal', {}).get('name', 'Resume')}</title>
+        <title>{personal.get('name', 'Resume')}</title>
         <link rel="preconnect" href="https://fonts.googleapis.com">
         <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
         <link href="https://fonts.googleapis.com/css2?family=Lato:ital,wght@0,100;0,300;0,400;0,700;0,900;1,100;1,300;1,400;1,700;1,900&family=Poppins:ital,wght@0,100;0,200;0,300;0,400;0,500;0,600;0,700;0,800;0,900;1,100;1,200;1,300;1,400;1,500;1,600;1,700;1,800;1,900&display=swap" rel="stylesheet">
@@ -193,12 +224,12 @@ def generate_resume_html(resume_data):
     <body>
         <div class="mw-container">
             <header class="mw-header">
-                <h1 class="mw-name">{resume_data.get('personal', {}).get('name', '')}</h1>
-                <h2 class="mw-headline">{resume_data.get('personal', {}).get('headline', '')}</h2>
+                <h1 class="mw-name">{personal.get('name', '')}</h1>
+                <h2 class="mw-headline">{personal.get('headline', '')}</h2>
                 <div class="mw-contact">
-                    {f'<span>{resume_data.get("personal", {}).get("email", "")}</span>' if resume_data.get('personal', {}).get('email') else ''}
-                    {f'<span>{resume_data.get("personal", {}).get("location", "")}</span>' if resume_data.get('personal', {}).get('location') else ''}
-                    {f'<span><a href="{resume_data.get("personal", {}).get("website", {}).get("link", "")}">{resume_data.get("personal", {}).get("website", {}).get("name", "") or resume_data.get("personal", {}).get("website", {}).get("link", "")}</a></span>' if resume_data.get('personal', {}).get('website', {}).get('link') else ''}
+                    {f'<span>{personal.get("email", "")}</span>' if personal.get('email') else ''}
+                    {f'<span>{personal.get("location", "")}</span>' if personal.get('location') else ''}
+                    {f'<span><a href="{personal.get("website", {}).get("link", "")}">{personal.get("website", {}).get("name", "") or personal.get("website", {}).get("link", "")}</a></span>' if personal.get('website', {}).get('link') else ''}
                 </div>
             </header>
             <main class="mw-main">
@@ -1,12 +1,14 @@
 # apollo
 import os
 import sys
-from flask import redirect, request, jsonify, current_app
+from flask import request, jsonify, current_app
 import logging
 from utils.apollo_helper import buff_calc
-from utils.helper import css_height_calc, data_caching, format_date, format_description, upload_pdf_to_supabase, increment_calc
-import json
-import hashlib
+from utils.helper import css_height_calc, format_date, format_description, preview_css, increment_calc, generate_response
+from utils.fragment_cache import cached_section
+from utils.html_builder import HtmlBuilder
+from utils.thumbnail_helper import thumbnail_response
+from utils.timing import span
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
@@ -16,86 +18,165 @@ supabase_bucket_name = os.getenv("SUPABASE_BUCKET_NAME", "bucket_name")
 
 def generate_pdf():
     """Generate a PDF resume from the provided data and return it as a preview (greek-themed style)"""
+    return generate_response("apollo")
+
+def fit_params(data):
+    """Buffer and increment for this template's height search"""
+    return buff_calc(data), increment_calc(data, 10)
+
+def build_fitted_resume(data):
+    """Generate the resume HTML and the CSS fitted to a single page"""
+    with span("html"):
+        html_content = generate_resume_html(data)
+    buffer, increment = fit_params(data)
+    final_css = css_height_calc(html_content, get_apollo_css, data.get('personal', {}).get('email'), 'apollo', buffer, max_attempts, increment)
+    return html_content, final_css
+
+def generate_preview():
+    """Return the resume HTML and CSS sized from the cached or predicted height, without rendering a PDF"""
     try:
         data = request.get_json()
-
         if not data:
             return jsonify({'error': 'No resume data provided'}), 400
-        
-        name = data.get('personal', {}).get('name')
-        cached_pdf = data_caching(data, "apollo")
-        if cached_pdf:
-            # If we have a cached URL, redirect to it
-            if cached_pdf.startswith("http"):
-                return redirect(cached_pdf)
-            # If we have a cached storage path, get the URL
-            else:
-                supabase = current_app.supabase
-                url_res = supabase.storage.from_(supabase_bucket_name).get_public_url(cached_pdf)
-                return redirect(url_res)
 
         html_content = generate_resume_html(data)
-        buffer = buff_calc(data)
-        increment = increment_calc(data, 10)
-        final_css = css_height_calc(html_content, get_apollo_css, data.get('personal', {}).get('email'), 'apollo', buffer, max_attempts, increment)
-        pdf_path = upload_pdf_to_supabase(name, "apollo", html_content, final_css)
-
-        combined_data = {
-            "template": "apollo",
-            "resume_data": data
-        }
+        css, height = preview_css(get_apollo_css, data.get('personal', {}).get('email'), 'apollo', buff_calc(data), html_content)
+        return jsonify({'html': html_content, 'css': css, 'height': height})
 
-        # Cache new data and PDF path
-        redis_client = current_app.redis_client
-        data_str = json.dumps(combined_data, sort_keys=True)
-        data_hash = hashlib.sha256(data_str.encode()).hexdigest()
-        
-        redis_client.set(f"{data['personal']['email']}_data_hash_apollo", data_hash)
-        redis_client.set(f"{data['personal']['email']}_storage_path_apollo", pdf_path)
+    except Exception as e:
+        current_app.logger.error(f"Preview generation error: {str(e)}")
+        return jsonify({'error': f'Failed to generate preview: {str(e)}'}), 500
 
-        supabase = current_app.supabase
-        url_res = supabase.storage.from_(supabase_bucket_name).get_public_url(pdf_path)
-        return redirect(url_res)
-        # return jsonify({'html': html_content})
+def generate_thumbnail():
+    """Return a compact WebP/PNG of the first page of the fitted resume, for the template picker"""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'No resume data provided'}), 400
+
+        return thumbnail_response(data, "apollo", build_fitted_resume)
 
     except Exception as e:
-        current_app.logger.error(f"PDF generation error: {str(e)}")
-        return jsonify({'error': f'Failed to generate PDF: {str(e)}'}), 500
+        current_app.logger.error(f"Thumbnail generation error: {str(e)}")
+        return jsonify({'error': f'Failed to generate thumbnail: {str(e)}'}), 500
+
+def render_education(resume_data):
+    """Education section"""
+    education = resume_data.get('education', [])
+    education_html = HtmlBuilder()
+    if education:
+        education_html.add('<div class="sidebar-section"><div class="sidebar-section-title">EDUCATION</div>')
+        for edu in education:
+            education_html.add(f'''<div class="sidebar-edu-item">
+                <div class="sidebar-edu-degree">{edu.get("degree", "")}</div>
+                <div class="sidebar-edu-school">{edu.get("institution", "")}</div>
+                <div class="sidebar-edu-date">{format_date(edu.get("startDate", ""))} - {format_date(edu.get("endDate", "")) if edu.get("endDate") else "Present"}</div>
+            </div>''')
+        education_html.add('</div>')
+    return education_html
+
+def render_projects(resume_data):
+    """Projects section"""
+    projects_html = HtmlBuilder()
+    if resume_data.get('projects'):
+        projects_html.add('<div class="sidebar-section"><div class="sidebar-section-title">PROJECTS</div>')
+        for project in resume_data.get('projects', []):
+            tech_tags = ', '.join(project.get('technologies', []))
+            projects_html.add(f'''<div class="sidebar-project-item">
+                <div class="sidebar-project-title">{project.get("title", "")}</div>
+                <div class="sidebar-project-tech">{tech_tags}</div>
+                <div class="sidebar-project-desc">{format_description(project.get("description", ""))}</div>
+            </div>''')
+        projects_html.add('</div>')
+    return projects_html
+
+def render_certifications(resume_data):
+    """Certifications section"""
+    certifications = resume_data.get('certifications', [])
+    certifications_html = HtmlBuilder()
+    if certifications:
+        certifications_html.add('<div class="sidebar-section"><div class="sidebar-section-title">CERTIFICATIONS</div>')
+        for cert in certifications:
+            certifications_html.add(f'''<div class="sidebar-cert-item">
+                <div class="sidebar-cert-name">{cert.get("name", "")}</div>
+                <div class="sidebar-cert-org">{cert.get("issuingOrganization", "")}</div>
+                <div class="sidebar-cert-date">{format_date(cert.get("date", ""))}</div>
+            </div>''')
+        certifications_html.add('</div>')
+    return certifications_html
+
+def render_experience(resume_data):
+    """Work Experience section"""
+    experience_html = HtmlBuilder()
+    if resume_data.get('experience'):
+        experience_html.add('<div class="main-section"><div class="main-section-title">WORK EXPERIENCE</div>')
+        for job in resume_data.get('experience', []):
+            experience_html.add(f'''<div class="main-exp-item">
+                <div class="main-exp-header">
+                    <div class="main-exp-title">{job.get("title", "")}</div>
+                    <div class="main-exp-date">{format_date(job.get("startDate", ""))} - {format_date(job.get("endDate", "")) if job.get("endDate") else "Present"}</div>
+                </div>
+                <div class="main-exp-company">{job.get("company", "")}</div>
+                <div class="main-exp-desc">{format_description(job.get("description", ""))}</div>
+            </div>''')
+        experience_html.add('</div>')
+    return experience_html
+
+def render_awards(resume_data):
+    """Awards section"""
+    awards_html = HtmlBuilder()
+    if resume_data.get('awards'):
+        awards_html.add('<div class="main-section"><div class="main-section-title">AWARDS</div>')
+        for award in resume_data.get('awards', []):
+            awards_html.add(f'''<div class="main-exp-item">
+                <div class="main-exp-header">
+                    <div class="main-exp-title">{award.get("title", "")}</div>
+                    <div class="main-exp-date">{format_date(award.get("date", ""))}</div>
+                </div>
+                <div class="main-exp-desc">{format_description(award.get("summary", ""))}</div>
+            </div>''')
+        awards_html.add('</div>')
+    return awards_html
+
+def render_references(resume_data):
+    """References section"""
+    references_html = HtmlBuilder()
+    if resume_data.get('references'):
+        references_html.add('<div class="main-section"><div class="main-section-title">REFERENCES</div>')
+        for ref in resume_data.get('references', []):
+            email = ref.get("email") or "-"
+            phone = ref.get("phone") or "-"
+            references_html.add(f'''<div class="main-exp-item">
+                <div class="main-exp-title">{ref.get("name", "")}</div>
+                <div class="main-exp-company">{ref.get("company", "")}</div>
+                <div class="main-exp-desc">{email} | {phone}</div>
+            </div>''')
+        references_html.add('</div>')
+    return references_html
 
 def generate_resume_html(resume_data):
     """Generate HTML content for a clean, modern two-column resume template with Apollo theme"""
     personal = resume_data.get('personal', {})
-    education = resume_data.get('education', [])
     skills = resume_data.get('skills', [])
-    certifications = resume_data.get('certifications', [])
     languages = resume_data.get('languages', [])
     socials = resume_data.get('socials', [])
 
     # Contact & Socials
-    contact_html = ''
+    contact_html = HtmlBuilder()
     if personal.get('website'):
-        contact_html += f'<div class="sidebar-contact-item"><i class="icon-globe fas fa-globe"></i><span class="contact-text"><a href="{personal.get("website", {}).get("link")}" target="_blank">{personal.get("website", {}).get("name")}</a></span></div>'
+        contact_html.add(f'<div class="sidebar-contact-item"><i class="icon-globe fas fa-globe"></i><span class="contact-text"><a href="{personal.get("website", {}).get("link")}" target="_blank">{personal.get("website", {}).get("name")}</a></span></div>')
     if personal.get('email'):
-        contact_html += f'<div class="sidebar-contact-item"><i class="icon-email fas fa-envelope"></i><a href="mailto:{personal.get("email", "")}" class="contact-text">{personal.get("email", "")}</a></div>'
+        contact_html.add(f'<div class="sidebar-contact-item"><i class="icon-email fas fa-envelope"></i><a href="mailto:{personal.get("email", "")}" class="contact-text">{personal.get("email", "")}</a></div>')
     if personal.get('location'):
-        contact_html += f'<div class="sidebar-contact-item"><i class="icon-location fas fa-map-marker-alt"></i><span class="contact-text">{personal.get("location", "")}</span></div>'
+        contact_html.add(f'<div class="sidebar-contact-item"><i class="icon-location fas fa-map-marker-alt"></i><span class="contact-text">{personal.get("location", "")}</span></div>')
     # Social links
     if socials:
         for social in socials:
             if social.get('link'):
-                contact_html += f'<div class="sidebar-contact-item"><i class="icon-social fab fa-{social.get("slug")}"></i><a href="{social.get("link")}" class="contact-text">{social.get("name", social.get("slug", ""))}</a></div>'
+                contact_html.add(f'<div class="sidebar-contact-item"><i class="icon-social fab fa-{social.get("slug")}"></i><a href="{social.get("link")}" class="contact-text">{social.get("name", social.get("slug", ""))}</a></div>')
 
     # Education
-    education_html = ''
-    if education:
-        education_html += '<div class="sidebar-section"><div class="sidebar-section-title">EDUCATION</div>'
-        for edu in education:
-            education_html += f'''<div class="sidebar-edu-item">
-                <div class="sidebar-edu-degree">{edu.get("degree", "")}</div>
-                <div class="sidebar-edu-school">{edu.get("institution", "")}</div>
-                <div class="sidebar-edu-date">{format_date(edu.get("startDate", ""))} - {format_date(edu.get("endDate", "")) if edu.get("endDate") else "Present"}</div>
-            </div>'''
-        education_html += '</div>'
+    education_html = cached_section('apollo', 'education', resume_data, render_education)
 
     # Skills
     all_keywords = []
@@ -106,29 +187,10 @@ def generate_resume_html(resume_data):
         skills_html = '<div class="sidebar-section"><div class="sidebar-section-title">SKILLS</div><ul class="sidebar-skills">' + ''.join([f'<li>{skill}</li>' for skill in all_keywords]) + '</ul></div>'
 
     # Projects
-    projects_html = ''
-    if resume_data.get('projects'):
-        projects_html += '<div class="sidebar-section"><div class="sidebar-section-title">PROJECTS</div>'
-        for project in resume_data.get('projects', []):
-            tech_tags = ', '.join(project.get('technologies', []))
-            projects_html += f'''<div class="sidebar-project-item">
-                <div class="sidebar-project-title">{project.get("title", "")}</div>
-                <div class="sidebar-project-tech">{tech_tags}</div>
-                <div class="sidebar-project-desc">{format_description(project.get("description", ""))}</div>
-            </div>'''
-        projects_html += '</div>'
+    projects_html = cached_section('apollo', 'projects', resume_data, render_projects)
 
     # Certifications
-    certifications_html = ''
-    if certifications:
-        certifications_html += '<div class="sidebar-section"><div class="sidebar-section-title">CERTIFICATIONS</div>'
-        for cert in certifications:
-            certifications_html += f'''<div class="sidebar-cert-item">
-                <div class="sidebar-cert-name">{cert.get("name", "")}</div>
-                <div class="sidebar-cert-org">{cert.get("issuingOrganization", "")}</div>
-                <div class="sidebar-cert-date">{format_date(cert.get("date", ""))}</div>
-            </div>'''
-        certifications_html += '</div>'
+    certifications_html = cached_section('apollo', 'certifications', resume_data, render_certifications)
 
     # Languages
     languages_html = ''
@@ -158,47 +220,13 @@ def generate_resume_html(resume_data):
         summary_html = f'<div class="main-section"><div class="main-section-title">PROFILE</div><div class="main-summary">{format_description(resume_data.get("summary", ""))}</div></div>'
 
     # Work Experience
-    experience_html = ''
-    if resume_data.get('experience'):
-        experience_html += '<div class="main-section"><div class="main-section-title">WORK EXPERIENCE</div>'
-        for job in resume_data.get('experience', []):
-            experience_html += f'''<div class="main-exp-item">
-                <div class="main-exp-header">
-                    <div class="main-exp-title">{job.get("title", "")}</div>
-                    <div class="main-exp-date">{format_date(job.get("startDate", ""))} - {format_date(job.get("endDate", "")) if job.get("endDate") else "Present"}</div>
-                </div>
-                <div class="main-exp-company">{job.get("company", "")}</div>
-                <div class="main-exp-desc">{format_description(job.get("description", ""))}</div>
-            </div>'''
-        experience_html += '</div>'
+    experience_html = cached_section('apollo', 'experience', resume_data, render_experience)
 
     # Awards
-    awards_html = ''
-    if resume_data.get('awards'):
-        awards_html += '<div class="main-section"><div class="main-section-title">AWARDS</div>'
-        for award in resume_data.get('awards', []):
-            awards_html += f'''<div class="main-exp-item">
-                <div class="main-exp-header">
-                    <div class="main-exp-title">{award.get("title", "")}</div>
-                    <div class="main-exp-date">{format_date(award.get("date", ""))}</div>
-                </div>
-                <div class="main-exp-desc">{format_description(award.get("summary", ""))}</div>
-            </div>'''
-        awards_html += '</div>'
+    awards_html = cached_section('apollo', 'awards', resume_data, render_awards)
 
     # References
-    references_html = ''
-    if resume_data.get('references'):
-        references_html += '<div class="main-section"><div class="main-section-title">REFERENCES</div>'
-        for ref in resume_data.get('references', []):
-            email = ref.get("email") or "-"
-            phone = ref.get("phone") or "-"
-            references_html += f'''<div class="main-exp-item">
-                <div class="main-exp-title">{ref.get("name", "")}</div>
-                <div class="main-exp-company">{ref.get("company", "")}</div>
-                <div class="main-exp-desc">{email} | {phone}</div>
-            </div>'''
-        references_html += '</div>'
+    references_html = cached_section('apollo', 'references', resume_data, render_references)
 
     # Main HTML
     html = f'''
@@ -1,11 +1,13 @@
 # artemis
 import os
-from flask import redirect, request, jsonify, current_app
+from flask import request, jsonify, current_app
 import logging
 from utils.artemis_helper import buff_calc
-from utils.helper import css_height_calc, data_caching, format_date, format_description, upload_pdf_to_supabase, increment_calc
-import json
-import hashlib
+from utils.helper import css_height_calc, format_date, format_description, preview_css, increment_calc, generate_response
+from utils.fragment_cache import cached_section
+from utils.html_builder import HtmlBuilder
+from utils.thumbnail_helper import thumbnail_response
+from utils.timing import span
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
@@ -15,142 +17,113 @@ supabase_bucket_name = os.getenv("SUPABASE_BUCKET_NAME", "bucket_name")
 
 def generate_pdf():
     """Generate a PDF resume from the provided data and return it as a preview (greek-themed style)"""
+    return generate_response("artemis")
+
+def fit_params(data):
+    """Buffer and increment for this template's height search"""
+    return buff_calc(data), increment_calc(data, 15)
+
+def build_fitted_resume(data):
+    """Generate the resume HTML and the CSS fitted to a single page"""
+    with span("html"):
+        html_content = generate_resume_html(data)
+    buffer, increment = fit_params(data)
+    final_css = css_height_calc(html_content, get_artemis_css, data.get('personal', {}).get('email'), 'artemis', buffer, max_attempts, increment)
+    return html_content, final_css
+
+def generate_preview():
+    """Return the resume HTML and CSS sized from the cached or predicted height, without rendering a PDF"""
     try:
         data = request.get_json()
-
         if not data:
             return jsonify({'error': 'No resume data provided'}), 400
-        
-        name = data.get('personal', {}).get('name')
-        cached_pdf = data_caching(data, "artemis")
-        if cached_pdf:
-            # If we have a cached URL, redirect to it
-            if cached_pdf.startswith("http"):
-                return redirect(cached_pdf)
-            # If we have a cached storage path, get the URL
-            else:
-                supabase = current_app.supabase
-                url_res = supabase.storage.from_(supabase_bucket_name).get_public_url(cached_pdf)
-                return redirect(url_res)
 
         html_content = generate_resume_html(data)
-        buffer = buff_calc(data)
-        increment = increment_calc(data, 15)
-        final_css = css_height_calc(html_content, get_artemis_css, data.get('personal', {}).get('email'), 'artemis', buffer, max_attempts, increment)
-        pdf_path = upload_pdf_to_supabase(name, "artemis", html_content, final_css)
-
-        combined_data = {
-            "template": "artemis",
-            "resume_data": data
-        }
-
-        # Cache new data and PDF path
-        redis_client = current_app.redis_client
-        data_str = json.dumps(combined_data, sort_keys=True)
-        data_hash = hashlib.sha256(data_str.encode()).hexdigest()
-        
-        redis_client.set(f"{data['personal']['email']}_data_hash_artemis", data_hash)
-        redis_client.set(f"{data['personal']['email']}_storage_path_artemis", pdf_path)
-
-        supabase = current_app.supabase
-        url_res = supabase.storage.from_(supabase_bucket_name).get_public_url(pdf_path)
-        return redirect(url_res)
-        # return jsonify({'html': html_content})
+        css, height = preview_css(get_artemis_css, data.get('personal', {}).get('email'), 'artemis', buff_calc(data), html_content)
+        return jsonify({'html': html_content, 'css': css, 'height': height})
 
     except Exception as e:
-        current_app.logger.error(f"PDF generation error: {str(e)}")
-        return jsonify({'error': f'Failed to generate PDF: {str(e)}'}), 500
+        current_app.logger.error(f"Preview generation error: {str(e)}")
+        return jsonify({'error': f'Failed to generate preview: {str(e)}'}), 500
 
-def generate_resume_html(resume_data):
-    """Generate HTML content for a clean, modern two-column resume template optimized for WeasyPrint"""
-    personal = resume_data.get('personal', {})
-    education = resume_data.get('education', [])
-    skills = resume_data.get('skills', [])
-    certifications = resume_data.get('certifications', [])
-    languages = resume_data.get('languages', [])
-    socials = resume_data.get('socials', [])
+def generate_thumbnail():
+    """Return a compact WebP/PNG of the first page of the fitted resume, for the template picker"""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'No resume data provided'}), 400
 
-    # Contact information for sidebar
-    contact_html = ''
-    if personal.get('location'):
-        contact_html += f'<div class="sidebar-contact-item"><i class="fas fa-location-dot"></i><span class="contact-text">{personal.get("location", "")}</span></div>'
-    if personal.get('email'):
-        contact_html += f'<div class="sidebar-contact-item"><i class="fas fa-envelope"></i><a href="mailto:{personal.get("email", "")}" class="contact-text">{personal.get("email", "")}</a></div>'
-    if personal.get('website'):
-        contact_html += f'<div class="sidebar-contact-item"><i class="fas fa-globe"></i><span class="contact-text"><a href="{personal.get("website", {}).get("link")}" target="_blank">{personal.get("website", {}).get("name")}</a></span></div>'
+        return thumbnail_response(data, "artemis", build_fitted_resume)
 
-    # Social links for header
-    social_links_html = ''
+    except Exception as e:
+        current_app.logger.error(f"Thumbnail generation error: {str(e)}")
+        return jsonify({'error': f'Failed to generate thumbnail: {str(e)}'}), 500
+
+def render_social_links(resume_data):
+    """Social links for the header"""
+    socials = resume_data.get('socials', [])
+    social_links_html = HtmlBuilder()
     if socials:
-        social_links_html = '<div class="social-links">'
+        social_links_html = HtmlBuilder('<div class="social-links">')
         for social in socials:
             if social.get('link'):
                 icon_class = f"fab fa-{social.get('slug', '')}"
-                social_links_html += f'<a href="{social.get("link")}" target="_blank"><i class="{icon_class}"></i></a>'
-        social_links_html += '</div>'
+                social_links_html.add(f'<a href="{social.get("link")}" target="_blank"><i class="{icon_class}"></i></a>')
+        social_links_html.add('</div>')
+    return social_links_html
 
-    # Education section
-    education_html = ''
+def render_education(resume_data):
+    """Education section"""
+    education = resume_data.get('education', [])
+    education_html = HtmlBuilder()
     if education:
-        education_html += '<div class="sidebar-section"><div class="sidebar-section-title">Education</div>'
+        education_html.add('<div class="sidebar-section"><div class="sidebar-section-title">Education</div>')
         for edu in education:
-            education_html += f'''<div class="sidebar-edu-item">
+            education_html.add(f'''<div class="sidebar-edu-item">
                 <div class="sidebar-edu-degree">{edu.get("degree", "")}</div>
                 <div class="sidebar-edu-school">{edu.get("institution", "")}</div>
                 <div class="sidebar-edu-date">{format_date(edu.get("startDate", ""))} - {format_date(edu.get("endDate", "")) if edu.get("endDate") else "Present"}</div>
-            </div>'''
-        education_html += '</div>'
-
-    # Skills section
-    all_keywords = []
-    for skill in skills:
-        all_keywords.extend(skill.get('keywords', []))
-    skills_html = ''
-    if all_keywords:
-        skills_html = '<div class="sidebar-section"><div class="sidebar-section-title">Skills</div><div class="sidebar-skills">' + ''.join([f'<span class="skill-tag">{skill}</span>' for skill in all_keywords]) + '</div></div>'
+            </div>''')
+        education_html.add('</div>')
+    return education_html
 
-    # Projects section
-    projects_html = ''
+def render_projects(resume_data):
+    """Projects section"""
+    projects_html = HtmlBuilder()
     if resume_data.get('projects'):
-        projects_html += '<div class="sidebar-section"><div class="sidebar-section-title">Projects</div>'
+        projects_html.add('<div class="sidebar-section"><div class="sidebar-section-title">Projects</div>')
         for project in resume_data.get('projects', []):
             tech_tags = ', '.join(project.get('technologies', []))
-            projects_html += f'''<div class="sidebar-project-item">
+            projects_html.add(f'''<div class="sidebar-project-item">
                 <div class="sidebar-project-title">{project.get("title", "")}</div>
                 <div class="sidebar-project-desc">{format_description(project.get("description", ""))}</div>
                 <div class="sidebar-project-tech">{tech_tags}</div>
-            </div>'''
-        projects_html += '</div>'
+            </div>''')
+        projects_html.add('</div>')
+    return projects_html
 
-    # Certifications section
-    certifications_html = ''
+def render_certifications(resume_data):
+    """Certifications section"""
+    certifications = resume_data.get('certifications', [])
+    certifications_html = HtmlBuilder()
     if certifications:
-        certifications_html += '<div class="sidebar-section"><div class="sidebar-section-title">Certifications</div>'
+        certifications_html.add('<div class="sidebar-section"><div class="sidebar-section-title">Certifications</div>')
         for cert in certifications:
-            certifications_html += f'''<div class="sidebar-cert-item">
+            certifications_html.add(f'''<div class="sidebar-cert-item">
                 <div class="sidebar-cert-name">{cert.get("name", "")}</div>
                 <div class="sidebar-cert-org">{cert.get("issuingOrganization", "")}</div>
                 <div class="sidebar-cert-date">{format_date(cert.get("date", ""))}</div>
-            </div>'''
-        certifications_html += '</div>'
-
-    # Languages section
-    languages_html = ''
-    if languages:
-        languages_html = '<div class="sidebar-section"><div class="sidebar-section-title">Languages</div><div class="sidebar-languages">' + ''.join([f'<span class="language-tag">{lang}</span>' for lang in languages]) + '</div></div>'
-
-    # Main Content Sections
-    # Profile (Summary)
-    summary_html = ''
-    if resume_data.get('summary'):
-        summary_html = f'<div class="main-section"><div class="main-section-title">Summary</div><div class="main-summary">{format_description(resume_data.get("summary", ""))}</div></div>'
+            </div>''')
+        certifications_html.add('</div>')
+    return certifications_html
 
-    # Work Experience
-    experience_html = ''
+def render_experience(resume_data):
+    """Work Experience section"""
+    experience_html = HtmlBuilder()
     if resume_data.get('experience'):
-        experience_html += '<div class="main-section"><div class="main-section-title">Experience</div>'
+        experience_html.add('<div class="main-section"><div class="main-section-title">Experience</div>')
         for job in resume_data.get('experience', []):
-            experience_html += f'''<div class="main-exp-item">
+            experience_html.add(f'''<div class="main-exp-item">
                 <div class="main-exp-header">
                     <div class="main-exp-left">
                         <div class="main-exp-title">{job.get("title", "")}</div>
@@ -159,15 +132,17 @@ def generate_resume_html(resume_data):
                     <div class="main-exp-date">{format_date(job.get("startDate", ""))} - {format_date(job.get("endDate", "")) if job.get("endDate") else "Present"}</div>
                 </div>
                 <div class="main-exp-desc">{format_description(job.get("description", ""))}</div>
-            </div>'''
-        experience_html += '</div>'
+            </div>''')
+        experience_html.add('</div>')
+    return experience_html
 
-    # Awards
-    awards_html = ''
+def render_awards(resume_data):
+    """Awards section"""
+    awards_html = HtmlBuilder()
     if resume_data.get('awards'):
-        awards_html += '<div class="main-section"><div class="main-section-title">Awards</div>'
+        awards_html.add('<div class="main-section"><div class="main-section-title">Awards</div>')
         for award in resume_data.get('awards', []):
-            awards_html += f'''<div class="main-exp-item">
+            awards_html.add(f'''<div class="main-exp-item">
                 <div class="main-exp-header">
                     <div class="main-exp-left">
                         <div class="main-exp-title">{award.get("title", "")}</div>
@@ -175,22 +150,80 @@ def generate_resume_html(resume_data):
                     <div class="main-exp-date">{format_date(award.get("date", ""))}</div>
                 </div>
                 <div class="main-exp-desc">{format_description(award.get("summary", ""))}</div>
-            </div>'''
-        awards_html += '</div>'
+            </div>''')
+        awards_html.add('</div>')
+    return awards_html
 
-    # References
-    references_html = ''
+def render_references(resume_data):
+    """References section"""
+    references_html = HtmlBuilder()
     if resume_data.get('references'):
-        references_html += '<div class="main-section"><div class="main-section-title">References</div>'
+        references_html.add('<div class="main-section"><div class="main-section-title">References</div>')
         for ref in resume_data.get('references', []):
             email = ref.get("email") or "-"
             phone = ref.get("phone") or "-"
-            references_html += f'''<div class="main-exp-item">
+            references_html.add(f'''<div class="main-exp-item">
                 <div class="main-exp-title">{ref.get("name", "")}</div>
                 <div class="main-exp-company">{ref.get("company", "")}</div>
                 <div class="main-exp-desc">{email} | {phone}</div>
-            </div>'''
-        references_html += '</div>'
+            </div>''')
+        references_html.add('</div>')
+    return references_html
+
+def generate_resume_html(resume_data):
+    """Generate HTML content for a clean, modern two-column resume template optimized for WeasyPrint"""
+    personal = resume_data.get('personal', {})
+    skills = resume_data.get('skills', [])
+    languages = resume_data.get('languages', [])
+
+    # Contact information for sidebar
+    contact_html = HtmlBuilder()
+    if personal.get('location'):
+        contact_html.add(f'<div class="sidebar-contact-item"><i class="fas fa-location-dot"></i><span class="contact-text">{personal.get("location", "")}</span></div>')
+    if personal.get('email'):
+        contact_html.add(f'<div class="sidebar-contact-item"><i class="fas fa-envelope"></i><a href="mailto:{personal.get("email", "")}" class="contact-text">{personal.get("email", "")}</a></div>')
+    if personal.get('website'):
+        contact_html.add(f'<div class="sidebar-contact-item"><i class="fas fa-globe"></i><span class="contact-text"><a href="{personal.get("website", {}).get("link")}" target="_blank">{personal.get("website", {}).get("name")}</a></span></div>')
+
+    # Social links for header
+    social_links_html = cached_section('artemis', 'socials', resume_data, render_social_links)
+
+    # Education section
+    education_html = cached_section('artemis', 'education', resume_data, render_education)
+
+    # Skills section
+    all_keywords = []
+    for skill in skills:
+        all_keywords.extend(skill.get('keywords', []))
+    skills_html = ''
+    if all_keywords:
+        skills_html = '<div class="sidebar-section"><div class="sidebar-section-title">Skills</div><div class="sidebar-skills">' + ''.join([f'<span class="skill-tag">{skill}</span>' for skill in all_keywords]) + '</div></div>'
+
+    # Projects section
+    projects_html = cached_section('artemis', 'projects', resume_data, render_projects)
+
+    # Certifications section
+    certifications_html = cached_section('artemis', 'certifications', resume_data, render_certifications)
+
+    # Languages section
+    languages_html = ''
+    if languages:
+        languages_html = '<div class="sidebar-section"><div class="sidebar-section-title">Languages</div><div class="sidebar-languages">' + ''.join([f'<span class="language-tag">{lang}</span>' for lang in languages]) + '</div></div>'
+
+    # Main Content Sections
+    # Profile (Summary)
+    summary_html = ''
+    if resume_data.get('summary'):
+        summary_html = f'<div class="main-section"><div class="main-section-title">Summary</div><div class="main-summary">{format_description(resume_data.get("summary", ""))}</div></div>'
+
+    # Work Experience
+    experience_html = cached_section('artemis', 'experience', resume_data, render_experience)
+
+    # Awards
+    awards_html = cached_section('artemis', 'awards', resume_data, render_awards)
+
+    # References
+    references_html = cached_section('artemis', 'references', resume_data, render_references)
 
     # Main HTML - Optimized for WeasyPrint
     html = f'''
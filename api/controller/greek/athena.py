@@ -1,11 +1,13 @@
 # athena
 import os
-from flask import redirect, request, jsonify, current_app
+from flask import request, jsonify, current_app
 import logging
 from utils.athena_helper import buff_calc
-from utils.helper import css_height_calc, data_caching, format_date, format_description, upload_pdf_to_supabase, increment_calc
-import json
-import hashlib
+from utils.helper import css_height_calc, format_date, format_description, preview_css, increment_calc, generate_response
+from utils.fragment_cache import cached_section
+from utils.html_builder import HtmlBuilder
+from utils.thumbnail_helper import thumbnail_response
+from utils.timing import span
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
@@ -15,128 +17,195 @@ supabase_bucket_name = os.getenv("SUPABASE_BUCKET_NAME", "bucket_name")
 
 def generate_pdf():
     """Generate a PDF resume from the provided data and return it as a preview (greek-themed style)"""
+    return generate_response("athena")
+
+def fit_params(data):
+    """Buffer and increment for this template's height search"""
+    return buff_calc(data), increment_calc(data, 15)
+
+def build_fitted_resume(data):
+    """Generate the resume HTML and the CSS fitted to a single page"""
+    with span("html"):
+        html_content = generate_resume_html(data)
+    buffer, increment = fit_params(data)
+    final_css = css_height_calc(html_content, get_athena_css, data.get('personal', {}).get('email'), 'athena', buffer, max_attempts, increment)
+    return html_content, final_css
+
+def generate_preview():
+    """Return the resume HTML and CSS sized from the cached or predicted height, without rendering a PDF"""
     try:
         data = request.get_json()
-
         if not data:
             return jsonify({'error': 'No resume data provided'}), 400
-        
-        name = data.get('personal', {}).get('name')
-        cached_pdf = data_caching(data, "athena")
-        if cached_pdf:
-            # If we have a cached URL, redirect to it
-            if cached_pdf.startswith("http"):
-                return redirect(cached_pdf)
-            # If we have a cached storage path, get the URL
-            else:
-                supabase = current_app.supabase
-                url_res = supabase.storage.from_(supabase_bucket_name).get_public_url(cached_pdf)
-                return redirect(url_res)
 
         html_content = generate_resume_html(data)
-        buffer = buff_calc(data)
-        increment = increment_calc(data, 15)
-        final_css = css_height_calc(html_content, get_athena_css, data.get('personal', {}).get('email'), 'athena', buffer, max_attempts, increment)
-        pdf_path = upload_pdf_to_supabase(name, "athena", html_content, final_css)
-
-        combined_data = {
-            "template": "athena",
-            "resume_data": data
-        }
-
-        # Cache new data and PDF path
-        redis_client = current_app.redis_client
-        data_str = json.dumps(combined_data, sort_keys=True)
-        data_hash = hashlib.sha256(data_str.encode()).hexdigest()
-        
-        redis_client.set(f"{data['personal']['email']}_data_hash_athena", data_hash)
-        redis_client.set(f"{data['personal']['email']}_storage_path_athena", pdf_path)
+        css, height = preview_css(get_athena_css, data.get('personal', {}).get('email'), 'athena', buff_calc(data), html_content)
+        return jsonify({'html': html_content, 'css': css, 'height': height})
 
-        supabase = current_app.supabase
-        url_res = supabase.storage.from_(supabase_bucket_name).get_public_url(pdf_path)
-        return redirect(url_res)
+    except Exception as e:
+        current_app.logger.error(f"Preview generation error: {str(e)}")
+        return jsonify({'error': f'Failed to generate preview: {str(e)}'}), 500
+
+def generate_thumbnail():
+    """Return a compact WebP/PNG of the first page of the fitted resume, for the template picker"""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'No resume data provided'}), 400
+
+        return thumbnail_response(data, "athena", build_fitted_resume)
 
     except Exception as e:
-        current_app.logger.error(f"PDF generation error: {str(e)}")
-        return jsonify({'error': f'Failed to generate PDF: {str(e)}'}), 500
+        current_app.logger.error(f"Thumbnail generation error: {str(e)}")
+        return jsonify({'error': f'Failed to generate thumbnail: {str(e)}'}), 500
 
-def generate_resume_html(resume_data):
-    """Generate HTML content for a professional, Athena-inspired two-column resume template"""
-    # Sidebar: Personal Info, Education, Skills, Projects, Certifications
-    personal = resume_data.get('personal', {})
+def render_education(resume_data):
+    """Education section"""
     education = resume_data.get('education', [])
-    skills = resume_data.get('skills', [])
-    
-    contact_html = ''
-    if personal.get('location'):
-        contact_html += f'<div class="sidebar-contact-item"><i class="icon-location"></i><span>{personal.get("location", "")}</span></div>'
-    if personal.get('phone'):
-        contact_html += f'<div class="sidebar-contact-item"><i class="icon-phone"></i><span>{personal.get("phone", "")}</span></div>'
-    if personal.get('email'):
-        contact_html += f'<div class="sidebar-contact-item"><i class="icon-email"></i><a href="mailto:{personal.get("email", "")}">{personal.get("email", "")}</a></div>'
-    if personal.get('website', {}).get('link'):
-        contact_html += f'<div class="sidebar-contact-item"><i class="icon-website"></i><a href="{personal.get("website", {}).get("link", "")}">{personal.get("website", {}).get("name", personal.get("website", {}).get("link", ""))}</a></div>'
-
-    # Education
-    education_html = ''
+    education_html = HtmlBuilder()
     if education:
-        education_html += '<div class="sidebar-section"><div class="sidebar-section-title">Education</div>'
+        education_html.add('<div class="sidebar-section"><div class="sidebar-section-title">Education</div>')
         for edu in education:
-            education_html += f'''
+            education_html.add(f'''
             <div class="sidebar-edu-item">
                 <div class="sidebar-edu-degree">{edu.get("degree", "")}</div>
                 <div class="sidebar-edu-school">{edu.get("institution", "")}</div>
                 <div class="sidebar-edu-date">{format_date(edu.get("startDate", ""))} - {format_date(edu.get("endDate", "")) if edu.get("endDate") else "Present"}</div>
-            </div>'''
-        education_html += '</div>'
-
-    # Skills
-    all_keywords = []
-    for skill in skills:
-        all_keywords.extend(skill.get('keywords', []))
-    skills_html = ''
-    if all_keywords:
-        skill_tags = ''.join([f'<span class="skill-tag">{skill}</span>' for skill in all_keywords])
-        skills_html = f'<div class="sidebar-section"><div class="sidebar-section-title">Skills</div><div class="sidebar-skills">{skill_tags}</div></div>'
+            </div>''')
+        education_html.add('</div>')
+    return education_html
 
-    # Projects - moved to sidebar
-    projects_html = ''
+def render_projects(resume_data):
+    """Projects section, in the sidebar"""
+    projects_html = HtmlBuilder()
     if resume_data.get('projects'):
-        projects_html += '<div class="sidebar-section"><div class="sidebar-section-title">Key Projects</div>'
+        projects_html.add('<div class="sidebar-section"><div class="sidebar-section-title">Key Projects</div>')
         for project in resume_data.get('projects', []):
             tech_tags = ''.join([f'<span class="sidebar-tech-tag">{tech}</span>' for tech in project.get('technologies', [])])
-            projects_html += f'''
+            projects_html.add(f'''
             <div class="sidebar-project-item">
                 <div class="sidebar-project-title">{project.get("title", "")}</div>
                 <div class="sidebar-project-desc">{format_description(project.get("description", ""))}</div>
                 <div class="sidebar-tech-tags">{tech_tags}</div>
-            </div>'''
-        projects_html += '</div>'
+            </div>''')
+        projects_html.add('</div>')
+    return projects_html
 
-    # Certifications - moved to sidebar
-    certifications_html = ''
+def render_certifications(resume_data):
+    """Certifications section, in the sidebar"""
+    certifications_html = HtmlBuilder()
     if resume_data.get('certifications'):
-        certifications_html += '<div class="sidebar-section"><div class="sidebar-section-title">Certifications</div>'
+        certifications_html.add('<div class="sidebar-section"><div class="sidebar-section-title">Certifications</div>')
         for cert in resume_data.get('certifications', []):
-            certifications_html += f'''
+            certifications_html.add(f'''
             <div class="sidebar-cert-item">
                 <div class="sidebar-cert-name">{cert.get("name", "")}</div>
                 <div class="sidebar-cert-org">{cert.get("issuingOrganization", "")}</div>
                 <div class="sidebar-cert-date">{format_date(cert.get("date", ""))}</div>
-            </div>'''
-        certifications_html += '</div>'
-    
-    # Awards
-    awards_html = ''
+            </div>''')
+        certifications_html.add('</div>')
+    return certifications_html
+
+def render_awards(resume_data):
+    """Awards section"""
+    awards_html = HtmlBuilder()
     if resume_data.get('awards'):
-        awards_html += '<div class="sidebar-section"><div class="sidebar-section-title">Awards</div>'
+        awards_html.add('<div class="sidebar-section"><div class="sidebar-section-title">Awards</div>')
         for award in resume_data.get('awards', []):
-            awards_html += f'''
+            awards_html.add(f'''
             <div class="sidebar-award-item">
                 <div class="sidebar-award-title">{award.get("title", "")}</div>
                 <div class="sidebar-award-date">{format_date(award.get("date", ""))}</div>
-            </div>'''
-        awards_html += '</div>'
+            </div>''')
+        awards_html.add('</div>')
+    return awards_html
+
+def render_socials(resume_data):
+    """Socials section"""
+    socials_html = HtmlBuilder()
+    if resume_data.get('socials'):
+        socials_html = HtmlBuilder('<div class="main-section"><div class="main-section-title">Professional Links</div><div class="main-socials">')
+        for social in resume_data.get('socials', []):
+            if social.get('link'):
+                socials_html.add(f'<a href="{social.get("link")}" class="main-social-link"><i class="fab fa-{social.get("slug")} fa-lg"></i></a>')
+        socials_html.add('</div></div>')
+    return socials_html
+
+def render_experience(resume_data):
+    """Experience section"""
+    experience_html = HtmlBuilder()
+    if resume_data.get('experience'):
+        experience_html.add('<div class="main-section"><div class="main-section-title">Professional Experience</div>')
+        for job in resume_data.get('experience', []):
+            experience_html.add(f'''
+            <div class="main-exp-item">
+                <div class="main-exp-header">
+                    <div class="main-exp-left">
+                        <div class="main-exp-title">{job.get("title", "")}</div>
+                        <div class="main-exp-company">{job.get("company", "")}</div>
+                    </div>
+                    <div class="main-exp-date">{format_date(job.get("startDate", ""))} - {format_date(job.get("endDate", "")) if job.get("endDate") else "Present"}</div>
+                </div>
+                <div class="main-exp-desc">{format_description(job.get("description", ""))}</div>
+            </div>''')
+        experience_html.add('</div>')
+    return experience_html
+
+def render_references(resume_data):
+    """References section"""
+    references_html = HtmlBuilder()
+    if resume_data.get('references'):
+        references_html.add('<div class="main-section"><div class="main-section-title">References</div>')
+        for ref in resume_data.get('references', []):
+            references_html.add(f'''
+            <div class="main-exp-item">
+                <div class="main-exp-header">
+                    <div class="main-exp-left">
+                        <div class="main-exp-title">{ref.get("name", "")}</div>
+                        <div class="main-exp-company">{ref.get("company", "")}</div>
+                    </div>
+                </div>
+                <div class="main-exp-desc">{format_description((ref.get("email", "-") or "-") + " | " + (ref.get("phone", "-") or "-"))}</div>
+            </div>''')
+        references_html.add('</div>')
+    return references_html
+
+def generate_resume_html(resume_data):
+    """Generate HTML content for a professional, Athena-inspired two-column resume template"""
+    # Sidebar: Personal Info, Education, Skills, Projects, Certifications
+    personal = resume_data.get('personal', {})
+    skills = resume_data.get('skills', [])
+    
+    contact_html = HtmlBuilder()
+    if personal.get('location'):
+        contact_html.add(f'<div class="sidebar-contact-item"><i class="icon-location"></i><span>{personal.get("location", "")}</span></div>')
+    if personal.get('phone'):
+        contact_html.add(f'<div class="sidebar-contact-item"><i class="icon-phone"></i><span>{personal.get("phone", "")}</span></div>')
+    if personal.get('email'):
+        contact_html.add(f'<div class="sidebar-contact-item"><i class="icon-email"></i><a href="mailto:{personal.get("email", "")}">{personal.get("email", "")}</a></div>')
+    if personal.get('website', {}).get('link'):
+        contact_html.add(f'<div class="sidebar-contact-item"><i class="icon-website"></i><a href="{personal.get("website", {}).get("link", "")}">{personal.get("website", {}).get("name", personal.get("website", {}).get("link", ""))}</a></div>')
+
+    # Education
+    education_html = cached_section('athena', 'education', resume_data, render_education)
+
+    # Skills
+    all_keywords = []
+    for skill in skills:
+        all_keywords.extend(skill.get('keywords', []))
+    skills_html = ''
+    if all_keywords:
+        skill_tags = ''.join([f'<span class="skill-tag">{skill}</span>' for skill in all_keywords])
+        skills_html = f'<div class="sidebar-section"><div class="sidebar-section-title">Skills</div><div class="sidebar-skills">{skill_tags}</div></div>'
+
+    # Projects - moved to sidebar
+    projects_html = cached_section('athena', 'projects', resume_data, render_projects)
+
+    # Certifications - moved to sidebar
+    certifications_html = cached_section('athena', 'certifications', resume_data, render_certifications)
+    
+    # Awards
+    awards_html = cached_section('athena', 'awards', resume_data, render_awards)
     
     # Languages
     languages_html = ''
@@ -163,13 +232,7 @@ def generate_resume_html(resume_data):
 
     # Main Content Sections
     # Socials
-    socials_html = ''
-    if resume_data.get('socials'):
-        socials_html = '<div class="main-section"><div class="main-section-title">Professional Links</div><div class="main-socials">'
-        for social in resume_data.get('socials', []):
-            if social.get('link'):
-                socials_html += f'<a href="{social.get("link")}" class="main-social-link"><i class="fab fa-{social.get("slug")} fa-lg"></i></a>'
-        socials_html += '</div></div>'
+    socials_html = cached_section('athena', 'socials', resume_data, render_socials)
 
     # Summary
     summary_html = ''
@@ -177,39 +240,10 @@ def generate_resume_html(resume_data):
         summary_html = f'<div class="main-section"><div class="main-section-title">Professional Summary</div><div class="main-summary">{format_description(resume_data.get("summary", ""))}</div></div>'
 
     # Experience
-    experience_html = ''
-    if resume_data.get('experience'):
-        experience_html += '<div class="main-section"><div class="main-section-title">Professional Experience</div>'
-        for job in resume_data.get('experience', []):
-            experience_html += f'''
-            <div class="main-exp-item">
-                <div class="main-exp-header">
-                    <div class="main-exp-left">
-                        <div class="main-exp-title">{job.get("title", "")}</div>
-                        <div class="main-exp-company">{job.get("company", "")}</div>
-                    </div>
-                    <div class="main-exp-date">{format_date(job.get("startDate", ""))} - {format_date(job.get("endDate", "")) if job.get("endDate") else "Present"}</div>
-                </div>
-                <div class="main-exp-desc">{format_description(job.get("description", ""))}</div>
-            </div>'''
-        experience_html += '</div>'
+    experience_html = cached_section('athena', 'experience', resume_data, render_experience)
 
     # References
-    references_html = ''
-    if resume_data.get('references'):
-        references_html += '<div class="main-section"><div class="main-section-title">References</div>'
-        for ref in resume_data.get('references', []):
-            references_html += f'''
-            <div class="main-exp-item">
-                <div class="main-exp-header">
-                    <div class="main-exp-left">
-                        <div class="main-exp-title">{ref.get("name", "")}</div>
-                        <div class="main-exp-company">{ref.get("company", "")}</div>
-                    </div>
-                </div>
-                <div class="main-exp-desc">{format_description((ref.get("email", "-") or "-") + " | " + (ref.get("phone", "-") or "-"))}</div>
-            </div>'''
-        references_html += '</div>'
+    references_html = cached_section('athena', 'references', resume_data, render_references)
 
     # Complete HTML structure
     html = f'''
@@ -218,7 +252,7 @@ def generate_resume_html(resume_data):
     <head>
         <meta charset="UTF-8">
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>{resume_data.get('personal', {}).get('name', 'Resume')}</title>
+        <title>{personal.get('name', 'Resume')}</title>
         <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.5.0/css/all.min.css"/>
         <link rel="preconnect" href="https://fonts.googleapis.com">
         <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
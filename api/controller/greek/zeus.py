@@ -1,11 +1,13 @@
 # zeus
 import os
-from flask import redirect, request, jsonify, current_app
+from flask import request, jsonify, current_app
 import logging
 from utils.zeus_helper import buff_calc
-from utils.helper import css_height_calc, data_caching, format_date, format_description, upload_pdf_to_supabase, increment_calc
-import json
-import hashlib
+from utils.helper import css_height_calc, format_date, format_description, preview_css, increment_calc, generate_response
+from utils.fragment_cache import cached_section
+from utils.html_builder import HtmlBuilder
+from utils.thumbnail_helper import thumbnail_response
+from utils.timing import span
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
@@ -15,64 +17,55 @@ supabase_bucket_name = os.getenv("SUPABASE_BUCKET_NAME", "bucket_name")
 
 def generate_pdf():
     """Generate a PDF resume from the provided data and return it as a preview (greek-themed style)"""
+    return generate_response("zeus")
+
+def fit_params(data):
+    """Buffer and increment for this template's height search"""
+    return buff_calc(data), increment_calc(data, 20)
+
+def build_fitted_resume(data):
+    """Generate the resume HTML and the CSS fitted to a single page"""
+    with span("html"):
+        html_content = generate_resume_html(data)
+    buffer, increment = fit_params(data)
+    final_css = css_height_calc(html_content, get_zeus_css, data.get('personal', {}).get('email'), 'zeus', buffer, max_attempts, increment)
+    return html_content, final_css
+
+def generate_preview():
+    """Return the resume HTML and CSS sized from the cached or predicted height, without rendering a PDF"""
     try:
         data = request.get_json()
-
         if not data:
             return jsonify({'error': 'No resume data provided'}), 400
-        
-        name = data.get('personal', {}).get('name')
-        cached_pdf = data_caching(data, "zeus")
-        if cached_pdf:
-            # If we have a cached URL, redirect to it
-            if cached_pdf.startswith("http"):
-                return redirect(cached_pdf)
-            # If we have a cached storage path, get the URL
-            else:
-                supabase = current_app.supabase
-                url_res = supabase.storage.from_(supabase_bucket_name).get_public_url(cached_pdf)
-                return redirect(url_res)
 
         html_content = generate_resume_html(data)
-        buffer = buff_calc(data)
-        increment = increment_calc(data, 20)
-        final_css = css_height_calc(html_content, get_zeus_css, data.get('personal', {}).get('email'), 'zeus', buffer, max_attempts, increment)
-        pdf_path = upload_pdf_to_supabase(name, "zeus", html_content, final_css)
+        css, height = preview_css(get_zeus_css, data.get('personal', {}).get('email'), 'zeus', buff_calc(data), html_content)
+        return jsonify({'html': html_content, 'css': css, 'height': height})
 
-        combined_data = {
-            "template": "zeus",
-            "resume_data": data
-        }
+    except Exception as e:
+        current_app.logger.error(f"Preview generation error: {str(e)}")
+        return jsonify({'error': f'Failed to generate preview: {str(e)}'}), 500
 
-        # Cache new data and PDF path
-        redis_client = current_app.redis_client
-        data_str = json.dumps(combined_data, sort_keys=True)
-        data_hash = hashlib.sha256(data_str.encode()).hexdigest()
-        
-        redis_client.set(f"{data['personal']['email']}_data_hash_zeus", data_hash)
-        redis_client.set(f"{data['personal']['email']}_storage_path_zeus", pdf_path)
+def generate_thumbnail():
+    """Return a compact WebP/PNG of the first page of the fitted resume, for the template picker"""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'No resume data provided'}), 400
 
-        supabase = current_app.supabase
-        url_res = supabase.storage.from_(supabase_bucket_name).get_public_url(pdf_path)
-        return redirect(url_res)
+        return thumbnail_response(data, "zeus", build_fitted_resume)
 
     except Exception as e:
-        current_app.logger.error(f"PDF generation error: {str(e)}")
-        return jsonify({'error': f'Failed to generate PDF: {str(e)}'}), 500
+        current_app.logger.error(f"Thumbnail generation error: {str(e)}")
+        return jsonify({'error': f'Failed to generate thumbnail: {str(e)}'}), 500
 
-def generate_resume_html(resume_data):
-    """Generate HTML content for the Greek Zeus-themed resume template"""
-    # About Me
-    about_html = ''
-    if resume_data.get('summary'):
-        about_html = f'<section class="greek-section"><h2 class="greek-section-title"><span class="greek-icon">⚡</span>About Me</h2><div class="greek-summary">{format_description(resume_data.get("summary", ""))}</div></section>'
-
-    # Work Experience
-    experience_html = ''
+def render_experience(resume_data):
+    """Work Experience section"""
+    experience_html = HtmlBuilder()
     if resume_data.get('experience'):
-        experience_html += '<section class="greek-section"><h2 class="greek-section-title"><span class="greek-icon">🏛️</span>Work Experience</h2>'
+        experience_html.add('<section class="greek-section"><h2 class="greek-section-title"><span class="greek-icon">🏛️</span>Work Experience</h2>')
         for job in resume_data.get('experience', []):
-            experience_html += f'''
+            experience_html.add(f'''
                 <div class="greek-item">
                     <div class="greek-item-header">
                         <span class="greek-item-title">{job.get('title', '')}</span>
@@ -80,104 +73,141 @@ def generate_resume_html(resume_data):
                     </div>
                     <span class="greek-item-subtitle">{job.get('company', '')}</span>
                     <div class="greek-item-description">{format_description(job.get('description', ''))}</div>
-                </div>'''
-        experience_html += '</section>'
+                </div>''')
+        experience_html.add('</section>')
+    return experience_html
 
-    # Education
-    education_html = ''
+def render_education(resume_data):
+    """Education section"""
+    education_html = HtmlBuilder()
     if resume_data.get('education'):
-        education_html += '<section class="greek-section"><h2 class="greek-section-title"><span class="greek-icon">🎓</span>Education</h2>'
+        education_html.add('<section class="greek-section"><h2 class="greek-section-title"><span class="greek-icon">🎓</span>Education</h2>')
         for edu in resume_data.get('education', []):
-            education_html += f'''
+            education_html.add(f'''
                 <div class="greek-item">
                     <div class="greek-item-header">
                         <span class="greek-item-title">{edu.get('degree', '')}</span>
                         <span class="greek-item-date">{format_date(edu.get('startDate', ''))} - {format_date(edu.get('endDate', '')) if edu.get('endDate') else 'Present'}</span>
                     </div>
                     <span class="greek-item-subtitle">{edu.get('institution', '')}</span>
-                </div>'''
-        education_html += '</section>'
+                </div>''')
+        education_html.add('</section>')
+    return education_html
 
-    # Projects
-    projects_html = ''
+def render_projects(resume_data):
+    """Projects section"""
+    projects_html = HtmlBuilder()
     if resume_data.get('projects'):
-        projects_html += '<section class="greek-section"><h2 class="greek-section-title"><span class="greek-icon">⚔️</span>Projects</h2>'
+        projects_html.add('<section class="greek-section"><h2 class="greek-section-title"><span class="greek-icon">⚔️</span>Projects</h2>')
         for project in resume_data.get('projects', []):
-            projects_html += f'''
+            projects_html.add(f'''
                 <div class="greek-item">
                     <div class="greek-item-header">
                         <span class="greek-item-title">{project.get('title', '')}</span>
                         <span class="greek-item-date">{', '.join(project.get('technologies', []))}</span>
                     </div>
                     <div class="greek-item-description">{format_description(project.get('description', ''))}</div>
-                </div>'''
-        projects_html += '</section>'
-
-    # Skills
-    all_keywords = []
-    for skill in resume_data.get('skills', []):
-        all_keywords.extend(skill.get('keywords', []))
-
-    skills_html = (
-        '<section class="greek-section"><h2 class="greek-section-title"><span class="greek-icon">🔱</span>Skills</h2>'
-        '<div class="greek-skills">' + ' • '.join(all_keywords) + '</div></section>'
-    )
+                </div>''')
+        projects_html.add('</section>')
+    return projects_html
 
-    # Languages
-    languages_html = ''
-    if resume_data.get('languages'):
-        languages_html = f'<section class="greek-section"><h2 class="greek-section-title"><span class="greek-icon">🗣️</span>Languages</h2><div class="greek-languages">' + ' • '.join(resume_data.get('languages', [])) + '</div></section>'
-
-    # Certifications
-    certifications_html = ''
+def render_certifications(resume_data):
+    """Certifications section"""
+    certifications_html = HtmlBuilder()
     if resume_data.get('certifications'):
-        certifications_html += '<section class="greek-section"><h2 class="greek-section-title"><span class="greek-icon">🏆</span>Certifications</h2>'
+        certifications_html.add('<section class="greek-section"><h2 class="greek-section-title"><span class="greek-icon">🏆</span>Certifications</h2>')
         for cert in resume_data.get('certifications', []):
-            certifications_html += f'''
+            certifications_html.add(f'''
                 <div class="greek-item">
                     <div class="greek-item-header">
                         <span class="greek-item-title">{cert.get('name', '')}</span> | <span class="greek-item-subtitle">{cert.get('issuingOrganization', '')}</span>
                         <span class="greek-item-date">{format_date(cert.get('date', ''))}</span>
                     </div>
-                </div>'''
-        certifications_html += '</section>'
+                </div>''')
+        certifications_html.add('</section>')
+    return certifications_html
 
-    # Awards
-    awards_html = ''
+def render_awards(resume_data):
+    """Awards section"""
+    awards_html = HtmlBuilder()
     if resume_data.get('awards'):
-        awards_html += '<section class="greek-section"><h2 class="greek-section-title"><span class="greek-icon">👑</span>Awards</h2>'
+        awards_html.add('<section class="greek-section"><h2 class="greek-section-title"><span class="greek-icon">👑</span>Awards</h2>')
         for award in resume_data.get('awards', []):
-            awards_html += f'''
+            awards_html.add(f'''
                 <div class="greek-item">
                     <div class="greek-item-header">
                         <span class="greek-item-title">{award.get('title', '')}</span>
                         <span class="greek-item-date">{format_date(award.get('date', ''))}</span>
                     </div>
                     <div class="greek-item-description">{format_description(award.get('summary', ''))}</div>
-                </div>'''
-        awards_html += '</section>'
+                </div>''')
+        awards_html.add('</section>')
+    return awards_html
 
-    # References
-    references_html = ''
+def render_references(resume_data):
+    """References section"""
+    references_html = HtmlBuilder()
     if resume_data.get('references'):
-        references_html += '<section class="greek-section"><h2 class="greek-section-title"><span class="greek-icon">🤝</span>References</h2>'
+        references_html.add('<section class="greek-section"><h2 class="greek-section-title"><span class="greek-icon">🤝</span>References</h2>')
         for ref in resume_data.get('references', []):
-            references_html += f"""
+            references_html.add(f"""
                 <div class="greek-item">
                     <div class="greek-item-header">
                         <span class="greek-item-title">{ref.get("name", "")}</span> | <span class="greek-item-subtitle">{ref.get("company", "")}</span>
                     </div>
                     <div class="greek-item-description">{format_description(ref.get('contact', ''))}</div>
-                </div>"""
-        references_html += '</section>'
+                </div>""")
+        references_html.add('</section>')
+    return references_html
+
+def generate_resume_html(resume_data):
+    """Generate HTML content for the Greek Zeus-themed resume template"""
+    personal = resume_data.get('personal', {})
+    # About Me
+    about_html = ''
+    if resume_data.get('summary'):
+        about_html = f'<section class="greek-section"><h2 class="greek-section-title"><span class="greek-icon">⚡</span>About Me</h2><div class="greek-summary">{format_description(resume_data.get("summary", ""))}</div></section>'
+
+    # Work Experience
+    experience_html = cached_section('zeus', 'experience', resume_data, render_experience)
+
+    # Education
+    education_html = cached_section('zeus', 'education', resume_data, render_education)
+
+    # Projects
+    projects_html = cached_section('zeus', 'projects', resume_data, render_projects)
+
+    # Skills
+    all_keywords = []
+    for skill in resume_data.get('skills', []):
+        all_keywords.extend(skill.get('keywords', []))
+
+    skills_html = (
+        '<section class="greek-section"><h2 class="greek-section-title"><span class="greek-icon">🔱</span>Skills</h2>'
+        '<div class="greek-skills">' + ' • '.join(all_keywords) + '</div></section>'
+    )
+
+    # Languages
+    languages_html = ''
+    if resume_data.get('languages'):
+        languages_html = f'<section class="greek-section"><h2 class="greek-section-title"><span class="greek-icon">🗣️</span>Languages</h2><div class="greek-languages">' + ' • '.join(resume_data.get('languages', [])) + '</div></section>'
 
-    html = f'''
+    # Certifications
+    certifications_html = cached_section('zeus', 'certifications', resume_data, render_certifications)
+
+    # Awards
+    awards_html = cached_section('zeus', 'awards', resume_data, render_awards)
+
+    # References
+    references_html = cached_section('zeus', 'references', resume_data, render_references)
+
+    html = HtmlBuilder(f'''
     <!DOCTYPE html>
     <html lang="en">
     <head>
         <meta charset="UTF-8">
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>{resume_data.get('personal', {}).get('name', 'Resume')}</title>
+        <title>{personal.get('name', 'Resume')}</title>
         <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.5.0/css/all.min.css"/>
         <link rel="preconnect" href="https://fonts.googleapis.com">
         <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
@@ -189,22 +219,22 @@ def generate_resume_html(resume_data):
             <header class="greek-header">
                 <div class="greek-laurel-left">🏛️</div>
                 <div class="greek-header-content">
-                    <h1 class="greek-name">{resume_data.get('personal', {}).get('name', '')}</h1>
-                    <h2 class="greek-headline">{resume_data.get('personal', {}).get('headline', '')}</h2>
+                    <h1 class="greek-name">{personal.get('name', '')}</h1>
+                    <h2 class="greek-headline">{personal.get('headline', '')}</h2>
                     <div class="greek-contact">
-                        {f'<span>📧 {resume_data.get("personal", {}).get("email", "")}</span>' if resume_data.get('personal', {}).get('email') else ''}
-                        {f'<span>📍 {resume_data.get("personal", {}).get("location", "")}</span>' if resume_data.get('personal', {}).get('location') else ''}
-                        {f'<span>🌐 <a href="{resume_data.get("personal", {}).get("website", {}).get("link", "")}">{resume_data.get("personal", {}).get("website", {}).get("name", "") or resume_data.get("personal", {}).get("website", {}).get("link", "")}</a></span>' if resume_data.get('personal', {}).get('website', {}).get('link') else ''}
+                        {f'<span>📧 {personal.get("email", "")}</span>' if personal.get('email') else ''}
+                        {f'<span>📍 {personal.get("location", "")}</span>' if personal.get('location') else ''}
+                        {f'<span>🌐 <a href="{personal.get("website", {}).get("link", "")}">{personal.get("website", {}).get("name", "") or personal.get("website", {}).get("link", "")}</a></span>' if personal.get('website', {}).get('link') else ''}
                     </div>
                     <div class="greek-socials">
-                '''
+                ''')
 
     for social in resume_data.get('socials', []):
-        html += f'''
+        html.add(f'''
             {f'<a href="{social.get("link")}"><i class="fab fa-{social.get("slug")} fa-lg"></i></a>' if social.get('link') else ''}
-        '''
+        ''')
 
-    html += f'''
+    html.add(f'''
                     </div>
                 </div>
                 <div class="greek-laurel-right">⚡</div>
@@ -223,8 +253,8 @@ def generate_resume_html(resume_data):
         </div>
     </body>
     </html>
-    '''
-    return html
+    ''')
+    return html.build()
 
 def get_zeus_css(dynamic_height=None):
     height = f"{dynamic_height}pt" if dynamic_height else "1009pt"
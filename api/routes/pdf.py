@@ -1,47 +1,111 @@
 from flask import Blueprint
+from utils.profiling import profiled
 
-# galaxy
-from api.controller.galaxy.andromeda import generate_pdf as generate_andromeda_pdf
-from api.controller.galaxy.cigar import generate_pdf as generate_cigar_pdf
-from api.controller.galaxy.comet import generate_pdf as generate_comet_pdf
-from api.controller.galaxy.milky_way import generate_pdf as generate_milky_way_pdf
-
-# greek
-from api.controller.greek.zeus import generate_pdf as generate_zeus_pdf
-from api.controller.greek.athena import generate_pdf as generate_athena_pdf
-from api.controller.greek.apollo import generate_pdf as generate_apollo_pdf
-from api.controller.greek.artemis import generate_pdf as generate_artemis_pdf
+# controllers (and WeasyPrint with them) are imported on the first request for each template
+from utils.templates import load_template
 
 
 generate_bp = Blueprint('generate', __name__)
 @generate_bp.route("/andromeda/generate", methods=["POST"])
+@profiled
 def andromeda_route():
-    return generate_andromeda_pdf()
+    return load_template("andromeda").generate_pdf()
+
+@generate_bp.route("/andromeda/preview", methods=["POST"])
+def andromeda_preview_route():
+    return load_template("andromeda").generate_preview()
+
+@generate_bp.route("/andromeda/thumbnail", methods=["POST"])
+def andromeda_thumbnail_route():
+    return load_template("andromeda").generate_thumbnail()
 
 @generate_bp.route("/cigar/generate", methods=["POST"])
+@profiled
 def cigar_route():
-    return generate_cigar_pdf()
+    return load_template("cigar").generate_pdf()
+
+@generate_bp.route("/cigar/preview", methods=["POST"])
+def cigar_preview_route():
+    return load_template("cigar").generate_preview()
+
+@generate_bp.route("/cigar/thumbnail", methods=["POST"])
+def cigar_thumbnail_route():
+    return load_template("cigar").generate_thumbnail()
 
 @generate_bp.route("/comet/generate", methods=["POST"])
+@profiled
 def comet_route():
-    return generate_comet_pdf()
+    return load_template("comet").generate_pdf()
+
+@generate_bp.route("/comet/preview", methods=["POST"])
+def comet_preview_route():
+    return load_template("comet").generate_preview()
+
+@generate_bp.route("/comet/thumbnail", methods=["POST"])
+def comet_thumbnail_route():
+    return load_template("comet").generate_thumbnail()
 
 @generate_bp.route("/milky_way/generate", methods=["POST"])
+@profiled
 def milky_way_route():
-    return generate_milky_way_pdf()
+    return load_template("milky_way").generate_pdf()
+
+@generate_bp.route("/milky_way/preview", methods=["POST"])
+def milky_way_preview_route():
+    return load_template("milky_way").generate_preview()
+
+@generate_bp.route("/milky_way/thumbnail", methods=["POST"])
+def milky_way_thumbnail_route():
+    return load_template("milky_way").generate_thumbnail()
 
 @generate_bp.route("/zeus/generate", methods=["POST"])
+@profiled
 def zeus_route():
-    return generate_zeus_pdf()
+    return load_template("zeus").generate_pdf()
+
+@generate_bp.route("/zeus/preview", methods=["POST"])
+def zeus_preview_route():
+    return load_template("zeus").generate_preview()
+
+@generate_bp.route("/zeus/thumbnail", methods=["POST"])
+def zeus_thumbnail_route():
+    return load_template("zeus").generate_thumbnail()
 
 @generate_bp.route("/athena/generate", methods=["POST"])
+@profiled
 def athena_route():
-    return generate_athena_pdf()
+    return load_template("athena").generate_pdf()
+
+@generate_bp.route("/athena/preview", methods=["POST"])
+def athena_preview_route():
+    return load_template("athena").generate_preview()
+
+@generate_bp.route("/athena/thumbnail", methods=["POST"])
+def athena_thumbnail_route():
+    return load_template("athena").generate_thumbnail()
 
 @generate_bp.route("/apollo/generate", methods=["POST"])
+@profiled
 def apollo_route():
-    return generate_apollo_pdf()
+    return load_template("apollo").generate_pdf()
+
+@generate_bp.route("/apollo/preview", methods=["POST"])
+def apollo_preview_route():
+    return load_template("apollo").generate_preview()
+
+@generate_bp.route("/apollo/thumbnail", methods=["POST"])
+def apollo_thumbnail_route():
+    return load_template("apollo").generate_thumbnail()
 
 @generate_bp.route("/artemis/generate", methods=["POST"])
+@profiled
 def artemis_route():
-    return generate_artemis_pdf()
\ No newline at end of file
+    return load_template("artemis").generate_pdf()
+
+@generate_bp.route("/artemis/preview", methods=["POST"])
+def artemis_preview_route():
+    return load_template("artemis").generate_preview()
+
+@generate_bp.route("/artemis/thumbnail", methods=["POST"])
+def artemis_thumbnail_route():
+    return load_template("artemis").generate_thumbnail()
\ No newline at end of file
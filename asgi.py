@@ -0,0 +1,233 @@
+"""
+Async serving mode.
+
+PDF generation awaits Redis and storage calls on the event loop and hands WeasyPrint
+work to a process pool (utils.render_pool), so one worker can hold many in-flight
+requests that are mostly waiting on network I/O:
+
+    uvicorn --factory asgi:create_asgi_app --workers 2
+    gunicorn 'asgi:create_asgi_app()' -k uvicorn.workers.UvicornWorker -w 2
+
+POST /api/pdf/<template>/generate, /check and /metrics are served natively; every other
+route (preview, thumbnail, CORS preflights) falls through to the Flask app on a thread pool.
+"""
+import asyncio
+import json
+import logging
+import os
+from pathlib import Path
+from urllib.parse import parse_qsl
+from a2wsgi import WSGIMiddleware
+
+from main import create_app
+from utils.breaker import AsyncGuardedClient, breakers, check_status
+from utils.helper import generate_steps, supabase_bucket_name
+from utils.lazy import LazyClient
+from utils.metrics import observe_request, render_metrics
+from utils.render_pool import render_in_pool, shutdown_render_pool
+from utils.section_measure import measured_height_async
+from utils.templates import templates
+from utils.timing import current_timings, log_timings, merge_timings, server_timing_header
+from utils.warmup import is_ready
+
+logger = logging.getLogger(__name__)
+
+class ThreadedClient:
+    """Awaitable facade that runs a blocking client's methods on the default thread pool"""
+
+    def __init__(self, client):
+        self._client = client
+
+    def __getattr__(self, name):
+        method = getattr(self._client, name)
+
+        async def call(*args, **kwargs):
+            return await asyncio.to_thread(method, *args, **kwargs)
+        return call
+
+class AsyncClients:
+    """
+    Native async Upstash and Supabase clients when the Flask app is configured for them;
+    in-process stand-ins (FakeRedis, LocalSupabase) are wrapped in ThreadedClient instead.
+    """
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.redis = self._make_redis()
+        self._bucket = None
+        self._bucket_lock = asyncio.Lock()
+
+    def _make_redis(self):
+        # shares the redis breaker with the Flask app's GuardedClient; timeouts come from acall
+        client = self.flask_app.redis_client.client
+        if not isinstance(client, LazyClient):
+            return AsyncGuardedClient(ThreadedClient(client))
+        from upstash_redis.asyncio import Redis
+        redis = Redis(os.getenv('UPSTASH_REDIS_URL', 'https://ace-pegasus-31891.upstash.io'), os.getenv('UPSTASH_REDIS_TOKEN'), rest_retries=0)
+        return AsyncGuardedClient(redis)
+
+    async def bucket(self):
+        if self._bucket is not None:
+            return self._bucket
+        async with self._bucket_lock:
+            if self._bucket is None:
+                if isinstance(self.flask_app.supabase, LazyClient):
+                    from supabase import acreate_client
+                    client = await acreate_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_SERVICE_KEY"))
+                    self._bucket = client.storage.from_(supabase_bucket_name)
+                else:
+                    self._bucket = ThreadedClient(self.flask_app.supabase.storage.from_(supabase_bucket_name))
+        return self._bucket
+
+async def read_body(receive):
+    body = bytearray()
+    while True:
+        message = await receive()
+        body.extend(message.get("body", b""))
+        if not message.get("more_body"):
+            return bytes(body)
+
+async def send_response(send, status, body=b"", content_type="application/json", headers=()):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", content_type.encode()),
+            (b"content-length", str(len(body)).encode()),
+            (b"access-control-allow-origin", b"*"),
+            *headers,
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+async def send_json(send, status, payload):
+    await send_response(send, status, json.dumps(payload).encode())
+
+class TrackedSend:
+    """Wraps an ASGI send callable and records whether the response has started"""
+
+    def __init__(self, send):
+        self.send = send
+        self.started = False
+
+    async def __call__(self, message):
+        if message["type"] == "http.response.start":
+            self.started = True
+        await self.send(message)
+
+class AsyncResumeApp:
+    def __init__(self, flask_app=None):
+        self.flask_app = flask_app or create_app()
+        self.clients = AsyncClients(self.flask_app)
+        self.fallback = WSGIMiddleware(self.flask_app, workers=int(os.getenv("ASGI_WSGI_THREADS", "10")))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self.lifespan(receive, send)
+
+        path, method = scope["path"], scope.get("method")
+        parts = path.strip("/").split("/")
+        if method == "POST" and len(parts) == 4 and parts[:2] == ["api", "pdf"] and parts[3] == "generate" and parts[2] in templates:
+            # a task of its own, so the request's timings (a context variable) end with it
+            return await asyncio.create_task(self.generate(parts[2], scope, receive, send))
+        if method == "GET" and path == "/check":
+            if not is_ready(self.flask_app):
+                return await send_json(send, 503, {'status': 'warming', 'warmup': self.flask_app.warmup_state})
+            return await send_json(send, 200, check_status())
+        if method == "GET" and path == "/metrics":
+            return await send_response(send, 200, render_metrics().encode(), content_type="text/plain; version=0.0.4")
+        return await self.fallback(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                shutdown_render_pool()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def run_step(self, kind, *args):
+        """One helper.generate_steps step, awaited on the event loop"""
+        if kind == "local":
+            return await asyncio.to_thread(args[0])
+        if kind == "redis":
+            calls = args[0](self.clients.redis)
+            if isinstance(calls, list):
+                return await asyncio.gather(*calls)
+            return await calls
+        if kind == "storage":
+            return await breakers["storage"].acall(args[0], await self.clients.bucket())
+        if kind == "bucket":
+            return await args[0](await self.clients.bucket())
+        if kind == "measure":
+            return await measured_height_async(*args)
+        if kind == "render":
+            # the worker builds the HTML unless section measurement already did
+            template, data, page, html_content, measured = args
+            result = await render_in_pool(template, data, page, measured, html_content)
+            merge_timings(result["timings"])
+            return result
+        raise ValueError(f"Unknown generate step: {kind}")
+
+    async def run_steps(self, steps):
+        """Drive generate_steps to its response, as helper.run_steps does in the Flask app"""
+        advance, value = steps.send, None
+        while True:
+            try:
+                step = advance(value)
+            except StopIteration as done:
+                return done.value
+            try:
+                advance, value = steps.send, await self.run_step(*step)
+            except Exception as e:
+                advance, value = steps.throw, e
+
+    async def generate(self, template, scope, receive, send):
+        """Async twin of the controllers' generate_pdf: the same pipeline, with every step awaited"""
+        status = 500
+        send = TrackedSend(send)
+        try:
+            try:
+                data = json.loads(await read_body(receive) or b"null")
+            except ValueError:
+                data = None
+
+            steps = generate_steps(template, data, dict(parse_qsl(scope["query_string"].decode())))
+            kind, *response = await self.run_steps(steps)
+            if kind == "error":
+                status, message = response
+                await send_json(send, status, {'error': message})
+                return
+
+            headers = [(b"server-timing", server_timing_header(current_timings()).encode())]
+            if kind == "redirect":
+                status = 302
+                await send_response(send, status, headers=[(b"location", response[0].encode()), *headers])
+                return
+
+            pdf_bytes = response[0]
+            if kind == "file":
+                # disk cache hit; there is no sendfile here, so read it
+                pdf_bytes = await asyncio.to_thread(Path(response[0]).read_bytes)
+            status = 200
+            await send_response(send, status, pdf_bytes, content_type="application/pdf", headers=headers)
+
+        except Exception as e:
+            logger.error(f"PDF generation error: {str(e)}")
+            if send.started:
+                # headers are already out; a second response.start is a protocol error, so just
+                # return and let the server close the connection
+                return
+            await send_json(send, status, {'error': f'Failed to generate PDF: {str(e)}'})
+
+        finally:
+            timings = current_timings()
+            if timings is not None:
+                observe_request(timings, status)
+                log_timings(timings, status)
+
+def create_asgi_app(flask_app=None):
+    """Build the ASGI app around a Flask app; benchmarks pass one wired to in-process stand-ins"""
+    return AsyncResumeApp(flask_app)
@@ -0,0 +1,90 @@
+"""
+Check that identical inputs render to byte-identical PDFs.
+
+Renders every template and resume size through render_resume (HTML, height search, write_pdf)
+several times in this process and once in each of several fresh processes, each started with a
+different PYTHONHASHSEED, then compares SHA-256 digests of the bytes. Exits non-zero on any
+mismatch, so it can gate a WeasyPrint upgrade. DETERMINISTIC_PDF=0 shows the difference.
+
+    python -m benchmarks.bench_determinism
+    python -m benchmarks.bench_determinism --templates zeus,cigar --sizes mid --processes 3 --output determinism.json
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_templates import synthetic_resume
+from benchmarks.corpus import profiles
+
+def render_digests(templates, sizes, layout=None):
+    """{"template:size": sha256 of the PDF} for one render of each case"""
+    from utils.render_pool import render_resume
+
+    digests = {}
+    for template in templates:
+        for size in sizes:
+            pdf = render_resume(template, synthetic_resume(size), layout)["pdf"]
+            digests[f"{template}:{size}"] = hashlib.sha256(pdf).hexdigest()
+    return digests
+
+def subprocess_digests(templates, sizes, layout, seed):
+    env = dict(os.environ, PYTHONHASHSEED=str(seed))
+    command = [sys.executable, "-m", "benchmarks.bench_determinism", "--worker",
+               "--templates", ",".join(templates), "--sizes", ",".join(sizes)]
+    if layout:
+        command += ["--page", layout]
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run(command, env=env, cwd=root, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main(argv=None):
+    from utils.templates import template_names
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--templates", default=",".join(template_names()))
+    parser.add_argument("--sizes", default="intern,mid,max")
+    parser.add_argument("--page", choices=("letter", "legal"), help="check paginated output instead of the fitted page")
+    parser.add_argument("--repeat", type=int, default=3, help="renders in this process")
+    parser.add_argument("--processes", type=int, default=2, help="fresh processes, each with its own hash seed")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+    templates, sizes = args.templates.split(","), args.sizes.split(",")
+    unknown = [size for size in sizes if size not in profiles]
+    if unknown:
+        parser.error(f"unknown sizes: {unknown}")
+
+    if args.worker:
+        print(json.dumps(render_digests(templates, sizes, args.page)))
+        return None
+
+    runs = [render_digests(templates, sizes, args.page) for _ in range(args.repeat)]
+    runs += [subprocess_digests(templates, sizes, args.page, seed) for seed in range(1, args.processes + 1)]
+
+    results = []
+    for case in runs[0]:
+        distinct = sorted({run[case] for run in runs})
+        results.append({"case": case, "renders": len(runs), "distinct": len(distinct), "digests": distinct})
+        status = "identical" if len(distinct) == 1 else f"{len(distinct)} DIFFERENT outputs"
+        print(f"{case:<22} {len(runs)} renders  {status}")
+
+    mismatches = [result["case"] for result in results if result["distinct"] > 1]
+    print(f"\n{len(results) - len(mismatches)}/{len(results)} cases deterministic")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"page": args.page, "results": results}, f, indent=2)
+    if mismatches:
+        sys.exit(1)
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Track the text metrics height estimator (utils/text_metrics.py) against real WeasyPrint layout.
+
+For every profiled template and resume size: the smallest single-page height found by bisecting
+real layouts, the estimate and its error, the estimator's own time, and how many layout passes and
+how much trailing whitespace the height search would need seeded from the buffer heuristic versus
+the estimate. Per template it also fits the profile's fixed height and scale to the measurements.
+
+    python -m benchmarks.bench_estimator
+    python -m benchmarks.bench_estimator --templates zeus,cigar --sizes intern,mid,max --output estimator.json
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_templates import synthetic_resume
+from benchmarks.corpus import profiles
+
+min_height = 1009  # pt; the smallest page the height search returns
+
+def fits(html_content, css_builder, height):
+    from weasyprint import CSS
+    from utils.helper import parse_html
+
+    return len(parse_html(html_content).render(stylesheets=[CSS(string=css_builder(dynamic_height=height))]).pages) == 1
+
+def true_height(html_content, css_builder, tolerance=2):
+    """Smallest single-page height in pt, to within tolerance, by bisecting real layouts"""
+    low, high = 100, min_height
+    while not fits(html_content, css_builder, high):
+        low, high = high, high * 1.5
+        if high > 30000:
+            return None
+    while high - low > tolerance:
+        middle = (low + high) / 2
+        if fits(html_content, css_builder, middle):
+            high = middle
+        else:
+            low = middle
+    return high
+
+def search_cost(seed, truth, increment, max_attempts):
+    """(layout passes, final height) fit_height takes from this seed, simulated with search_height"""
+    from utils.helper import search_height
+
+    if truth <= min_height:
+        return 1, seed  # fits the initial 1009pt render; the seed is used as is
+    final_height, _, attempts = search_height(lambda height: height >= truth, seed, max_attempts, increment)
+    return 1 + attempts, final_height
+
+def fit_profile(points):
+    """Least squares fixed (px) and scale from (tallest column px, true height px) pairs"""
+    if len({x for x, _ in points}) < 2:
+        return None
+    mean_x = statistics.fmean(x for x, _ in points)
+    mean_y = statistics.fmean(y for _, y in points)
+    scale = sum((x - mean_x) * (y - mean_y) for x, y in points) / sum((x - mean_x) ** 2 for x, _ in points)
+    return {"fixed": round(mean_y - scale * mean_x), "scale": round(scale, 3)}
+
+def run_case(template, size, repeat):
+    from utils.helper import predict_height
+    from utils.templates import get_css_builder, load_template
+    from utils.text_metrics import column_heights, estimate_height, estimate_margin, px_to_pt
+
+    module = load_template(template)
+    css_builder = get_css_builder(template)
+    data = synthetic_resume(size)
+    html_content = module.generate_resume_html(data)
+    buffer, increment = module.fit_params(data)
+
+    estimate_height(html_content, template)  # load the font once, outside the timing
+    start = time.perf_counter()
+    for _ in range(repeat):
+        estimate = estimate_height(html_content, template)
+    estimate_us = (time.perf_counter() - start) * 1e6 / repeat
+
+    truth = true_height(html_content, css_builder)
+    if truth is None:
+        return None
+    buffer_renders, buffer_height = search_cost(predict_height(buffer), truth, increment, module.max_attempts)
+    metrics_renders, metrics_height = search_cost(max(estimate * (1 - estimate_margin), min_height), truth, increment, module.max_attempts)
+    return {
+        "template": template,
+        "size": size,
+        "true_pt": round(truth, 1),
+        "estimate_pt": round(estimate, 1),
+        "error_pct": round((estimate - truth) / truth * 100, 2),
+        "estimate_us": round(estimate_us, 1),
+        "tallest_column_px": max(column_heights(html_content, template).values(), default=0),
+        "true_px": truth / px_to_pt,
+        "buffer_renders": buffer_renders,
+        "buffer_whitespace_pt": round(buffer_height - truth, 1),
+        "metrics_renders": metrics_renders,
+        "metrics_whitespace_pt": round(metrics_height - truth, 1),
+    }
+
+def main(argv=None):
+    from utils.text_metrics import profiles as estimator_profiles
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--templates", default=",".join(estimator_profiles))
+    parser.add_argument("--sizes", default=",".join(profiles))
+    parser.add_argument("--repeat", type=int, default=200, help="estimator calls timed per case")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+    templates, sizes = args.templates.split(","), args.sizes.split(",")
+    unknown = [t for t in templates if t not in estimator_profiles] + [s for s in sizes if s not in profiles]
+    if unknown:
+        parser.error(f"no estimator profile or corpus profile for: {unknown}")
+
+    print(f"{'case':<22} {'true pt':>8} {'est pt':>8} {'err %':>7} {'est µs':>8} {'renders buf/est':>16} {'slack buf/est pt':>17}")
+    results, suggestions = [], {}
+    for template in templates:
+        cases = [case for case in (run_case(template, size, args.repeat) for size in sizes) if case]
+        for case in cases:
+            print(f"{template + ':' + case['size']:<22} {case['true_pt']:>8} {case['estimate_pt']:>8} {case['error_pct']:>7} "
+                  f"{case['estimate_us']:>8} {case['buffer_renders']:>7}/{case['metrics_renders']:<8} "
+                  f"{case['buffer_whitespace_pt']:>8}/{case['metrics_whitespace_pt']:<8}")
+        results += cases
+        suggestions[template] = fit_profile([(case["tallest_column_px"], case["true_px"]) for case in cases])
+
+    if results:
+        errors = [abs(case["error_pct"]) for case in results]
+        print(f"\nmean |error| {statistics.fmean(errors):.2f}%  max |error| {max(errors):.2f}%  "
+              f"renders {sum(c['buffer_renders'] for c in results)} (buffer) vs {sum(c['metrics_renders'] for c in results)} (estimate)")
+    print("\nsuggested profile values (fixed px, scale):")
+    for template, suggestion in suggestions.items():
+        print(f"  {template:<12} {suggestion or 'need two sizes with different text heights'}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"results": results, "suggested_profiles": suggestions}, f, indent=2)
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Micro-benchmark of generate_resume_html as section lists grow.
+
+Builds resumes with N entries in every list section (experience, projects, education,
+certifications, references, awards, skills) and times HTML assembly alone, without any
+layout. With linear assembly the time per entry stays flat as N grows; the scaling
+column is (time per entry at the largest N) / (time per entry at the smallest N).
+
+    python -m benchmarks.bench_html
+    python -m benchmarks.bench_html --entries 10,100,1000,5000 --templates zeus,cigar --output html.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import generate_resume
+
+# sections whose length is unbounded; languages, socials and interests are drawn from small fixed vocabularies
+list_sections = ("experience", "projects", "education", "certifications", "references", "awards", "skills")
+
+def scaled_resume(entries, seed=0):
+    """A resume with exactly `entries` items in every list section"""
+    profile = {section: (entries, entries) for section in list_sections}
+    profile.update({"languages": (3, 3), "socials": (3, 3), "interests": (3, 3), "keywords": (5, 5), "desc_words": (40, 40)})
+    return generate_resume(random.Random(seed), profile, f"html-{entries}", html_list_ratio=0.5, unicode_ratio=0.0)
+
+def time_html(module, resume, repeat):
+    """Best of `repeat` runs, in milliseconds"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        module.generate_resume_html(resume)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def run(templates, entry_counts, repeat):
+    from utils.templates import load_template
+
+    resumes = {entries: scaled_resume(entries) for entries in entry_counts}
+    results = []
+    for template in templates:
+        module = load_template(template)
+        rows = []
+        for entries in entry_counts:
+            html_ms = time_html(module, resumes[entries], repeat)
+            rows.append({"entries": entries, "html_ms": round(html_ms, 3), "us_per_entry": round(html_ms * 1000 / entries, 3)})
+        scaling = rows[-1]["us_per_entry"] / rows[0]["us_per_entry"] if rows[0]["us_per_entry"] else None
+        results.append({"template": template, "rows": rows, "scaling": round(scaling, 2) if scaling else None})
+    return results
+
+def main(argv=None):
+    from utils.templates import template_names
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--templates", default=",".join(template_names()))
+    parser.add_argument("--entries", default="10,100,1000,5000", help="comma-separated entries per list section")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    entry_counts = sorted(int(n) for n in args.entries.split(","))
+    results = run(args.templates.split(","), entry_counts, args.repeat)
+
+    print(f"{'template':<10} " + " ".join(f"{n:>10}" for n in entry_counts) + "   us/entry  scaling")
+    for result in results:
+        per_entry = " ".join(f"{row['html_ms']:>8.2f}ms" for row in result["rows"])
+        print(f"{result['template']:<10} {per_entry}   {result['rows'][-1]['us_per_entry']:>8.2f}  {result['scaling']}x")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"entries": entry_counts, "repeat": args.repeat, "results": results}, f, indent=2)
+    return results
+
+if __name__ == "__main__":
+    main()
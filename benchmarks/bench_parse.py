@@ -0,0 +1,87 @@
+"""
+How much of a PDF request went to re-parsing the same HTML.
+
+For each template and resume this times one HTML parse and one layout pass over an
+already parsed tree, and counts the layout passes the fitted path needs (height search
+plus write_pdf). Before utils.helper.parse_html every pass parsed the markup again;
+now a request parses it once. The report shows the parse time removed and its share
+of the old parse + layout total.
+
+    python -m benchmarks.bench_parse
+    python -m benchmarks.bench_parse --templates zeus,cigar --sizes mid,max --output parse.json
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_templates import _run_once, synthetic_resume
+from benchmarks.corpus import profiles
+from benchmarks.stubs import FakeRedis, FakeSupabase
+
+def _median_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+def measure(app, template, label, resume, repeat):
+    from weasyprint import HTML, CSS
+    from utils.templates import get_css_builder, load_template
+
+    html_content = load_template(template).generate_resume_html(resume)
+    css = CSS(string=get_css_builder(template)(dynamic_height=1009))
+    parsed = HTML(string=html_content)
+
+    parse_ms = _median_ms(lambda: HTML(string=html_content), repeat)
+    layout_ms = _median_ms(lambda: parsed.render(stylesheets=[css]), repeat)
+    passes = _run_once(app, template, resume)["renders"] + 1  # + the write_pdf layout
+
+    before_ms = passes * (parse_ms + layout_ms)
+    removed_ms = (passes - 1) * parse_ms
+    return {
+        "template": template,
+        "resume": label,
+        "passes": passes,
+        "parse_ms": round(parse_ms, 3),
+        "layout_ms": round(layout_ms, 3),
+        "removed_ms": round(removed_ms, 3),
+        "removed_share": round(removed_ms / before_ms, 4) if before_ms else 0.0,
+    }
+
+def main(argv=None):
+    from main import create_app
+    from utils.templates import template_names
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--templates", default=",".join(template_names()))
+    parser.add_argument("--sizes", default=",".join(profiles))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+    app = create_app(redis_client=FakeRedis(), supabase=FakeSupabase())
+
+    results = []
+    for template in args.templates.split(","):
+        for size in args.sizes.split(","):
+            result = measure(app, template, size, synthetic_resume(size), args.repeat)
+            results.append(result)
+            print(f"{template:<10} {size:<10} passes={result['passes']:<3} parse={result['parse_ms']:.1f}ms "
+                  f"layout={result['layout_ms']:.1f}ms removed={result['removed_ms']:.1f}ms ({result['removed_share']:.1%})")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"repeat": args.repeat, "results": results}, f, indent=2)
+    return results
+
+if __name__ == "__main__":
+    main()
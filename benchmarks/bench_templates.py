@@ -0,0 +1,156 @@
+"""
+Benchmark every template over a corpus of synthetic resumes (see benchmarks/corpus.py).
+
+Drives the real generate_pdf view with in-process Redis/Supabase stand-ins and
+records, per template and resume: wall time, per-stage timings (HTML, CSS
+builder, layout passes, write_pdf), render count, peak RSS and PDF size.
+
+    python -m benchmarks.bench_templates --repeat 3 --output bench.json
+    python -m benchmarks.bench_templates --layout letter   # paginated output, no height search
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# the local PDF disk cache outlives the run and would turn every repeat into a render-free hit;
+# set before anything imports utils.disk_cache, and inherited by the isolated case processes
+os.environ["PDF_DISK_CACHE_BYTES"] = "0"
+# likewise the per-process section HTML cache, so repeats of one resume still build every section
+os.environ["FRAGMENT_CACHE_SIZE"] = "0"
+
+from benchmarks.corpus import generate_resume, load_corpus, profiles
+from benchmarks.stubs import FakeRedis, FakeSupabase
+
+def synthetic_resume(size, seed=0, unicode_ratio=0.0):
+    """One deterministic resume of a corpus profile (intern ... max)"""
+    rng = random.Random(f"{size}-{seed}")
+    return generate_resume(rng, profiles[size], f"bench-{size}-{seed}", html_list_ratio=0.5, unicode_ratio=unicode_ratio)
+
+def _layout_query(layout):
+    return "" if layout == "fitted" else f"?layout=paginated&page={layout}"
+
+def _run_once(app, template, resume, layout="fitted"):
+    from flask import g
+    from utils.templates import get_css_builder, load_template
+
+    module = load_template(template)
+    css_builder = get_css_builder(template)
+    app.redis_client.flushall()
+
+    css_start = time.perf_counter()
+    for _ in range(20):
+        css_builder(dynamic_height=1009)
+    css_ms = (time.perf_counter() - css_start) * 1000 / 20
+
+    with app.test_request_context(f"/api/pdf/{template}/generate{_layout_query(layout)}", method="POST", json=resume):
+        start = time.perf_counter()
+        response = app.make_response(module.generate_pdf())
+        wall_ms = (time.perf_counter() - start) * 1000
+        timings = g.get("timings") or {"spans": {}, "renders": 0}
+
+    pdf_bytes = sum(len(obj) for path, obj in app.supabase.storage.objects.items() if path.endswith(".pdf"))
+    app.supabase.storage.objects.clear()
+    return {
+        "status": response.status_code,
+        "wall_ms": wall_ms,
+        "html_ms": timings["spans"].get("html", 0),
+        "css_ms": css_ms,
+        "render_ms": timings["spans"].get("render", 0),
+        "write_pdf_ms": timings["spans"].get("write_pdf", 0),
+        "renders": timings["renders"],
+        "pdf_bytes": pdf_bytes,
+    }
+
+def run_case(template, label, resume, repeat, layout="fitted"):
+    """Benchmark one (template, resume) pair; the median of `repeat` runs is reported"""
+    from main import create_app
+
+    # the controllers log every layout pass at INFO; keep benchmark output readable
+    logging.disable(logging.INFO)
+    app = create_app(redis_client=FakeRedis(), supabase=FakeSupabase())
+
+    # warm fonts and stylesheets so the first measured run is not a cold start
+    _run_once(app, template, synthetic_resume("intern", seed=-1), layout)
+    baseline_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    runs = [_run_once(app, template, resume, layout) for _ in range(repeat)]
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    result = {"template": template, "resume": label}
+    for field in ("wall_ms", "html_ms", "css_ms", "render_ms", "write_pdf_ms"):
+        result[field] = round(statistics.median(run[field] for run in runs), 3)
+    result["renders"] = runs[-1]["renders"]
+    result["pdf_bytes"] = runs[-1]["pdf_bytes"]
+    result["status"] = runs[-1]["status"]
+    result["peak_rss_kb"] = peak_rss_kb
+    result["rss_growth_kb"] = peak_rss_kb - baseline_rss_kb
+    return result
+
+def run_benchmarks(templates, corpus, repeat=3, isolate=True, layout="fitted"):
+    """Run every case; with isolate, each case gets a fresh process so peak RSS is per case"""
+    cases = [(template, label, resume) for template in templates for label, resume in corpus]
+    results = []
+    if not isolate:
+        for case in cases:
+            results.append(run_case(*case, repeat, layout))
+            _print_row(results[-1])
+        return results
+
+    for case in cases:
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            results.append(pool.submit(run_case, *case, repeat, layout).result())
+        _print_row(results[-1])
+    return results
+
+def _print_row(result):
+    print(
+        f"{result['template']:<10} {result['resume']:<16} {result['wall_ms']:>9.1f}ms "
+        f"renders={result['renders']:<3} html={result['html_ms']:.1f}ms render={result['render_ms']:.1f}ms "
+        f"write={result['write_pdf_ms']:.1f}ms rss={result['peak_rss_kb'] // 1024}MB pdf={result['pdf_bytes'] // 1024}KB"
+    )
+
+def main(argv=None):
+    from utils.templates import template_names
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--templates", default=",".join(template_names()), help="comma-separated template names")
+    parser.add_argument("--sizes", default=",".join(profiles), help="comma-separated corpus profiles, one resume each")
+    parser.add_argument("--corpus", help="JSONL corpus from benchmarks.corpus (overrides --sizes)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--layout", choices=("fitted", "letter", "legal"), default="fitted", help="single fitted page or paginated output")
+    parser.add_argument("--no-isolate", action="store_true", help="run every case in this process (peak RSS becomes cumulative)")
+    args = parser.parse_args(argv)
+
+    if args.corpus:
+        corpus = load_corpus(args.corpus)
+    else:
+        corpus = [(size, synthetic_resume(size)) for size in args.sizes.split(",")]
+    results = run_benchmarks(args.templates.split(","), corpus, args.repeat, isolate=not args.no_isolate, layout=args.layout)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "repeat": args.repeat,
+            "layout": args.layout,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+if __name__ == "__main__":
+    main()
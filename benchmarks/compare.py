@@ -0,0 +1,124 @@
+"""
+Compare two bench_templates result files and flag per-template regressions.
+
+Prints a JSON report and exits with status 1 when any template regressed beyond
+its threshold, so it can gate CI:
+
+    python -m benchmarks.compare baseline.json bench.json
+    python -m benchmarks.compare baseline.json bench.json --latency 0.2 --renders 1 --output compare.json
+"""
+import argparse
+import json
+import statistics
+import sys
+
+def load_results(path):
+    with open(path) as f:
+        report = json.load(f)
+    return {(result["template"], result["resume"]): result for result in report["results"]}
+
+def _aggregate(cases):
+    """Per-template figures: median latency, total layout passes, peak memory, total PDF bytes"""
+    return {
+        "wall_ms": statistics.median(case["wall_ms"] for case in cases),
+        "renders": sum(case["renders"] for case in cases),
+        "peak_rss_kb": max(case["peak_rss_kb"] for case in cases),
+        "pdf_bytes": sum(case["pdf_bytes"] for case in cases),
+    }
+
+def _relative_change(before, after):
+    if not before:
+        return 0.0 if not after else float("inf")
+    return (after - before) / before
+
+def compare(baseline, current, latency=0.10, latency_floor_ms=5.0, renders=0, memory=0.15, size=0.10):
+    """
+    latency, memory and size are allowed relative increases (0.10 = +10%);
+    renders is the allowed absolute increase in total layout passes per template.
+    Latency changes smaller than latency_floor_ms are treated as noise.
+    """
+    shared = sorted(set(baseline) & set(current))
+    templates = sorted({template for template, _ in shared})
+    report = {
+        "thresholds": {"latency": latency, "latency_floor_ms": latency_floor_ms, "renders": renders, "memory": memory, "size": size},
+        "missing_in_current": sorted(f"{t}/{r}" for t, r in set(baseline) - set(current)),
+        "new_in_current": sorted(f"{t}/{r}" for t, r in set(current) - set(baseline)),
+        "templates": {},
+        "regressions": [],
+    }
+
+    for template in templates:
+        keys = [key for key in shared if key[0] == template]
+        before = _aggregate([baseline[key] for key in keys])
+        after = _aggregate([current[key] for key in keys])
+
+        checks = {
+            "latency": (
+                _relative_change(before["wall_ms"], after["wall_ms"]) > latency
+                and after["wall_ms"] - before["wall_ms"] > latency_floor_ms
+            ),
+            "renders": after["renders"] - before["renders"] > renders,
+            "memory": _relative_change(before["peak_rss_kb"], after["peak_rss_kb"]) > memory,
+            "size": _relative_change(before["pdf_bytes"], after["pdf_bytes"]) > size,
+        }
+        cases = [
+            {
+                "resume": key[1],
+                "wall_ms": [baseline[key]["wall_ms"], current[key]["wall_ms"]],
+                "renders": [baseline[key]["renders"], current[key]["renders"]],
+                "pdf_bytes": [baseline[key]["pdf_bytes"], current[key]["pdf_bytes"]],
+            }
+            for key in keys
+            if current[key]["renders"] != baseline[key]["renders"]
+            or _relative_change(baseline[key]["wall_ms"], current[key]["wall_ms"]) > latency
+        ]
+
+        report["templates"][template] = {
+            "baseline": before,
+            "current": after,
+            "change": {
+                "wall_ms": round(_relative_change(before["wall_ms"], after["wall_ms"]), 4),
+                "renders": after["renders"] - before["renders"],
+                "peak_rss_kb": round(_relative_change(before["peak_rss_kb"], after["peak_rss_kb"]), 4),
+                "pdf_bytes": round(_relative_change(before["pdf_bytes"], after["pdf_bytes"]), 4),
+            },
+            "regressed": sorted(metric for metric, failed in checks.items() if failed),
+            "changed_cases": cases,
+        }
+        for metric, failed in checks.items():
+            if failed:
+                report["regressions"].append({"template": template, "metric": metric})
+
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--latency", type=float, default=0.10, help="allowed relative increase in median wall time")
+    parser.add_argument("--latency-floor-ms", type=float, default=5.0, help="ignore latency changes smaller than this")
+    parser.add_argument("--renders", type=int, default=0, help="allowed increase in total layout passes per template")
+    parser.add_argument("--memory", type=float, default=0.15, help="allowed relative increase in peak RSS")
+    parser.add_argument("--size", type=float, default=0.10, help="allowed relative increase in total PDF bytes")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    report = compare(
+        load_results(args.baseline),
+        load_results(args.current),
+        latency=args.latency,
+        latency_floor_ms=args.latency_floor_ms,
+        renders=args.renders,
+        memory=args.memory,
+        size=args.size,
+    )
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    return 1 if report["regressions"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+"""
+Seeded generator of synthetic resumes matching the schema the controllers read.
+
+The same seed and options always give the same corpus. Section counts, description
+lengths, the share of HTML-list vs. plain-text descriptions and the share of
+non-ASCII content are all controllable.
+
+    python -m benchmarks.corpus --count 500 --profile mixed --seed 7 --output corpus.jsonl
+    python -m benchmarks.corpus --count 50 --profile principal --unicode-ratio 0.5 --output long.jsonl
+"""
+import argparse
+import json
+import random
+import sys
+
+_words = (
+    "designed built led shipped scaled migrated automated reduced improved mentored "
+    "platform service pipeline latency throughput customers revenue api database cloud "
+    "kubernetes python react analytics dashboard reliability cost team roadmap stakeholders "
+    "launched integrated optimised refactored tested monitored observability security"
+).split()
+
+# Non-ASCII vocabulary: accents, Cyrillic, Greek, CJK, RTL and emoji, to exercise font fallback and shaping
+_unicode_words = (
+    "café naïve São Paulo Zürich Łódź señor Ελλάδα Москва разработка 東京 開発者 서울 "
+    "데이터 مهندس برمجيات 🚀 ✅ 数据平台 Ünïcødé"
+).split()
+
+_first_names = ["Jordan", "Alex", "Maria", "Wei", "Aisha", "Mateo", "Sofía", "Łukasz", "Ngozi", "Haruto"]
+_last_names = ["Santos", "Reyes", "Chen", "Okafor", "Müller", "Kowalski", "Nakamura", "García", "Ivanova", "Haddad"]
+_technologies = ["Python", "Flask", "Redis", "PostgreSQL", "React", "TypeScript", "Go", "AWS", "Docker", "Kafka", "Terraform"]
+_socials = ["github", "linkedin", "x-twitter", "dribbble", "medium"]
+
+# profile -> per-section (min, max) counts, description words (min, max)
+profiles = {
+    "intern": {
+        "experience": (0, 1), "projects": (1, 3), "education": (1, 1), "certifications": (0, 1),
+        "references": (0, 1), "awards": (0, 1), "languages": (1, 2), "socials": (1, 2),
+        "interests": (2, 4), "skills": (1, 2), "keywords": (4, 8), "desc_words": (15, 40),
+    },
+    "junior": {
+        "experience": (1, 3), "projects": (2, 3), "education": (1, 2), "certifications": (0, 2),
+        "references": (0, 2), "awards": (0, 1), "languages": (1, 2), "socials": (1, 3),
+        "interests": (2, 5), "skills": (1, 3), "keywords": (4, 10), "desc_words": (25, 60),
+    },
+    "mid": {
+        "experience": (3, 6), "projects": (2, 4), "education": (1, 2), "certifications": (1, 3),
+        "references": (1, 3), "awards": (0, 2), "languages": (1, 3), "socials": (2, 3),
+        "interests": (2, 5), "skills": (2, 4), "keywords": (5, 12), "desc_words": (40, 90),
+    },
+    "senior": {
+        "experience": (6, 12), "projects": (3, 5), "education": (1, 3), "certifications": (2, 5),
+        "references": (2, 4), "awards": (1, 3), "languages": (2, 3), "socials": (2, 4),
+        "interests": (3, 6), "skills": (3, 5), "keywords": (6, 14), "desc_words": (60, 120),
+    },
+    "principal": {
+        "experience": (20, 30), "projects": (4, 8), "education": (2, 3), "certifications": (4, 8),
+        "references": (3, 5), "awards": (2, 5), "languages": (2, 4), "socials": (3, 5),
+        "interests": (3, 6), "skills": (4, 6), "keywords": (8, 16), "desc_words": (100, 220),
+    },
+    # worst case we accept: 30 jobs with long descriptions (not part of "mixed")
+    "max": {
+        "experience": (30, 30), "projects": (8, 8), "education": (3, 3), "certifications": (8, 8),
+        "references": (5, 5), "awards": (5, 5), "languages": (4, 4), "socials": (5, 5),
+        "interests": (6, 6), "skills": (6, 6), "keywords": (16, 16), "desc_words": (200, 220),
+    },
+}
+
+# weights used by the "mixed" profile, roughly the shape of real traffic
+mixed_weights = {"intern": 0.2, "junior": 0.3, "mid": 0.3, "senior": 0.15, "principal": 0.05}
+
+def _count(rng, bounds):
+    low, high = bounds
+    return rng.randint(low, high)
+
+def _text(rng, words, unicode_ratio):
+    picked = [rng.choice(_unicode_words) if rng.random() < unicode_ratio else rng.choice(_words) for _ in range(max(words, 1))]
+    return " ".join(picked).capitalize() + "."
+
+def _description(rng, words, html_list_ratio, unicode_ratio):
+    """An HTML bullet list or plain text with newlines, the two shapes format_description handles"""
+    bullets = max(1, min(6, words // 20))
+    per_bullet = max(4, words // bullets)
+    lines = [_text(rng, per_bullet, unicode_ratio) for _ in range(bullets)]
+    if rng.random() < html_list_ratio:
+        return "<ul>" + "".join(f"<li>{line}</li>" for line in lines) + "</ul>"
+    return "\n".join(lines)
+
+def _date(rng, year_low=2005, year_high=2024):
+    return f"{rng.randint(year_low, year_high):04d}-{rng.randint(1, 12):02d}"
+
+def generate_resume(rng, profile, resume_id, html_list_ratio=0.5, unicode_ratio=0.05):
+    """Generate one resume from a profile of section-count and description-length ranges"""
+    desc_low, desc_high = profile["desc_words"]
+
+    def desc():
+        return _description(rng, rng.randint(desc_low, desc_high), html_list_ratio, unicode_ratio)
+
+    def reference(i):
+        email = f"ref{i}@example.com" if rng.random() < 0.8 else ""
+        phone = "+63 900 000 0000" if rng.random() < 0.5 else ""
+        return {
+            "name": f"{rng.choice(_first_names)} {rng.choice(_last_names)}",
+            "title": _text(rng, 2, unicode_ratio).rstrip("."),
+            "company": f"{rng.choice(_last_names)} Inc.",
+            "email": email,
+            "phone": phone,
+            # free text; cigar, milky_way and zeus render it instead of email and phone
+            "contact": "\n".join(line for line in (email, phone) if line) or "Available on request",
+        }
+
+    def award():
+        summary = _text(rng, rng.randint(10, 30), unicode_ratio)
+        # andromeda reads description, the other templates summary
+        return {"title": _text(rng, 3, unicode_ratio).rstrip("."), "date": _date(rng), "summary": summary, "description": summary}
+
+    name = f"{rng.choice(_first_names)} {rng.choice(_last_names)}"
+    jobs = _count(rng, profile["experience"])
+    return {
+        "personal": {
+            "name": name,
+            "headline": _text(rng, 3, unicode_ratio).rstrip("."),
+            "email": f"{resume_id}@example.com",
+            "phone": "+63 917 000 0000" if rng.random() < 0.7 else "",
+            "location": rng.choice(["Manila, PH", "Berlin, DE", "São Paulo, BR", "東京, JP", "Austin, US"]),
+            "website": {"name": f"{name.split()[0].lower()}.dev", "link": f"https://{resume_id}.example.dev"},
+        },
+        "summary": _text(rng, rng.randint(desc_low, desc_high), unicode_ratio),
+        "experience": [
+            {
+                "title": _text(rng, 2, unicode_ratio).rstrip("."),
+                "company": f"{rng.choice(_last_names)} {rng.choice(['Labs', 'Systems', 'GmbH', 'Inc.'])}",
+                "startDate": _date(rng),
+                "endDate": "" if i == 0 and rng.random() < 0.6 else _date(rng),
+                "description": desc(),
+            }
+            for i in range(jobs)
+        ],
+        "projects": [
+            {
+                "title": _text(rng, 2, unicode_ratio).rstrip("."),
+                "technologies": rng.sample(_technologies, rng.randint(1, 4)),
+                "description": desc(),
+            }
+            for _ in range(_count(rng, profile["projects"]))
+        ],
+        "education": [
+            {
+                "degree": rng.choice(["BSc Computer Science", "MSc Data Science", "BA Economics", "PhD Physics"]),
+                "institution": f"University of {rng.choice(_last_names)}",
+                "startDate": _date(rng, 2000, 2016),
+                "endDate": _date(rng, 2004, 2020),
+            }
+            for _ in range(_count(rng, profile["education"]))
+        ],
+        "skills": [
+            {"name": _text(rng, 1, 0).rstrip("."), "keywords": rng.sample(_technologies, min(len(_technologies), _count(rng, profile["keywords"])))}
+            for _ in range(_count(rng, profile["skills"]))
+        ],
+        "certifications": [
+            {"name": _text(rng, 3, unicode_ratio).rstrip("."), "issuingOrganization": rng.choice(["AWS", "Google", "CNCF"]), "date": _date(rng)}
+            for _ in range(_count(rng, profile["certifications"]))
+        ],
+        "references": [reference(i) for i in range(_count(rng, profile["references"]))],
+        "awards": [award() for _ in range(_count(rng, profile["awards"]))],
+        "languages": rng.sample(["English", "Filipino", "Deutsch", "Español", "日本語", "العربية"], _count(rng, profile["languages"])),
+        "socials": [
+            {"slug": slug, "name": slug.capitalize(), "link": f"https://{slug}.com/{resume_id}"}
+            for slug in rng.sample(_socials, _count(rng, profile["socials"]))
+        ],
+        "interests": [_text(rng, 1, unicode_ratio).rstrip(".") for _ in range(_count(rng, profile["interests"]))],
+    }
+
+def generate_corpus(count, profile="mixed", seed=0, html_list_ratio=0.5, unicode_ratio=0.05):
+    """Yield (id, profile name, resume) tuples; the output depends only on the arguments"""
+    rng = random.Random(seed)
+    for i in range(count):
+        if profile == "mixed":
+            name = rng.choices(list(mixed_weights), weights=list(mixed_weights.values()))[0]
+        else:
+            name = profile
+        resume_id = f"{name}-{seed}-{i:05d}"
+        yield resume_id, name, generate_resume(rng, profiles[name], resume_id, html_list_ratio, unicode_ratio)
+
+def write_jsonl(records, output):
+    for resume_id, profile, resume in records:
+        output.write(json.dumps({"id": resume_id, "profile": profile, "resume": resume}, ensure_ascii=False) + "\n")
+
+def load_corpus(path):
+    """Read a JSONL corpus as a list of (id, resume) pairs"""
+    corpus = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                corpus.append((record["id"], record["resume"]))
+    return corpus
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--profile", default="mixed", choices=["mixed", *profiles])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--html-list-ratio", type=float, default=0.5, help="share of descriptions written as <ul> lists")
+    parser.add_argument("--unicode-ratio", type=float, default=0.05, help="share of words drawn from the non-ASCII vocabulary")
+    parser.add_argument("--output", help="JSONL file to write (default: stdout)")
+    args = parser.parse_args(argv)
+
+    records = generate_corpus(args.count, args.profile, args.seed, args.html_list_ratio, args.unicode_ratio)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            write_jsonl(records, f)
+    else:
+        write_jsonl(records, sys.stdout)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Fake Upstash Redis REST server backed by benchmarks.stubs.FakeRedis.
+
+Speaks enough of the Upstash REST protocol (single commands and /pipeline, optional
+base64 response encoding) for the real upstash_redis client, so several gunicorn
+workers can share one cache during load tests.
+
+    python -m benchmarks.fake_upstash --port 8079
+    UPSTASH_REDIS_URL=http://127.0.0.1:8079 UPSTASH_REDIS_TOKEN=dev gunicorn 'main:create_app()'
+"""
+import argparse
+import base64
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stubs import FakeRedis
+
+def execute(redis, command):
+    name, args = command[0].upper(), command[1:]
+    if name == "PING":
+        return "PONG"
+    if name == "GET":
+        return redis.get(args[0])
+    if name == "GETEX":
+        options = [str(arg).upper() for arg in args[1:]]
+        return redis.getex(args[0], ex=int(args[1 + options.index("EX") + 1]) if "EX" in options else None)
+    if name == "SET":
+        ex = None
+        options = [str(arg).upper() for arg in args[2:]]
+        if "EX" in options:
+            ex = int(args[2 + options.index("EX") + 1])
+        return "OK" if redis.set(args[0], args[1], ex=ex, nx="NX" in options) else None
+    if name == "DEL":
+        return redis.delete(*args)
+    if name == "ZADD":
+        pairs = [arg for arg in args[1:] if str(arg).upper() not in ("NX", "XX", "GT", "LT", "CH", "INCR")]
+        return redis.zadd(args[0], {str(pairs[i + 1]): float(pairs[i]) for i in range(0, len(pairs), 2)})
+    if name == "ZRANGE":
+        return redis.zrange(args[0], int(args[1]), int(args[2]), rev="REV" in [str(arg).upper() for arg in args[3:]])
+    if name == "ZREMRANGEBYRANK":
+        return redis.zremrangebyrank(args[0], int(args[1]), int(args[2]))
+    if name == "SCAN":
+        options = [str(arg).upper() for arg in args[1:]]
+        match = args[1 + options.index("MATCH") + 1] if "MATCH" in options else None
+        cursor, keys = redis.scan(int(args[0]), match=match)
+        return [str(cursor), keys]
+    if name == "TYPE":
+        return redis.type(args[0])
+    if name == "STRLEN":
+        return redis.strlen(args[0])
+    if name == "ZCARD":
+        return redis.zcard(args[0])
+    if name == "KEYS":
+        return redis.keys(args[0])
+    if name == "FLUSHALL":
+        redis.flushall()
+        return "OK"
+    raise ValueError(f"ERR unknown command '{name}'")
+
+def _encode(result):
+    if isinstance(result, str):
+        return result if result == "OK" else base64.b64encode(result.encode()).decode()
+    if isinstance(result, list):
+        return [_encode(item) for item in result]
+    return result
+
+def make_handler(redis):
+    class UpstashHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _run(self, command):
+            try:
+                result = execute(redis, command)
+            except Exception as e:
+                return {"error": str(e)}
+            if self.headers.get("Upstash-Encoding") == "base64":
+                result = _encode(result)
+            return {"result": result}
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"[]")
+            if self.path.rstrip("/") in ("/pipeline", "/multi-exec"):
+                payload = [self._run(command) for command in body]
+            else:
+                payload = self._run(body)
+            data = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return UpstashHandler
+
+def serve(port=0, redis=None):
+    """Start the server on a background thread; returns (server, url)"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(redis or FakeRedis()))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8079)
+    args = parser.parse_args(argv)
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(FakeRedis()))
+    print(f"Fake Upstash listening on http://127.0.0.1:{args.port}")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Closed-loop HTTP load test against the real app with local Redis and storage stand-ins.
+
+Each of --concurrency clients sends its next request as soon as the previous one
+answers. A --hit-ratio share of requests replays a payload that already completed
+(a cache hit); the rest are new payloads that force a render.
+
+    # in-process threaded server (FakeRedis + local disk storage)
+    python -m benchmarks.loadtest --corpus corpus.jsonl --concurrency 16 --duration 60 --hit-ratio 0.5
+
+    # gunicorn workers sharing a fake Upstash REST server
+    python -m benchmarks.loadtest --corpus corpus.jsonl --gunicorn "-w 4 -k gevent" --concurrency 64
+
+    # any already running server
+    python -m benchmarks.loadtest --corpus corpus.jsonl --url http://127.0.0.1:5000
+"""
+import argparse
+import copy
+import json
+import os
+import random
+import shlex
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# misses must render: keep the local PDF disk cache (shared across runs) out of the picture,
+# for the in-process server and the gunicorn workers, which inherit this environment
+os.environ["PDF_DISK_CACHE_BYTES"] = "0"
+# likewise the per-process section HTML cache, so repeats of one resume still build every section
+os.environ["FRAGMENT_CACHE_SIZE"] = "0"
+
+from benchmarks.corpus import generate_corpus, load_corpus
+from benchmarks.stubs import FakeRedis
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def start_inprocess_server():
+    """Serve create_app() with FakeRedis and local disk storage on a background thread"""
+    from werkzeug.serving import make_server
+    from main import create_app
+    from utils.local_storage import LocalSupabase
+
+    app = create_app(redis_client=FakeRedis(), supabase=LocalSupabase(tempfile.mkdtemp(prefix="resumeforge-load-")))
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server.shutdown
+
+def start_gunicorn(gunicorn_args, port=8089):
+    """Run gunicorn workers that share one fake Upstash server and one local storage dir"""
+    from benchmarks.fake_upstash import serve
+
+    upstash, upstash_url = serve()
+    env = dict(
+        os.environ,
+        UPSTASH_REDIS_URL=upstash_url,
+        UPSTASH_REDIS_TOKEN="loadtest",
+        STORAGE_BACKEND="local",
+        LOCAL_STORAGE_DIR=tempfile.mkdtemp(prefix="resumeforge-load-"),
+    )
+    command = ["gunicorn", *shlex.split(gunicorn_args), "-b", f"127.0.0.1:{port}", "main:create_app()"]
+    process = subprocess.Popen(command, env=env, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    def stop():
+        process.terminate()
+        process.wait(timeout=30)
+        upstash.shutdown()
+
+    return f"http://127.0.0.1:{port}", stop
+
+def wait_until_ready(base_url, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{base_url}/check", timeout=2).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"Server at {base_url} did not become ready within {timeout}s")
+
+class LoadTest:
+    def __init__(self, base_url, corpus, templates, hit_ratio, seed=0):
+        self.base_url = base_url
+        self.corpus = corpus
+        self.templates = templates
+        self.hit_ratio = hit_ratio
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.completed = []  # (template, payload) pairs that rendered successfully
+        self.samples = []  # (template, expected_hit, latency_s, status)
+        self.sequence = 0
+
+    def next_request(self):
+        with self.lock:
+            if self.completed and self.rng.random() < self.hit_ratio:
+                template, payload = self.rng.choice(self.completed)
+                return template, payload, True
+
+            self.sequence += 1
+            sequence = self.sequence
+            resume_id, resume = self.corpus[sequence % len(self.corpus)]
+            template = self.templates[sequence % len(self.templates)]
+
+        # a fresh email makes the payload unique, so it must be rendered
+        payload = copy.deepcopy(resume)
+        payload.setdefault("personal", {})["email"] = f"load-{sequence}-{resume_id}@example.com"
+        return template, payload, False
+
+    def client(self, deadline, max_requests):
+        session = requests.Session()
+        while time.time() < deadline:
+            with self.lock:
+                if max_requests and len(self.samples) >= max_requests:
+                    return
+            template, payload, expected_hit = self.next_request()
+            start = time.perf_counter()
+            try:
+                response = session.post(f"{self.base_url}/api/pdf/{template}/generate", json=payload, allow_redirects=False, timeout=300)
+                status = response.status_code
+            except requests.RequestException:
+                status = 0
+            latency = time.perf_counter() - start
+            with self.lock:
+                self.samples.append((template, expected_hit, latency, status))
+                if 0 < status < 400 and not expected_hit:
+                    self.completed.append((template, payload))
+
+    def run(self, concurrency, duration, max_requests=None):
+        deadline = time.time() + duration
+        start = time.perf_counter()
+        threads = [threading.Thread(target=self.client, args=(deadline, max_requests)) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.report(time.perf_counter() - start, concurrency)
+
+    def report(self, elapsed, concurrency):
+        def summarize(samples):
+            latencies = sorted(sample[2] for sample in samples)
+            errors = sum(1 for sample in samples if not 0 < sample[3] < 400)
+            return {
+                "requests": len(samples),
+                "errors": errors,
+                "replayed": sum(1 for sample in samples if sample[1]),
+                "throughput_rps": round(len(samples) / elapsed, 3) if elapsed else 0,
+                "p50_ms": round(percentile(latencies, 50) * 1000, 1) if latencies else None,
+                "p95_ms": round(percentile(latencies, 95) * 1000, 1) if latencies else None,
+                "p99_ms": round(percentile(latencies, 99) * 1000, 1) if latencies else None,
+            }
+
+        return {
+            "concurrency": concurrency,
+            "hit_ratio": self.hit_ratio,
+            "elapsed_s": round(elapsed, 3),
+            "overall": summarize(self.samples),
+            "templates": {
+                template: summarize([sample for sample in self.samples if sample[0] == template])
+                for template in self.templates
+            },
+        }
+
+def print_report(report):
+    overall = report["overall"]
+    print(f"\n{overall['requests']} requests in {report['elapsed_s']}s at concurrency {report['concurrency']} "
+          f"-> {overall['throughput_rps']} req/s, {overall['errors']} errors")
+    print(f"{'template':<10} {'reqs':>6} {'err':>5} {'rps':>8} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for template, stats in report["templates"].items():
+        if stats["requests"]:
+            print(f"{template:<10} {stats['requests']:>6} {stats['errors']:>5} {stats['throughput_rps']:>8} "
+                  f"{stats['p50_ms']:>7}ms {stats['p95_ms']:>7}ms {stats['p99_ms']:>7}ms")
+
+def main(argv=None):
+    from utils.templates import template_names
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", help="JSONL corpus from benchmarks.corpus (default: 200 mixed resumes, seed 0)")
+    parser.add_argument("--templates", default=",".join(template_names()))
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30, help="seconds to run")
+    parser.add_argument("--requests", type=int, help="stop after this many requests")
+    parser.add_argument("--hit-ratio", type=float, default=0.5, help="share of requests replaying a completed payload")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", help="target an already running server")
+    parser.add_argument("--gunicorn", help='boot gunicorn with these arguments, e.g. "-w 4 -k gevent"')
+    parser.add_argument("--output", help="write the report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    if args.corpus:
+        corpus = load_corpus(args.corpus)
+    else:
+        corpus = [(resume_id, resume) for resume_id, _, resume in generate_corpus(200, seed=args.seed)]
+
+    stop = None
+    if args.url:
+        base_url = args.url.rstrip("/")
+    elif args.gunicorn:
+        base_url, stop = start_gunicorn(args.gunicorn)
+    else:
+        base_url, stop = start_inprocess_server()
+
+    try:
+        wait_until_ready(base_url)
+        load_test = LoadTest(base_url, corpus, args.templates.split(","), args.hit_ratio, args.seed)
+        report = load_test.run(args.concurrency, args.duration, args.requests)
+    finally:
+        if stop:
+            stop()
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+if __name__ == "__main__":
+    main()
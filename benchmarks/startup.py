@@ -0,0 +1,119 @@
+"""
+Cold-start benchmark: import-time budget, time-to-first-response and time-to-first-PDF.
+
+Every measurement runs in a fresh interpreter, the way a serverless cold start
+would. The app is configured from the environment as in production, except that
+Redis points at benchmarks.fake_upstash and storage is local.
+
+    python -m benchmarks.startup --budget-ms 400
+    python -m benchmarks.startup --templates zeus,comet --output startup.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# modules that must not be imported just to boot the app and answer /check
+heavy_modules = ("weasyprint", "supabase", "upstash_redis", "pypdfium2", "PIL", "fontTools")
+
+_child = r'''
+import json, sys, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+app = main.create_app()
+created = time.perf_counter()
+client = app.test_client()
+client.get("/check")
+first_response = time.perf_counter()
+loaded_at_check = sorted({name.split(".")[0] for name in sys.modules} & set(HEAVY))
+result = {
+    "import_ms": (imported - start) * 1000,
+    "create_app_ms": (created - imported) * 1000,
+    "first_response_ms": (first_response - start) * 1000,
+    "heavy_modules_at_check": loaded_at_check,
+}
+if TEMPLATE:
+    from benchmarks.bench_templates import synthetic_resume
+    status = client.post(f"/api/pdf/{TEMPLATE}/generate", json=synthetic_resume("intern")).status_code
+    result["first_pdf_ms"] = (time.perf_counter() - start) * 1000
+    result["first_pdf_status"] = status
+print("RESULT " + json.dumps(result))
+'''
+
+def run_child(template, env):
+    code = _child.replace("HEAVY", repr(heavy_modules)).replace("TEMPLATE", repr(template))
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-c", code], cwd=repo_root, env=env, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+    for line in completed.stdout.splitlines():
+        if line.startswith("RESULT "):
+            result = json.loads(line[len("RESULT "):])
+            result["process_wall_ms"] = wall_ms
+            return result
+    raise RuntimeError(f"startup child failed:\n{completed.stderr[-2000:]}")
+
+def import_profile(env, top=10):
+    """Heaviest imports of `import main`, from python -X importtime (cumulative microseconds)"""
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=repo_root, env=env, capture_output=True, text=True)
+    rows = []
+    for line in completed.stderr.splitlines():
+        parts = line[len("import time:"):].split("|")
+        if not line.startswith("import time:") or len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        rows.append({"module": parts[2].strip(), "cumulative_ms": int(parts[1]) / 1000})
+    return sorted(rows, key=lambda row: row["cumulative_ms"], reverse=True)[:top]
+
+def main(argv=None):
+    from benchmarks.fake_upstash import serve
+    from utils.templates import template_names
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--templates", default=",".join(template_names()))
+    parser.add_argument("--budget-ms", type=float, default=400, help="maximum allowed time to import main and answer /check")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    upstash, upstash_url = serve()
+    env = dict(
+        os.environ,
+        UPSTASH_REDIS_URL=upstash_url,
+        UPSTASH_REDIS_TOKEN="startup",
+        STORAGE_BACKEND="local",
+        LOCAL_STORAGE_DIR=tempfile.mkdtemp(prefix="resumeforge-startup-"),
+        PDF_DISK_CACHE_BYTES="0",  # time-to-first-PDF must include the render, not a disk hit from an earlier run
+    )
+
+    try:
+        boot = run_child(None, env)
+        per_template = {template: run_child(template, env) for template in args.templates.split(",")}
+        imports = import_profile(env)
+    finally:
+        upstash.shutdown()
+
+    over_budget = boot["first_response_ms"] > args.budget_ms
+    print(f"import main: {boot['import_ms']:.1f}ms, create_app: {boot['create_app_ms']:.1f}ms, "
+          f"first /check: {boot['first_response_ms']:.1f}ms (budget {args.budget_ms:.0f}ms{', EXCEEDED' if over_budget else ''})")
+    if boot["heavy_modules_at_check"]:
+        print(f"heavy modules loaded before the first response: {', '.join(boot['heavy_modules_at_check'])}")
+    for template, result in per_template.items():
+        print(f"{template:<10} first response {result['first_response_ms']:>8.1f}ms   first PDF {result['first_pdf_ms']:>8.1f}ms  (HTTP {result['first_pdf_status']})")
+    print("heaviest imports:")
+    for row in imports:
+        print(f"  {row['cumulative_ms']:>8.1f}ms  {row['module']}")
+
+    report = {"budget_ms": args.budget_ms, "boot": boot, "templates": per_template, "imports": imports, "over_budget": over_budget}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if over_budget or boot["heavy_modules_at_check"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""In-process stand-ins for Upstash Redis and Supabase storage, so benchmarks run offline and reproducibly."""
+import fnmatch
+import threading
+import time
+
+class FakeRedis:
+    """The subset of the upstash_redis.Redis API the app uses, backed by a dict"""
+
+    def __init__(self):
+        self._data = {}
+        self._zsets = {}
+        self._expiry = {}
+        self._lock = threading.Lock()
+
+    def _alive(self, key):
+        expires_at = self._expiry.get(key)
+        if expires_at is not None and expires_at <= time.time():
+            self._data.pop(key, None)
+            self._expiry.pop(key, None)
+        return key in self._data
+
+    def get(self, key):
+        with self._lock:
+            return self._data.get(key) if self._alive(key) else None
+
+    def getex(self, key, ex=None, **kwargs):
+        with self._lock:
+            if not self._alive(key):
+                return None
+            if ex:
+                self._expiry[key] = time.time() + ex
+            return self._data[key]
+
+    def set(self, key, value, ex=None, nx=None, **kwargs):
+        with self._lock:
+            if nx and self._alive(key):
+                return None
+            # Upstash returns values as strings
+            self._data[key] = value if isinstance(value, str) else str(value)
+            if ex:
+                self._expiry[key] = time.time() + ex
+            else:
+                self._expiry.pop(key, None)
+        return True
+
+    def delete(self, *keys):
+        with self._lock:
+            removed = 0
+            for key in keys:
+                if self._data.pop(key, None) is not None or self._zsets.pop(key, None) is not None:
+                    removed += 1
+                self._expiry.pop(key, None)
+            return removed
+
+    def keys(self, pattern="*"):
+        with self._lock:
+            live = [key for key in list(self._data) if self._alive(key)] + list(self._zsets)
+            return [key for key in live if fnmatch.fnmatchcase(key, pattern)]
+
+    def scan(self, cursor, match=None, count=None, **kwargs):
+        """Everything in one page: returns cursor 0 and all matching keys"""
+        return 0, self.keys(match or "*")
+
+    def type(self, key):
+        with self._lock:
+            if key in self._zsets:
+                return "zset"
+            return "string" if self._alive(key) else "none"
+
+    def strlen(self, key):
+        with self._lock:
+            return len(self._data[key].encode()) if self._alive(key) else 0
+
+    def zcard(self, key):
+        with self._lock:
+            return len(self._zsets.get(key, {}))
+
+    def zadd(self, key, scores, **kwargs):
+        with self._lock:
+            zset = self._zsets.setdefault(key, {})
+            added = sum(1 for member in scores if member not in zset)
+            zset.update((member, float(score)) for member, score in scores.items())
+            return added
+
+    def _ranked(self, key, rev=False):
+        zset = self._zsets.get(key, {})
+        return sorted(zset, key=lambda member: (zset[member], member), reverse=rev)
+
+    def zrange(self, key, start, stop, rev=False, **kwargs):
+        with self._lock:
+            ranked = self._ranked(key, rev)
+            stop = len(ranked) + stop if stop < 0 else stop
+            return ranked[start:stop + 1]
+
+    def zremrangebyrank(self, key, start, stop):
+        with self._lock:
+            ranked = self._ranked(key)
+            start = max(len(ranked) + start, 0) if start < 0 else start
+            stop = len(ranked) + stop if stop < 0 else stop
+            removed = ranked[start:stop + 1]
+            for member in removed:
+                del self._zsets[key][member]
+            return len(removed)
+
+    def flushall(self):
+        with self._lock:
+            self._data.clear()
+            self._zsets.clear()
+            self._expiry.clear()
+
+class FakeBucket:
+    def __init__(self, storage, name):
+        self._storage = storage
+        self._name = name
+
+    def upload(self, path, file, file_options=None):
+        self._storage.put(self._name, path, file)
+        return {"Key": f"{self._name}/{path}"}
+
+    def download(self, path):
+        return self._storage.get(self._name, path)
+
+    def get_public_url(self, path):
+        return f"https://storage.local/{self._name}/{path}"
+
+class FakeStorage:
+    """Keeps uploaded objects in memory and remembers their sizes"""
+
+    def __init__(self):
+        self.objects = {}
+        self._lock = threading.Lock()
+
+    def from_(self, bucket):
+        return FakeBucket(self, bucket)
+
+    def put(self, bucket, path, data):
+        with self._lock:
+            self.objects[f"{bucket}/{path}"] = bytes(data)
+
+    def get(self, bucket, path):
+        with self._lock:
+            return self.objects.get(f"{bucket}/{path}")
+
+class FakeSupabase:
+    def __init__(self, storage=None):
+        self.storage = storage or FakeStorage()
@@ -0,0 +1,13 @@
+# gunicorn 'main:create_app()' picks this file up automatically from the working directory
+import os
+
+# With preload, create_app() runs once in the master. Set WARMUP_MODE=blocking so the master
+# warms every template before forking and the workers inherit the warm state.
+preload_app = os.getenv("GUNICORN_PRELOAD", "0") == "1"
+
+def post_fork(server, worker):
+    if not preload_app:
+        # each worker calls create_app() itself, which already starts the warmup
+        return
+    from utils.warmup import ensure_warm
+    ensure_warm(worker.app.wsgi())
@@ -1,33 +1,58 @@
 import os
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify
 from flask_cors import CORS
-from upstash_redis import Redis
 from dotenv import load_dotenv
-from supabase import Client, create_client
 
 from api.routes.pdf import generate_bp
+from utils.breaker import GuardedClient, check_status, redis_timeout, storage_timeout
+from utils.lazy import LazyClient
+from utils.local_storage import LocalSupabase
+from utils.metrics import init_metrics, render_metrics
+from utils.rewarm import init_rewarm
+from utils.timing import init_timing
+from utils.warmup import init_warmup, is_ready
 
 load_dotenv()
 
-def create_app():
+# Clients are built on first use so that cold starts (and /check) don't pay for importing them
+def make_redis_client(redis_url, token, timeout=redis_timeout):
+    import httpx
+    from upstash_redis import Redis
+    # no retries: a failed command is a cache miss, and the breaker decides when to stop trying
+    client = Redis(redis_url, token, rest_retries=0)
+    # upstash_redis has no timeout option and its httpx client defaults to none
+    client._http._client.timeout = httpx.Timeout(timeout)
+    return client
+
+def make_supabase_client(url, key):
+    from supabase import ClientOptions, create_client
+    return create_client(url, key, options=ClientOptions(storage_client_timeout=storage_timeout))
+
+def create_app(redis_client=None, supabase=None):
+    """Build the app. Benchmarks and load tests pass in-process stand-ins for Redis and Supabase."""
     app = Flask(__name__)
 
-    token = os.getenv('UPSTASH_REDIS_TOKEN')
-    if not token:
-        raise ValueError("UPSTASH_REDIS_TOKEN environment variable is required")
-    
-    redis_url = 'https://ace-pegasus-31891.upstash.io'
-    redis_client = Redis(redis_url, token)
-    # attach redis into the app
-    app.redis_client = redis_client
+    if redis_client is None:
+        token = os.getenv('UPSTASH_REDIS_TOKEN')
+        if not token:
+            raise ValueError("UPSTASH_REDIS_TOKEN environment variable is required")
+
+        redis_url = os.getenv('UPSTASH_REDIS_URL', 'https://ace-pegasus-31891.upstash.io')
+        redis_client = LazyClient(lambda: make_redis_client(redis_url, token))
+    # attach redis into the app; commands go through the redis circuit breaker
+    app.redis_client = GuardedClient(redis_client)
 
     # ✅ Set up Supabase
-    SUPABASE_URL = os.getenv("SUPABASE_URL")
-    SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY")  # Must be the SERVICE role key
-    if not SUPABASE_URL or not SUPABASE_KEY:
-        raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_KEY environment variables are required")
+    if supabase is None and os.getenv("STORAGE_BACKEND") == "local":
+        # local disk stand-in for development and load tests
+        supabase = LocalSupabase(os.getenv("LOCAL_STORAGE_DIR"))
+    elif supabase is None:
+        SUPABASE_URL = os.getenv("SUPABASE_URL")
+        SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY")  # Must be the SERVICE role key
+        if not SUPABASE_URL or not SUPABASE_KEY:
+            raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_KEY environment variables are required")
 
-    supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+        supabase = LazyClient(lambda: make_supabase_client(SUPABASE_URL, SUPABASE_KEY))
     app.supabase = supabase
 
     try:
@@ -36,13 +61,28 @@ def create_app():
         print(f"Error initializing extensions: {str(e)}")
         raise
 
+    # per-stage timings -> Server-Timing header + structured log line
+    init_timing(app)
+    init_metrics(app)
+
     @app.route("/check")
     def check():
-        return jsonify({'status': 'okay'}), 200
+        # not ready until the opt-in startup warmup has rendered every template once
+        if not is_ready(app):
+            return jsonify({'status': 'warming', 'warmup': app.warmup_state}), 503
+        # an open breaker degrades the service (no cache, inline PDFs) but it still serves
+        return jsonify(check_status()), 200
+
+    @app.route("/metrics")
+    def metrics():
+        return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
         
     # Register blueprints
     app.register_blueprint(generate_bp, url_prefix='/api/pdf')
 
+    init_warmup(app)
+    init_rewarm(app)
+
     return app
 
 if __name__ == '__main__':
@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def weasyprint():
+    """The weasyprint module; skips the test when it or its system libraries (Pango) are missing"""
+    try:
+        import weasyprint
+    except (ImportError, OSError) as e:
+        pytest.skip(f"WeasyPrint can't be imported: {e}")
+    return weasyprint
@@ -0,0 +1,26 @@
+import pytest
+
+from utils import helper
+from utils.templates import get_css_builder, load_template, templates
+
+@pytest.mark.parametrize("template", templates)
+def test_same_markup_gives_identical_pdf_bytes(weasyprint, monkeypatch, template):
+    """Two deterministic writes of the same HTML and CSS, each from a fresh parse, match byte for byte"""
+    from benchmarks.bench_templates import synthetic_resume
+
+    monkeypatch.setattr(helper, "deterministic_pdf", True)
+    html_content = load_template(template).generate_resume_html(synthetic_resume("mid"))
+    css = get_css_builder(template)(dynamic_height=1600)
+
+    first = helper.write_pdf_bytes(html_content, css)
+    second = helper.write_pdf_bytes(html_content, css)
+    assert first == second
+
+def test_markup_dates_are_not_written(weasyprint, monkeypatch):
+    """Creation and modification dates in <meta> tags would otherwise make the bytes depend on them"""
+    monkeypatch.setattr(helper, "deterministic_pdf", True)
+    page = '<html><head><meta name="dcterms.created" content="{0}"><meta name="dcterms.modified" content="{0}"></head><body>resume</body></html>'
+
+    first = helper.write_pdf_bytes(page.format("2020-01-01T00:00:00Z"), "")
+    second = helper.write_pdf_bytes(page.format("2024-06-30T12:00:00Z"), "")
+    assert first == second
@@ -0,0 +1,17 @@
+from benchmarks.bench_templates import synthetic_resume
+from utils.fingerprint import Fingerprint
+
+def test_key_order_and_empty_sections_do_not_change_the_key():
+    data = synthetic_resume("mid")
+    reordered = dict(reversed(list(data.items())), volunteering=[], hobbies="", extras={})
+    assert Fingerprint(reordered, "zeus").hex == Fingerprint(data, "zeus").hex
+
+def test_nested_values_change_the_key():
+    data = synthetic_resume("mid")
+    edited = dict(data, experience=[dict(data["experience"][0], description="did\n\n")] + data["experience"][1:])
+    assert Fingerprint(edited, "zeus").hex != Fingerprint(data, "zeus").hex
+
+def test_lone_surrogate_is_fingerprinted():
+    # json.loads (and so request.get_json) accepts "\ud800", which UTF-8 can't encode
+    data = dict(synthetic_resume("intern"), summary="broken \ud800 text")
+    assert Fingerprint(data, "cigar").hex != Fingerprint(dict(data, summary="broken text"), "cigar").hex
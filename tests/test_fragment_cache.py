@@ -0,0 +1,40 @@
+import copy
+
+import pytest
+from flask import Flask
+
+from benchmarks.bench_templates import synthetic_resume
+from utils.fingerprint import Fingerprint
+from utils.templates import load_template, templates
+
+app = Flask(__name__)
+
+def generate(template, data, fingerprinted):
+    with app.test_request_context("/"):
+        if fingerprinted:
+            Fingerprint(data, template)
+        return load_template(template).generate_resume_html(data)
+
+@pytest.mark.parametrize("template", templates)
+def test_cached_sections_match_a_fresh_build(template):
+    data = synthetic_resume("mid")
+    fresh = generate(template, data, fingerprinted=False)
+    assert generate(template, data, fingerprinted=True) == fresh  # fills the cache
+    assert generate(template, data, fingerprinted=True) == fresh  # served from it
+
+@pytest.mark.parametrize("template", templates)
+def test_edited_section_is_rebuilt(template):
+    data = synthetic_resume("mid")
+    generate(template, data, fingerprinted=True)
+    edited = copy.deepcopy(data)
+    edited["projects"][0]["title"] = "Edited project title"
+    assert generate(template, edited, fingerprinted=True) == generate(template, edited, fingerprinted=False)
+    assert "Edited project title" in generate(template, edited, fingerprinted=True)
+
+def test_section_digests_key_the_payload():
+    data = synthetic_resume("mid")
+    edited = copy.deepcopy(data)
+    edited["experience"][0]["title"] = "Edited"
+    before, after = Fingerprint(data, "cigar"), Fingerprint(edited, "cigar")
+    assert before.payload != after.payload
+    assert [key for key in before.sections if before.sections[key] != after.sections[key]] == ["experience"]
@@ -0,0 +1,18 @@
+from benchmarks.stubs import FakeRedis
+from utils.keyspace import key_group, purge_legacy
+
+def test_current_keys_holding_a_legacy_field_name_stay_current():
+    assert key_group("user_a_css_height_x@y.com_zeus") == "user"
+    assert key_group("pdf_0123abcd") == "pdf"
+    assert key_group("hot_payload_0123abcd") == "hot_payload"
+
+def test_legacy_keys():
+    assert key_group("x@y.com_css_height_zeus") == "legacy_css_height"
+    assert key_group("x@y.com_storage_path_zeus_3") == "legacy_storage_path"
+
+def test_purge_legacy_keeps_current_keys():
+    redis = FakeRedis()
+    for key in ("x@y.com_data_hash_zeus", "x@y.com_content_height_zeus", "user_a_css_height_x@y.com_zeus", "pdf_0123"):
+        redis.set(key, "1")
+    assert purge_legacy(redis) == 2
+    assert sorted(redis.keys()) == ["pdf_0123", "user_a_css_height_x@y.com_zeus"]
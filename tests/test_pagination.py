@@ -0,0 +1,45 @@
+import re
+from io import BytesIO
+
+import pytest
+
+from utils.pagination import break_rules, build_paginated_resume, page_sizes
+from utils.templates import get_css_builder, templates
+
+def rules(css):
+    """(selectors, declarations) for every innermost rule of a stylesheet"""
+    for selectors, body in re.findall(r"([^{}]+)\{([^{}]*)\}", css):
+        selectors = selectors.split(";")[-1].split("*/")[-1]  # drop a preceding at-rule or comment
+        yield {s.strip() for s in selectors.split(",")}, body
+
+@pytest.mark.parametrize("page", page_sizes)
+@pytest.mark.parametrize("template", templates)
+def test_page_height_containers_are_released(template, page):
+    """Any box the template pins to the page height grows with its content on standard pages"""
+    height = page_sizes[page]
+    released = set()
+    for selectors, body in rules(break_rules.format(height=height)):
+        if re.search(r"height:\s*auto", body) and re.search(r"overflow:\s*visible", body):
+            released |= selectors
+
+    css = get_css_builder(template)(dynamic_height=height)
+    for selectors, body in rules(css):
+        if not any(s.startswith("@page") for s in selectors) and re.search(rf"(?<![\w-])height:\s*{height}pt", body):
+            assert selectors <= released, f"{template}: {selectors} is fixed at {height}pt"
+
+def test_long_resume_is_not_clipped(weasyprint):
+    """Every skill of a multi-page resume, including a sidebar longer than a page, lands on a page"""
+    pdfium = pytest.importorskip("pypdfium2")
+    from benchmarks.bench_templates import synthetic_resume
+
+    keywords = [f"kw{i:03d}zz" for i in range(150)]
+    data = synthetic_resume("max")
+    data["skills"] = [{"name": "Tools", "keywords": keywords}]
+    for template in templates:
+        html_content, css = build_paginated_resume(data, template, "letter")
+        pdf_bytes = weasyprint.HTML(string=html_content).write_pdf(stylesheets=[weasyprint.CSS(string=css)])
+        pdf = pdfium.PdfDocument(BytesIO(pdf_bytes))
+        text = "".join(pdf[i].get_textpage().get_text_bounded() for i in range(len(pdf)))
+        assert len(pdf) > 1, template
+        missing = [keyword for keyword in keywords if keyword not in text]
+        assert not missing, f"{template}: {len(missing)} skills clipped"
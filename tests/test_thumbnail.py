@@ -0,0 +1,28 @@
+from io import BytesIO
+
+import pytest
+
+pdfium = pytest.importorskip("pypdfium2")
+Image = pytest.importorskip("PIL.Image")
+
+from utils.thumbnail_helper import max_width, rasterize_pdf, thumbnail_aspect
+
+def blank_pdf(width, height):
+    pdf = pdfium.PdfDocument.new()
+    pdf.new_page(width, height)
+    buffer = BytesIO()
+    pdf.save(buffer)
+    pdf.close()
+    return buffer.getvalue()
+
+@pytest.mark.parametrize("image_format", ["webp", "png"])
+def test_tall_fitted_page_at_max_width_is_cropped(image_format):
+    # a fitted page far past WebP's 16383px limit at the widest thumbnail
+    image_bytes = rasterize_pdf(blank_pdf(612, 12000), max_width, image_format)
+    image = Image.open(BytesIO(image_bytes))
+    assert image.width == max_width
+    assert image.height == pytest.approx(max_width * thumbnail_aspect, abs=2)
+
+def test_short_page_is_not_padded():
+    image = Image.open(BytesIO(rasterize_pdf(blank_pdf(612, 400), 320, "png")))
+    assert image.size == (320, pytest.approx(320 * 400 / 612, abs=2))
@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from utils.metrics import inc, set_gauge
+
+logger = logging.getLogger(__name__)
+
+# Latency budgets per dependency. A call that fails or runs past its budget counts as a failure;
+# after breaker_failures in a row the breaker opens and calls are rejected without touching the
+# network for breaker_reset seconds, then a single trial call decides whether it closes again.
+redis_timeout = float(os.getenv("REDIS_TIMEOUT", "0.5"))  # seconds per command
+storage_timeout = float(os.getenv("STORAGE_TIMEOUT", "10"))  # seconds per upload
+breaker_failures = int(os.getenv("BREAKER_FAILURES", "5"))
+breaker_reset = float(os.getenv("BREAKER_RESET", "30"))
+
+state_values = {"closed": 0, "half_open": 1, "open": 2}
+
+class BreakerOpen(Exception):
+    def __init__(self, name):
+        super().__init__(f"{name} circuit breaker is open")
+
+class CircuitBreaker:
+    def __init__(self, name, budget, failures=breaker_failures, reset=breaker_reset):
+        self.name = name
+        self.budget = budget
+        self.failures = failures
+        self.reset = reset
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trial_running = False
+        self.lock = threading.Lock()
+        set_gauge("resumeforge_breaker_state", 0, dependency=name)
+
+    def _set_state(self, state):
+        if state != self.state:
+            logger.warning(f"[🔌] {self.name} breaker {self.state} -> {state}")
+            self.state = state
+            set_gauge("resumeforge_breaker_state", state_values[state], dependency=self.name)
+
+    def allow(self):
+        with self.lock:
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset:
+                self._set_state("half_open")
+            if self.state == "closed":
+                return True
+            if self.state == "half_open" and not self.trial_running:
+                self.trial_running = True
+                return True
+        inc("resumeforge_breaker_calls_total", dependency=self.name, result="rejected")
+        return False
+
+    def record(self, elapsed, failed):
+        slow = not failed and elapsed > self.budget
+        inc("resumeforge_breaker_calls_total", dependency=self.name, result="failed" if failed else "slow" if slow else "ok")
+        with self.lock:
+            self.trial_running = False
+            if failed or slow:
+                self.consecutive_failures += 1
+                if self.state == "half_open" or self.consecutive_failures >= self.failures:
+                    self.opened_at = time.monotonic()
+                    self._set_state("open")
+            else:
+                self.consecutive_failures = 0
+                self._set_state("closed")
+
+    def call(self, fn, *args, **kwargs):
+        """Run fn under the breaker; the client itself enforces the timeout (see make_redis_client)"""
+        if not self.allow():
+            raise BreakerOpen(self.name)
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self.record(time.perf_counter() - start, failed=True)
+            raise
+        self.record(time.perf_counter() - start, failed=False)
+        return result
+
+    async def acall(self, fn, *args, **kwargs):
+        """Await fn(...) under the breaker, cancelled once it exceeds the budget"""
+        if not self.allow():
+            raise BreakerOpen(self.name)
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(fn(*args, **kwargs), self.budget)
+        except Exception:
+            self.record(time.perf_counter() - start, failed=True)
+            raise
+        self.record(time.perf_counter() - start, failed=False)
+        return result
+
+breakers = {
+    "redis": CircuitBreaker("redis", redis_timeout),
+    "storage": CircuitBreaker("storage", storage_timeout),
+}
+
+def check_status():
+    """/check body: okay, or degraded while any dependency's breaker is not closed"""
+    states = {name: breaker.state for name, breaker in breakers.items()}
+    status = 'okay' if all(state == "closed" for state in states.values()) else 'degraded'
+    return {'status': status, 'dependencies': states}
+
+class GuardedClient:
+    """
+    Cache client proxy: every command goes through the redis breaker, and a failed, timed out or
+    rejected command returns None, which callers already treat as a cache miss. Requests keep
+    rendering while Redis is degraded instead of failing or stalling.
+    """
+
+    def __init__(self, client, breaker=None):
+        self.client = client
+        self.breaker = breaker or breakers["redis"]
+
+    def __getattr__(self, name):
+        method = getattr(self.client, name)
+
+        def call(*args, **kwargs):
+            try:
+                return self.breaker.call(method, *args, **kwargs)
+            except Exception as e:
+                logger.warning(f"[⚠️] Redis {name} skipped: {str(e)}")
+                return None
+        return call
+
+class AsyncGuardedClient(GuardedClient):
+    """GuardedClient for awaitable clients (upstash_redis.asyncio, ThreadedClient)"""
+
+    def __getattr__(self, name):
+        method = getattr(self.client, name)
+
+        async def call(*args, **kwargs):
+            try:
+                return await self.breaker.acall(method, *args, **kwargs)
+            except Exception as e:
+                logger.warning(f"[⚠️] Redis {name} skipped: {str(e)}")
+                return None
+        return call
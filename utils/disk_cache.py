@@ -0,0 +1,101 @@
+import logging
+import os
+import tempfile
+import threading
+import uuid
+from utils.metrics import record_cache, set_gauge
+
+logger = logging.getLogger(__name__)
+
+# Rendered PDFs on local disk, named by request fingerprint, in the resumeforge temp directory that
+# get_output_path already uses. Shared by every worker on the host. Recency is the file's mtime
+# (bumped on each hit), so eviction drops the least recently used files once the directory grows
+# past pdf_disk_cache_bytes.
+pdf_disk_cache_dir = os.getenv("PDF_DISK_CACHE_DIR") or os.path.join(tempfile.gettempdir(), 'resumeforge', 'pdf')
+pdf_disk_cache_bytes = int(os.getenv("PDF_DISK_CACHE_BYTES", 256 * 1024 * 1024))  # 0 disables the tier
+
+class PdfDiskCache:
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.total_bytes = None  # estimate for this process; recounted from disk before evicting
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def path(self, fingerprint):
+        return os.path.join(self.directory, f"{fingerprint.hex}.pdf")
+
+    def get(self, fingerprint):
+        """Local path of the cached PDF, or None; a hit marks the file as recently used"""
+        if not self.enabled:
+            return None
+        path = self.path(fingerprint)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            path = None
+        record_cache("disk", fingerprint.template, hit=path is not None)
+        return path
+
+    def read(self, fingerprint):
+        path = self.get(fingerprint)
+        if path is None:
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:  # evicted by another worker in between
+            return None
+
+    def put(self, fingerprint, pdf_bytes):
+        if not self.enabled:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # write then rename, so readers never see a partial file
+            temp_path = os.path.join(self.directory, f".{uuid.uuid4().hex}.tmp")
+            with open(temp_path, 'wb') as f:
+                f.write(pdf_bytes)
+            os.replace(temp_path, self.path(fingerprint))
+        except OSError as e:
+            logger.warning(f"[⚠️] PDF disk cache write failed: {str(e)}")
+            return
+
+        with self.lock:
+            if self.total_bytes is None:
+                self.total_bytes = self._disk_usage()[1]
+            else:
+                self.total_bytes += len(pdf_bytes)
+            if self.total_bytes > self.max_bytes:
+                self.total_bytes = self._evict()
+            set_gauge("resumeforge_pdf_disk_cache_bytes", self.total_bytes)
+
+    def _disk_usage(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".pdf"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries, sum(size for _, size, _ in entries)
+
+    def _evict(self):
+        """Delete least recently used files down to 90% of the budget; returns the bytes left"""
+        entries, total = self._disk_usage()
+        target = self.max_bytes * 0.9
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except FileNotFoundError:
+                total -= size
+        return total
+
+pdf_disk_cache = PdfDiskCache(pdf_disk_cache_dir, pdf_disk_cache_bytes)
@@ -0,0 +1,73 @@
+import hashlib
+import json
+from flask import g, has_request_context
+from utils.templates import template_version
+from utils.timing import span
+
+empty_values = ("", [], {})
+
+def normalize(data):
+    """
+    Drop empty top-level sections ("", [], {}), which every template treats the same as a missing
+    key. Nothing below the top level is touched: nested values such as a social's empty name or a
+    description's trailing newlines change the rendered HTML, so they must change the key too.
+    None is kept: the templates render a None section differently from a missing one.
+    """
+    if not isinstance(data, dict):
+        return data
+    return {key: value for key, value in data.items() if value not in empty_values}
+
+def canonical_bytes(value):
+    """
+    Compact JSON with sorted keys, so key order never changes the bytes. ASCII-escaped, so a lone
+    surrogate (valid in a JSON request body, not in UTF-8) still encodes.
+    """
+    return json.dumps(value, sort_keys=True, separators=(",", ":")).encode()
+
+class Fingerprint:
+    """
+    Canonical identity of one resume payload rendered with one version of a template (and page size).
+    Computed once per request; every cache key and storage path is derived from it. Each top-level
+    section is hashed on its own and the payload hash is taken over those digests, so the section
+    digests come at no extra cost and key the fragment cache (utils/fragment_cache.py).
+    """
+
+    __slots__ = ("data", "template", "version", "page", "email", "sections", "payload", "digest")
+
+    def __init__(self, data, template, page=None):
+        self.data = data
+        self.template = template
+        self.version = template_version(template)
+        self.page = page
+        self.email = (data.get('personal') or {}).get('email')
+        with span("fingerprint"):
+            self.sections = {
+                key: hashlib.blake2b(canonical_bytes(value), digest_size=16).digest()
+                for key, value in normalize(data).items()
+            }
+            # payload identifies the request across template versions; digest is this version's rendering of it
+            payload = hashlib.blake2b(canonical_bytes({"template": template, "page": page}), digest_size=16)
+            for key in sorted(self.sections):
+                payload.update(b"\0" + canonical_bytes(key) + self.sections[key])
+            self.payload = payload.digest()
+            self.digest = hashlib.blake2b(self.payload + b"\0" + self.version.encode(), digest_size=16).digest()
+        if has_request_context():
+            g.fingerprint = self
+
+    @property
+    def hex(self):
+        return self.digest.hex()
+
+    @property
+    def payload_hex(self):
+        return self.payload.hex()
+
+    def derive(self, *parts):
+        """Hex digest of this fingerprint plus extra key parts, e.g. a thumbnail's width and format"""
+        derived = hashlib.blake2b(self.digest, digest_size=16)
+        for part in parts:
+            derived.update(b"\0" + str(part).encode())
+        return derived.hexdigest()
+
+    def key(self, prefix, *parts):
+        return f"{prefix}_{self.derive(*parts) if parts else self.hex}"
@@ -0,0 +1,62 @@
+import os
+import threading
+from collections import OrderedDict
+from flask import g, has_request_context
+from utils.metrics import record_cache
+from utils.templates import template_version
+
+# Rendered HTML of whole resume sections (every experience entry, the education list...), keyed by
+# template version, section and the digest the request fingerprint already took of that section's
+# data. A regeneration that edits one section rebuilds only that section. Per process.
+fragment_cache_size = int(os.getenv("FRAGMENT_CACHE_SIZE", 1024))  # max entries; 0 disables the cache
+
+class FragmentCache:
+    """Bounded LRU of section HTML keyed by (template, template version, section, data digest)"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            html = self.entries.get(key)
+            if html is not None:
+                self.entries.move_to_end(key)
+        record_cache("fragment", key[0], hit=html is not None)
+        return html
+
+    def put(self, key, html):
+        with self.lock:
+            self.entries[key] = html
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+fragment_cache = FragmentCache(fragment_cache_size)
+
+def section_digest(resume_data, section):
+    """
+    Digest of resume_data[section] from the current request's fingerprint, or None outside a
+    request, for data the fingerprint wasn't taken of, or for an empty section.
+    """
+    fingerprint = g.get("fingerprint") if has_request_context() else None
+    if fingerprint is None or fingerprint.data is not resume_data:
+        return None
+    return fingerprint.sections.get(section)
+
+def cached_section(template, section, resume_data, render):
+    """
+    render(resume_data) memoized by the section's data. render must read nothing from resume_data
+    but resume_data[section]; without a fingerprinted request it is simply called.
+    """
+    digest = section_digest(resume_data, section) if fragment_cache.max_entries else None
+    if digest is None:
+        return str(render(resume_data))
+
+    key = (template, template_version(template), section, digest)
+    html = fragment_cache.get(key)
+    if html is None:
+        html = str(render(resume_data))
+        fragment_cache.put(key, html)
+    return html
@@ -3,15 +3,43 @@ from io import BytesIO
 import math
 import os
 import tempfile
+import time
 import uuid
-from flask import send_file, current_app
-from weasyprint import HTML, CSS
+from flask import g, has_request_context, jsonify, redirect, request, send_file, current_app
 import logging
 import json
-import hashlib
 from datetime import datetime
+from utils.breaker import breakers
+from utils.disk_cache import pdf_disk_cache
+from utils.fingerprint import Fingerprint
+from utils.metrics import record_cache, record_upload, track_render
+from utils.pagination import layout_options, paginated_css
+from utils.rewarm import remember_hot, rewarm_enabled, touch_hot
+from utils.section_measure import get_measure_pool, measure_enabled, measured_height
+from utils.templates import get_css_builder, load_template, template_version
+from utils.text_metrics import estimate_height, estimator_enabled, min_height, seed_height
+from utils.timing import count_render, span, start_timing
 
 supabase_bucket_name = os.getenv("SUPABASE_BUCKET_NAME", "bucket_name")
+storage_breaker = breakers["storage"]
+
+# redirect: answer with a redirect to the stored PDF. inline: return the PDF itself, from the local
+# disk cache when this host has rendered it before.
+pdf_delivery = os.getenv("PDF_DELIVERY", "redirect")
+
+# identical HTML + CSS -> byte-identical PDF, so stored copies, ETags and dedup can rely on the bytes
+deterministic_pdf = os.getenv("DETERMINISTIC_PDF", "1") == "1"
+
+# Redis key prefix for fingerprint -> storage path entries
+pdf_cache_prefix = "pdf"
+
+# Every cache key expires; reads refresh the TTL (GETEX), so entries that keep being used stay
+# and abandoned ones age out. Set the Upstash eviction policy to volatile-lru as a memory backstop.
+pdf_cache_ttl = int(os.getenv("PDF_CACHE_TTL", 60 * 60 * 24 * 30))  # 30 days
+user_record_ttl = int(os.getenv("USER_RECORD_TTL", 60 * 60 * 24 * 30))  # 30 days
+
+# smallest step of the height search, in pt: some templates' increments are 0 without experience
+min_increment = float(os.getenv("HEIGHT_MIN_INCREMENT", "20"))
 
 def format_description(text):
     """Format description as HTML: preserve lists, convert newlines to <br> for plain text."""
@@ -38,99 +66,182 @@ def filename_generator(name):
     text_join = '-'.join(text_split)
     return text_join
 
+def parse_html(html_content):
+    """
+    Parse resume HTML once and reuse the tree for every render that only swaps the stylesheet.
+    The height search and the PDF write all lay out the same markup, so a request parses it once:
+    the tree is kept on flask.g and goes away with the request. Outside a request every call
+    parses; callers there (render pool workers) parse once and pass the tree along themselves.
+    """
+    from weasyprint import HTML  # deferred: WeasyPrint dominates cold-start import time
+
+    cached = g.get("parsed_html") if has_request_context() else None
+    if cached is not None and (cached[0] is html_content or cached[0] == html_content):
+        return cached[1]
+
+    with span("parse"):
+        html = HTML(string=html_content)
+    if has_request_context():
+        g.parsed_html = (html_content, html)
+    return html
+
+def user_record_key(email, template):
+    return f"user_{email}_{template}"
+
+def user_record(template, css_height):
+    """
+    One compact value per user and template, replacing the separate content/css height keys.
+    Carries the template version, so heights fitted to an older template are ignored.
+    """
+    record = {"v": template_version(template), "css_height": css_height}
+    return json.dumps(record, separators=(",", ":"))
+
+def parse_user_record(raw, template):
+    if not raw:
+        return None
+    record = json.loads(raw)
+    return record if record.get("v") == template_version(template) else None
+
+def store_user_record(email, template, css_height):
+    with span("redis_write"):
+        current_app.redis_client.set(user_record_key(email, template), user_record(template, css_height), ex=user_record_ttl)
+
 def css_height_calc(html_content, css_content, email, template, buffer, max_attempts=50, increment=50):
-    redis_client = current_app.redis_client
-    cache_key_content = f"{email}_content_height_{template}"
+    measured = measured_height(template, html_content, get_measure_pool()) if measure_enabled(template) else None
+    final_height, _, fitted = fit_height(html_content, css_content, template, buffer, max_attempts, increment, measured)
+    if email:
+        store_user_record(email, template, final_height if fitted else None)
+    return css_content(dynamic_height=final_height)
+
+def fit_height(html_content, css_content, template, buffer, max_attempts=50, increment=50, measured=None, html=None):
+    """
+    Single-page height search with no cache access, so it can also run in a render pool worker.
+    Returns (final_height, content_height, fitted); fitted is True when the loop found a one-page height.
+    A measured height (utils/section_measure.py) is close to exact: the loop starts there directly.
+    html is the already parsed tree of html_content, if the caller has one.
+    """
+    from weasyprint import CSS  # deferred: WeasyPrint dominates cold-start import time
 
-    # Get cached values if they exist
-    cached_content_height = redis_client.get(cache_key_content)
+    if html is None:
+        html = parse_html(html_content)
+    if measured:
+        final_height, fitted = loop_process(html_content, css_content, template, measured, max_attempts, increment, html)
+        return final_height, measured, fitted
 
     # Always get current content height from a no-height CSS
-    html = HTML(string=html_content)
-    initial_render = html.render(stylesheets=[CSS(string=css_content(1009))])
-    content_height = 1009
-    buff_height = content_height * buffer
-    content_height = max(content_height + buff_height, 100)
-
-    redis_client.set(cache_key_content, content_height)
+    with span("render"), track_render(template):
+        initial_render = html.render(stylesheets=[CSS(string=css_content(1009))])
+    count_render()
+    content_height = seed_height(html_content, template) or predict_height(buffer)
 
     logging.info(f"Content Height: {content_height}")
-    logging.info(f"Cached Content Height: {cached_content_height}")
     logging.info(f"number of Pages: {len(initial_render.pages)}")
     logging.info(f"Buffer: {buffer}")
     if len(initial_render.pages) > 1:
-        final_height = loop_process(
+        final_height, fitted = loop_process(
             html_content=html_content,
             css_content=css_content,
-            email=email,
             template=template,
             content_height=content_height,
-            redis_client=redis_client,
             max_attempts=max_attempts,
-            increment=increment
+            increment=increment,
+            html=html
         )
     else:
-        final_height = content_height
+        final_height, fitted = content_height, False
 
-    return css_content(dynamic_height=final_height)
+    return final_height, content_height, fitted
 
-def loop_process(html_content, css_content, email, template, content_height,
-                 redis_client, max_attempts=50, increment=50):
-    min_height = 1009  # never go below this
-    content_height = max(content_height, min_height)
-    logging.info(f"Content Height loop process: {content_height}")
+def predict_height(buffer):
+    """Estimate the page height from the template buffer, the same way the height search seeds itself"""
+    content_height = 1009
+    buff_height = content_height * buffer
+    return max(content_height + buff_height, 100)
 
-    initial_target = math.ceil(content_height)
-    height_diff = initial_target - min_height
-    final_height = abs(height_diff) + min_height
+def preview_css(css_content, email, template, buffer, html_content=None):
+    """
+    Build preview CSS without any WeasyPrint layout.
+    Uses the last fitted height for this user and template when one is cached,
+    otherwise the text metrics estimate (HEIGHT_ESTIMATOR=metrics) or the predicted height.
+    """
+    height = None
+    if email:
+        record = parse_user_record(current_app.redis_client.getex(user_record_key(email, template), ex=user_record_ttl), template)
+        if record and record["css_height"] is not None:
+            height = float(record["css_height"])
 
-    logging.info(f"Diff me: {height_diff}")
-    logging.info(f"[🔍] Loop starting. Est height: {final_height}pt")
+    if height is None and html_content and estimator_enabled(template):
+        height = math.ceil(max(estimate_height(html_content, template), min_height))
+    if height is None:
+        height = math.ceil(predict_height(buffer))
 
-    for i in range(max_attempts):
-        css = css_content(dynamic_height=final_height)
-        rendered = HTML(string=html_content).render(stylesheets=[CSS(string=css)])
+    return css_content(dynamic_height=height), height
 
-        if len(rendered.pages) == 1:
-            logging.info(f"[✅] Final height: {final_height}pt in {i + 1} loop(s)")
-            redis_client.set(f"{email}_css_height_{template}", final_height)
-            break
+def loop_process(html_content, css_content, template, content_height, max_attempts=50, increment=50, html=None):
+    from weasyprint import CSS
 
-        final_height += increment
-        logging.info(f"[↗] Page overflow, increased to {final_height}pt")
+    if html is None:
+        html = parse_html(html_content)
+    logging.info(f"Content Height loop process: {content_height}")
+
+    def fits(height):
+        css = css_content(dynamic_height=height)
+        with span("render"), track_render(template):
+            rendered = html.render(stylesheets=[CSS(string=css)])
+        count_render()
+        return len(rendered.pages) == 1
 
-    return final_height
+    final_height, fitted, attempts = search_height(fits, content_height, max_attempts, increment)
+    if fitted:
+        logging.info(f"[✅] Final height: {final_height}pt in {attempts} loop(s)")
+    else:
+        logging.info(f"[⚠️] No single-page height after {attempts} loop(s), using {final_height}pt")
+    return final_height, fitted
 
-def data_caching(data, template_name="andromeda"):
+def search_height(fits, content_height, max_attempts=50, increment=50):
     """
-    Check if data has changed. If not, return cached Supabase public URL.
-    Otherwise, return None to signal a regeneration is needed.
+    Smallest height (to within one step) at or above content_height for which fits(height) is True.
+    Steps start at increment, never below min_increment, and double on every overflow, so a low seed
+    or a zero increment can't stall the search; once a height fits, bisection against the last
+    overflowing height narrows it back down. Returns (final_height, fitted, attempts).
     """
-    email = data.get('personal', {}).get('email')
-    if not email:
-        return None
-
-    redis_client = current_app.redis_client
-
-    combined_data = {
-        "template": template_name,
-        "resume_data": data
-    }
-
-    # Hash the data for comparison
-    data_str = json.dumps(combined_data, sort_keys=True)
-    data_hash = hashlib.sha256(data_str.encode()).hexdigest()
+    step = tolerance = max(increment, min_increment)
+    height = math.ceil(max(content_height, min_height))
+    logging.info(f"[🔍] Loop starting. Est height: {height}pt")
+
+    overflow = fitting = None  # tallest height known to overflow, shortest known to fit
+    attempts = 0
+    while attempts < max_attempts:
+        attempts += 1
+        if fits(height):
+            fitting = height
+        else:
+            overflow = height
+
+        if fitting is None:
+            height = math.ceil(overflow + step)
+            step *= 2
+            logging.info(f"[↗] Page overflow, increased to {height}pt")
+        elif overflow is None or fitting - overflow <= tolerance:
+            break
+        else:
+            height = math.ceil((overflow + fitting) / 2)
 
-    cache_key_hash = f"{email}_data_hash_{template_name}"
-    cache_key_storage = f"{email}_storage_path_{template_name}"
+    return (fitting, True, attempts) if fitting is not None else (height, False, attempts)
 
-    cached_hash = redis_client.get(cache_key_hash)
-    cached_storage = redis_client.get(cache_key_storage)
+def cached_pdf_writes(redis_client, fingerprint, storage_path):
+    """
+    Cache the storage path so the next identical request skips rendering. Returns the client calls,
+    so an async client's writes can be awaited together.
+    """
+    writes = [redis_client.set(fingerprint.key(pdf_cache_prefix), storage_path, ex=pdf_cache_ttl)]
+    if rewarm_enabled:
+        writes.extend(remember_hot(redis_client, fingerprint))
+    return writes
 
-    if cached_hash and cached_storage and cached_hash == data_hash:
-        return cached_storage  # Always return the storage path, never a URL
-    else:
-        return None
+def store_cached_pdf(fingerprint, pdf_path):
+    with span("redis_write"):
+        cached_pdf_writes(current_app.redis_client, fingerprint, pdf_path)
 
 def get_output_path(name, template_name):
     base_dir = os.path.join(tempfile.gettempdir(), 'resumeforge')
@@ -139,25 +250,48 @@ def get_output_path(name, template_name):
     filename = f"{filename_generator(name)}_{template_name}"
     return os.path.join(base_dir, f"{filename}.pdf")
 
-def upload_pdf_to_supabase(name, template_name, html_content, css_str):
-    # Generate PDF into memory
-    pdf_buffer = BytesIO()
-    HTML(string=html_content).write_pdf(pdf_buffer, stylesheets=[CSS(string=css_str)])
-    pdf_buffer.seek(0)
+def write_pdf_bytes(html_content, css_str, html=None):
+    """Lay out the final document and return the PDF bytes; html is the parsed tree, if already at hand"""
+    from weasyprint import CSS
 
-    # Build file name
-    current_datetime = datetime.now()
-    formatted_dt = current_datetime.strftime("%Y%m%d%H%M%S")
-    filename = f"{filename_generator(name)}_{template_name}_{formatted_dt}.pdf"
-    storage_path = f"resumes/{filename}"
+    if html is None:
+        html = parse_html(html_content)
 
+    # Generate PDF into memory
+    pdf_buffer = BytesIO()
+    with span("write_pdf"):
+        document = html.render(stylesheets=[CSS(string=css_str)])
+        options = {}
+        if deterministic_pdf:
+            # no dates copied from <meta> tags, and a file identifier hashed from the PDF objects
+            # rather than absent, so the same markup and stylesheet always give the same bytes
+            document.metadata.created = document.metadata.modified = None
+            options["pdf_identifier"] = True
+        document.write_pdf(pdf_buffer, **options)
+    return pdf_buffer.getvalue()
+
+def pdf_storage_path(name, fingerprint):
+    """Content-addressed: the same payload, template and page size always map to the same object"""
+    filename = f"{filename_generator(name)}_{fingerprint.template}_{fingerprint.hex}.pdf"
+    return f"resumes/{filename}"
+
+def upload_pdf_to_supabase(name, fingerprint, html_content, css_str):
+    pdf_bytes = write_pdf_bytes(html_content, css_str)
+    return upload_pdf_bytes(pdf_storage_path(name, fingerprint), pdf_bytes, fingerprint.template)
+
+def upload_pdf_bytes(storage_path, pdf_bytes, template_name):
     # Upload to Supabase
     supabase = current_app.supabase
-    res = supabase.storage.from_(supabase_bucket_name).upload(
-        path=storage_path,
-        file=pdf_buffer.getvalue(),
-        file_options={"content-type": "application/pdf"}
-    )
+    upload_start = time.perf_counter()
+    with span("upload"):
+        res = storage_breaker.call(
+            supabase.storage.from_(supabase_bucket_name).upload,
+            path=storage_path,
+            file=pdf_bytes,
+            # identical payloads share a path, so a re-render after a cache eviction overwrites it
+            file_options={"content-type": "application/pdf", "upsert": "true"}
+        )
+    record_upload(template_name, len(pdf_bytes), time.perf_counter() - upload_start)
 
     if isinstance(res, dict) and "error" in res:
         raise Exception(f"Upload failed: {res['error']['message']}")
@@ -165,6 +299,204 @@ def upload_pdf_to_supabase(name, template_name, html_content, css_str):
     # Return public URL
     return storage_path
 
+def render_pdf(template, data, page=None, html_content=None, measured=None):
+    """
+    HTML, height search and PDF bytes with no cache or storage access, so it runs in the request
+    thread and in render pool workers alike. html_content and measured are passed when the caller
+    already built the HTML or took a section-measured height. Returns {"pdf", "content_height",
+    "css_height"}: content_height is None without a height search, css_height when it found no
+    one-page height. Templates without a height search (comet) don't define fit_params.
+    """
+    module = load_template(template)
+    css_builder = get_css_builder(template)
+    if html_content is None:
+        with span("html"):
+            html_content = module.generate_resume_html(data)
+    html = parse_html(html_content)
+
+    content_height = css_height = None
+    if page:
+        final_css = paginated_css(css_builder, page)
+    elif hasattr(module, "fit_params"):
+        buffer, increment = module.fit_params(data)
+        final_height, content_height, fitted = fit_height(html_content, css_builder, template, buffer, module.max_attempts, increment, measured, html)
+        final_css = css_builder(dynamic_height=final_height)
+        if fitted:
+            css_height = final_height
+    else:
+        final_css = css_builder()
+
+    return {
+        "pdf": write_pdf_bytes(html_content, final_css, html),
+        "content_height": content_height,
+        "css_height": css_height,
+    }
+
+def generate_steps(template, data, args):
+    """
+    The generate pipeline of every template, shared by the Flask controllers (generate_response)
+    and asgi.py. Each cache, storage and render call is yielded as a step and the caller sends back
+    its result, or throws in its exception, so the Flask path runs the steps in the request thread
+    while the async path awaits them on the event loop:
+
+        ("local", fn)         blocking local work: fn()
+        ("redis", fn)         fn(redis client); a list of calls can be awaited together
+        ("storage", fn)       fn(bucket) under the storage breaker
+        ("bucket", fn)        fn(bucket) without the breaker (public URLs)
+        ("measure", template, html_content)                      section-measured height or None
+        ("render", template, data, page, html_content, measured) the render_pdf result
+
+    Returns ("error", status, message), ("file", local_path, fingerprint), ("pdf", pdf_bytes,
+    fingerprint) or ("redirect", url).
+    """
+    if not data:
+        return "error", 400, "No resume data provided"
+    try:
+        page = layout_options(args)
+    except ValueError as e:
+        return "error", 400, str(e)
+
+    start_timing(template)
+    fingerprint = Fingerprint(data, template, page)
+    pdf_key = fingerprint.key(pdf_cache_prefix)
+    inline = pdf_delivery == "inline"
+
+    # Inline delivery serves this host's disk cache first; otherwise Redis holds the storage path
+    # of the copy already rendered for this exact payload, template and page size
+    if inline:
+        local_path = yield "local", lambda: pdf_disk_cache.get(fingerprint)
+        if local_path:
+            return "file", local_path, fingerprint
+
+    with span("cache"):
+        storage_path = yield "redis", lambda redis: redis.getex(pdf_key, ex=pdf_cache_ttl)
+        if rewarm_enabled:
+            yield "redis", lambda redis: touch_hot(redis, fingerprint)
+    record_cache("pdf", template, hit=bool(storage_path))
+    if storage_path and not inline:
+        return (yield from storage_redirect(storage_path))
+
+    pdf_bytes = None
+    if storage_path and not storage_path.startswith("http"):
+        # inline, and rendered on another host: fetch the stored copy, or render again if that fails
+        try:
+            with span("download"):
+                pdf_bytes = yield "storage", lambda bucket: bucket.download(storage_path)
+        except Exception as e:
+            logging.warning(f"[⚠️] Stored PDF unavailable, rendering again: {str(e)}")
+        if pdf_bytes:
+            yield "local", lambda: pdf_disk_cache.put(fingerprint, pdf_bytes)
+            return "pdf", pdf_bytes, fingerprint
+    elif not storage_path and not inline:
+        # Redis missed (evicted or degraded) but this host may still have the file: upload it again
+        pdf_bytes = yield "local", lambda: pdf_disk_cache.read(fingerprint)
+
+    if not pdf_bytes:
+        html_content = measured = None
+        if not page and measure_enabled(template):
+            with span("html"):
+                html_content = yield "local", lambda: load_template(template).generate_resume_html(data)
+            measured = yield "measure", template, html_content
+        result = yield "render", template, data, page, html_content, measured
+        pdf_bytes = result["pdf"]
+        if fingerprint.email and result["content_height"] is not None:
+            record = user_record(template, result["css_height"])
+            with span("redis_write"):
+                yield "redis", lambda redis: redis.set(user_record_key(fingerprint.email, template), record, ex=user_record_ttl)
+        yield "local", lambda: pdf_disk_cache.put(fingerprint, pdf_bytes)
+
+    # While storage is failing or its breaker is open, return the PDF itself so the export still succeeds
+    storage_path = pdf_storage_path(data.get('personal', {}).get('name'), fingerprint)
+    try:
+        upload_start = time.perf_counter()
+        with span("upload"):
+            res = yield "storage", lambda bucket: bucket.upload(
+                path=storage_path,
+                file=pdf_bytes,
+                # identical payloads share a path, so a re-render after a cache eviction overwrites it
+                file_options={"content-type": "application/pdf", "upsert": "true"}
+            )
+        record_upload(template, len(pdf_bytes), time.perf_counter() - upload_start)
+        if isinstance(res, dict) and "error" in res:
+            raise Exception(f"Upload failed: {res['error']['message']}")
+    except Exception as e:
+        logging.warning(f"[⚠️] Storage unavailable, returning PDF inline: {str(e)}")
+        return "pdf", pdf_bytes, fingerprint
+
+    with span("redis_write"):
+        yield "redis", lambda redis: cached_pdf_writes(redis, fingerprint, storage_path)
+    if inline:
+        return "pdf", pdf_bytes, fingerprint
+    return (yield from storage_redirect(storage_path))
+
+def storage_redirect(storage_path):
+    """generate_steps' redirect to the public URL of a stored PDF"""
+    # If we have a cached URL, redirect to it
+    if storage_path.startswith("http"):
+        return "redirect", storage_path
+
+    with span("public_url"):
+        url = yield "bucket", lambda bucket: bucket.get_public_url(storage_path)
+    return "redirect", url
+
+def run_step(kind, *args):
+    """One generate_steps step, run in the request thread"""
+    if kind == "local":
+        return args[0]()
+    if kind == "redis":
+        return args[0](current_app.redis_client)
+    if kind == "storage":
+        return storage_breaker.call(args[0], current_app.supabase.storage.from_(supabase_bucket_name))
+    if kind == "bucket":
+        return args[0](current_app.supabase.storage.from_(supabase_bucket_name))
+    if kind == "measure":
+        return measured_height(*args, get_measure_pool())
+    if kind == "render":
+        return render_pdf(*args)
+    raise ValueError(f"Unknown generate step: {kind}")
+
+def run_steps(steps):
+    """Drive generate_steps to its response"""
+    advance, value = steps.send, None
+    while True:
+        try:
+            step = advance(value)
+        except StopIteration as done:
+            return done.value
+        try:
+            advance, value = steps.send, run_step(*step)
+        except Exception as e:
+            advance, value = steps.throw, e
+
+def generate_response(template):
+    """POST /api/pdf/<template>/generate for the Flask app"""
+    try:
+        kind, *response = run_steps(generate_steps(template, request.get_json(), request.args))
+        if kind == "error":
+            status, message = response
+            return jsonify({'error': message}), status
+        if kind == "file":
+            return send_pdf_file(*response)
+        if kind == "pdf":
+            pdf_bytes, fingerprint = response
+            return send_pdf_inline(pdf_bytes, fingerprint.data.get('personal', {}).get('name'), fingerprint.template)
+        return redirect(response[0])
+
+    except Exception as e:
+        current_app.logger.error(f"PDF generation error: {str(e)}")
+        return jsonify({'error': f'Failed to generate PDF: {str(e)}'}), 500
+
+def pdf_download_name(name, template_name):
+    return f"{filename_generator(name or 'resume')}_{template_name}.pdf"
+
+def send_pdf_inline(pdf_bytes, name, template_name):
+    return send_file(BytesIO(pdf_bytes), mimetype="application/pdf", download_name=pdf_download_name(name, template_name))
+
+def send_pdf_file(local_path, fingerprint):
+    """Serve a disk-cached PDF; with a path, the WSGI server can use sendfile"""
+    name = fingerprint.data.get('personal', {}).get('name')
+    return send_file(local_path, mimetype="application/pdf", download_name=pdf_download_name(name, fingerprint.template), etag=fingerprint.hex)
+
 def increment_calc(data, percent):
     exp = data.get('experience', [])
     # increment periodically every 2 jobs
@@ -0,0 +1,19 @@
+class HtmlBuilder:
+    """
+    Collects HTML fragments and joins them once, so a section with hundreds of entries
+    builds in linear time instead of re-copying the string on every +=.
+    str(builder) is the joined HTML, so a builder can go straight into an f-string.
+    """
+
+    __slots__ = ("parts",)
+
+    def __init__(self, *fragments):
+        self.parts = list(fragments)
+
+    def add(self, fragment):
+        self.parts.append(fragment)
+
+    def build(self):
+        return ''.join(self.parts)
+
+    __str__ = build
@@ -0,0 +1,98 @@
+"""
+Key counts and approximate bytes per key prefix in the Redis cache.
+
+    python -m utils.keyspace
+    python -m utils.keyspace --purge-legacy   # delete the per-field keys older versions wrote
+
+Bytes are key plus value length (sorted sets: members plus an 8-byte score each), which is what
+Upstash bills as data size; Redis' own per-key overhead is not included.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# current layout: pdf_<fingerprint>, user_<email>_<template>, thumbnail_<digest>, re-warm bookkeeping
+key_prefixes = ("pdf_", "user_", "thumbnail_", "hot_payload_", "hot_", "template_version_", "rewarm_lock_")
+
+# <email>_<field>_<template>[_<version>] keys, replaced by the single user_ record
+legacy_fields = ("_data_hash_", "_storage_path_", "_content_height_", "_css_height_")
+
+def key_group(key):
+    # current prefixes first: an email can contain a legacy field name (user_a_css_height_x@y.com_zeus)
+    for prefix in key_prefixes:
+        if key.startswith(prefix):
+            return prefix.rstrip("_")
+    for field in legacy_fields:
+        if field in key:
+            return "legacy" + field.rstrip("_")
+    return "other"
+
+def scan_keys(redis, match="*", count=500):
+    cursor = 0
+    while True:
+        cursor, keys = redis.scan(cursor, match=match, count=count)
+        yield from keys
+        if int(cursor) == 0:
+            return
+
+def key_bytes(redis, key, group):
+    # only hot_<template> is a sorted set; unknown keys are asked for their type
+    kind = redis.type(key) if group == "other" else "zset" if group == "hot" else "string"
+    if kind == "zset":
+        return len(key) + redis.zcard(key) * (32 + 8)  # payload ids are 32 hex chars
+    if kind == "string":
+        return len(key) + (redis.strlen(key) or 0)
+    return len(key)
+
+def keyspace_report(redis):
+    """{group: {"keys": n, "bytes": b}} for every key in the database"""
+    report = {}
+    for key in scan_keys(redis):
+        group = key_group(key)
+        entry = report.setdefault(group, {"keys": 0, "bytes": 0})
+        entry["keys"] += 1
+        entry["bytes"] += key_bytes(redis, key, group)
+    return report
+
+def purge_legacy(redis, batch=100):
+    """Delete keys in the pre-consolidation per-field layout; returns how many were removed"""
+    removed = 0
+    pending = []
+    for key in scan_keys(redis):
+        if key_group(key).startswith("legacy"):
+            pending.append(key)
+        if len(pending) >= batch:
+            removed += redis.delete(*pending)
+            pending = []
+    if pending:
+        removed += redis.delete(*pending)
+    return removed
+
+def main(argv=None):
+    from dotenv import load_dotenv
+    from main import make_redis_client
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--purge-legacy", action="store_true", help="delete legacy per-field keys after reporting")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    # a full SCAN isn't latency-sensitive; give each page more room than the serving budget
+    redis = make_redis_client(os.getenv('UPSTASH_REDIS_URL', 'https://ace-pegasus-31891.upstash.io'), os.getenv('UPSTASH_REDIS_TOKEN'), timeout=30)
+
+    report = keyspace_report(redis)
+    total_keys = sum(entry["keys"] for entry in report.values())
+    total_bytes = sum(entry["bytes"] for entry in report.values())
+    print(f"{'prefix':<24} {'keys':>10} {'bytes':>14}")
+    for group, entry in sorted(report.items(), key=lambda item: -item[1]["bytes"]):
+        print(f"{group:<24} {entry['keys']:>10} {entry['bytes']:>14}")
+    print(f"{'total':<24} {total_keys:>10} {total_bytes:>14}")
+
+    if args.purge_legacy:
+        print(f"Removed {purge_legacy(redis)} legacy keys")
+    return report
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+import threading
+
+class LazyClient:
+    """Proxy that builds the wrapped client on first attribute access"""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _get_client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._factory()
+        return self._client
+
+    @property
+    def loaded(self):
+        return self._client is not None
+
+    def __getattr__(self, name):
+        return getattr(self._get_client(), name)
@@ -0,0 +1,45 @@
+import os
+import tempfile
+
+# Drop-in for the slice of the Supabase client the app uses (storage.from_(bucket).upload / download / get_public_url).
+# Enabled with STORAGE_BACKEND=local for development and load tests; never used in production.
+
+class LocalBucket:
+    def __init__(self, base_dir, public_url, name):
+        self._base_dir = base_dir
+        self._public_url = public_url
+        self._name = name
+
+    def _path(self, path):
+        full_path = os.path.normpath(os.path.join(self._base_dir, self._name, path))
+        if not full_path.startswith(os.path.join(self._base_dir, self._name)):
+            raise ValueError(f"Invalid storage path: {path}")
+        return full_path
+
+    def upload(self, path, file, file_options=None):
+        full_path = self._path(path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'wb') as f:
+            f.write(file)
+        return {"Key": f"{self._name}/{path}"}
+
+    def download(self, path):
+        with open(self._path(path), 'rb') as f:
+            return f.read()
+
+    def get_public_url(self, path):
+        return f"{self._public_url}/{self._name}/{path}"
+
+class LocalStorage:
+    def __init__(self, base_dir, public_url):
+        self._base_dir = base_dir
+        self._public_url = public_url
+
+    def from_(self, bucket):
+        return LocalBucket(self._base_dir, self._public_url, bucket)
+
+class LocalSupabase:
+    def __init__(self, base_dir=None, public_url=None):
+        base_dir = base_dir or os.path.join(tempfile.gettempdir(), 'resumeforge', 'storage')
+        os.makedirs(base_dir, exist_ok=True)
+        self.storage = LocalStorage(os.path.abspath(base_dir), public_url or f"file://{os.path.abspath(base_dir)}")
@@ -0,0 +1,160 @@
+import threading
+import time
+from contextlib import contextmanager
+from utils.timing import current_timings
+
+# Minimal Prometheus text-format registry. Values are per process: with several
+# gunicorn workers, scrape each worker or sum them on the Prometheus side.
+
+latency_buckets = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+iteration_buckets = (1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+render_buckets = (0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+byte_buckets = (16_384, 65_536, 131_072, 262_144, 524_288, 1_048_576, 4_194_304)
+
+_lock = threading.Lock()
+_metrics = {}
+
+def _labels_key(labels):
+    return tuple(sorted(labels.items()))
+
+def _format_labels(labels, extra=None):
+    items = list(labels) + list(extra or [])
+    if not items:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in items) + '}'
+
+def register(name, kind, help_text, buckets=None):
+    with _lock:
+        if name not in _metrics:
+            _metrics[name] = {"kind": kind, "help": help_text, "buckets": buckets, "series": {}}
+
+def inc(name, amount=1, **labels):
+    key = _labels_key(labels)
+    with _lock:
+        series = _metrics[name]["series"]
+        series[key] = series.get(key, 0) + amount
+
+def set_gauge(name, value, **labels):
+    with _lock:
+        _metrics[name]["series"][_labels_key(labels)] = value
+
+def observe(name, value, **labels):
+    key = _labels_key(labels)
+    with _lock:
+        metric = _metrics[name]
+        series = metric["series"].get(key)
+        if series is None:
+            series = {"buckets": [0] * len(metric["buckets"]), "sum": 0, "count": 0}
+            metric["series"][key] = series
+        for i, bound in enumerate(metric["buckets"]):
+            if value <= bound:
+                series["buckets"][i] += 1
+        series["sum"] += value
+        series["count"] += 1
+
+register("resumeforge_requests_total", "counter", "PDF generation requests by template and status")
+register("resumeforge_request_duration_seconds", "histogram", "End-to-end generate_pdf latency", latency_buckets)
+register("resumeforge_height_search_iterations", "histogram", "WeasyPrint layout passes needed per request", iteration_buckets)
+register("resumeforge_render_duration_seconds", "histogram", "Duration of a single WeasyPrint layout pass", render_buckets)
+register("resumeforge_cache_requests_total", "counter", "Cache lookups by tier and result")
+register("resumeforge_upload_bytes_total", "counter", "Bytes uploaded to storage")
+register("resumeforge_upload_size_bytes", "histogram", "Size of each uploaded PDF", byte_buckets)
+register("resumeforge_upload_duration_seconds", "histogram", "Storage upload latency", latency_buckets)
+register("resumeforge_render_pool_queue_depth", "gauge", "Layout passes queued or running in this process")
+register("resumeforge_template_info", "gauge", "Current version hash of each loaded template")
+register("resumeforge_rewarm_total", "counter", "Hot cache entries handled by the post-deploy re-warm, by result")
+register("resumeforge_breaker_state", "gauge", "Circuit breaker state per dependency: 0 closed, 1 half open, 2 open")
+register("resumeforge_breaker_calls_total", "counter", "Calls through each circuit breaker, by result")
+register("resumeforge_pdf_disk_cache_bytes", "gauge", "Bytes in the local PDF disk cache, as last counted by this process")
+
+def record_cache(tier, template, hit):
+    inc("resumeforge_cache_requests_total", tier=tier, template=template, result="hit" if hit else "miss")
+
+def record_upload(template, size, duration):
+    inc("resumeforge_upload_bytes_total", size, template=template)
+    observe("resumeforge_upload_size_bytes", size, template=template)
+    observe("resumeforge_upload_duration_seconds", duration, template=template)
+
+_render_depth = 0
+
+def _adjust_render_depth(delta):
+    global _render_depth
+    with _lock:
+        _render_depth += delta
+        _metrics["resumeforge_render_pool_queue_depth"]["series"][()] = _render_depth
+
+@contextmanager
+def track_render(template):
+    """Count a layout pass as queued/running and record how long it took"""
+    _adjust_render_depth(1)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe("resumeforge_render_duration_seconds", time.perf_counter() - start, template=template)
+        _adjust_render_depth(-1)
+
+@contextmanager
+def track_pool_job():
+    """Count a job handed to the render process pool as queued/running until it returns"""
+    _adjust_render_depth(1)
+    try:
+        yield
+    finally:
+        _adjust_render_depth(-1)
+
+def cache_hit_ratios():
+    """Hit ratio per (tier, template), derived from the cache counters"""
+    totals = {}
+    with _lock:
+        for key, value in _metrics["resumeforge_cache_requests_total"]["series"].items():
+            labels = dict(key)
+            group = (labels["tier"], labels["template"])
+            hits, total = totals.get(group, (0, 0))
+            if labels["result"] == "hit":
+                hits += value
+            totals[group] = (hits, total + value)
+    return {group: hits / total for group, (hits, total) in totals.items() if total}
+
+def render_metrics():
+    """Render every metric in the Prometheus text exposition format"""
+    lines = []
+    with _lock:
+        for name, metric in _metrics.items():
+            lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['kind']}")
+            for key, value in metric["series"].items():
+                if metric["kind"] != "histogram":
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+                    continue
+                for bound, count in zip(metric["buckets"], value["buckets"]):
+                    lines.append(f"{name}_bucket{_format_labels(key, [('le', bound)])} {count}")
+                lines.append(f"{name}_bucket{_format_labels(key, [('le', '+Inf')])} {value['count']}")
+                lines.append(f"{name}_sum{_format_labels(key)} {value['sum']}")
+                lines.append(f"{name}_count{_format_labels(key)} {value['count']}")
+
+    lines.append("# HELP resumeforge_cache_hit_ratio Cache hit ratio by tier since process start")
+    lines.append("# TYPE resumeforge_cache_hit_ratio gauge")
+    for (tier, template), ratio in cache_hit_ratios().items():
+        lines.append(f'resumeforge_cache_hit_ratio{{tier="{tier}",template="{template}"}} {ratio:.4f}')
+
+    return "\n".join(lines) + "\n"
+
+def init_metrics(app):
+    """Record request count, latency and layout passes for every timed generate request"""
+    @app.after_request
+    def observe_response(response):
+        timings = current_timings()
+        if timings is None:
+            return response
+
+        observe_request(timings, response.status_code)
+        return response
+
+def observe_request(timings, status):
+    """Count and time one finished request; the Flask hook above and asgi.py both call it"""
+    template = timings["template"]
+    inc("resumeforge_requests_total", template=template, status=str(status))
+    observe("resumeforge_request_duration_seconds", time.perf_counter() - timings["started"], template=template)
+    if timings["renders"]:
+        observe("resumeforge_height_search_iterations", timings["renders"], template=template)
@@ -0,0 +1,69 @@
+from utils.timing import span
+
+# Paginated output: standard pages instead of one tall fitted page. Every template is already
+# 612pt (8.5in) wide, so only the page height changes.
+page_sizes = {
+    'letter': 792,   # 11in
+    'legal': 1008,   # 14in
+}
+
+# Appended after the template CSS so these rules win. Continuation pages get a top margin; the
+# first page keeps the template's full-bleed header.
+break_rules = '''
+    @page {{
+        size: 612pt {height}pt;
+        margin: 36pt 0;
+    }}
+    @page :first {{
+        margin-top: 0;
+    }}
+    h1, h2, h3, h4, [class$="section-title"] {{
+        break-after: avoid;
+    }}
+    li, .item, [class$="-item"], [class$="item-header"] {{
+        break-inside: avoid;
+    }}
+    p, li {{
+        orphans: 2;
+        widows: 2;
+    }}
+    /* the fitted layout pins some containers to the page height (the athena and artemis sidebars)
+       or clips them; on standard pages they grow with their content and break across pages */
+    body, .resume-container, .resume-body, .resume-main-container, .resume-sidebar {{
+        height: auto;
+        min-height: 0;
+        overflow: visible;
+    }}
+'''
+
+def layout_options(args):
+    """
+    Read the output layout from the query string: ?layout=paginated&page=letter|legal.
+    Returns the page size name, or None for the default single fitted page.
+    """
+    layout = args.get('layout', 'fitted').lower()
+    if layout == 'fitted':
+        return None
+    if layout != 'paginated':
+        raise ValueError("layout must be one of: fitted, paginated")
+
+    page = args.get('page', 'letter').lower()
+    if page not in page_sizes:
+        raise ValueError(f"page must be one of: {', '.join(page_sizes)}")
+    return page
+
+def paginated_css(css_content, page):
+    """Template CSS sized to a standard page, with break rules so entries don't split across pages"""
+    height = page_sizes[page]
+    return css_content(dynamic_height=height) + break_rules.format(height=height)
+
+def build_paginated_resume(data, template_name, page):
+    """
+    Generate the resume HTML and paginated CSS. There is no height search: the only layout
+    pass is the one write_pdf does.
+    """
+    from utils.templates import get_css_builder, load_template
+
+    with span("html"):
+        html_content = load_template(template_name).generate_resume_html(data)
+    return html_content, paginated_css(get_css_builder(template_name), page)
@@ -0,0 +1,92 @@
+import cProfile
+import hmac
+import logging
+import os
+import random
+import re
+import tempfile
+import uuid
+from functools import wraps
+from flask import current_app, g, request
+
+logger = logging.getLogger(__name__)
+
+# Profiling is off unless an admin token or a sampling rate is configured
+profile_admin_token = os.getenv("PROFILE_ADMIN_TOKEN")
+profile_sample_rate = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+profile_header = "X-Profile-Token"
+supabase_bucket_name = os.getenv("SUPABASE_BUCKET_NAME", "bucket_name")
+request_id_pattern = re.compile(r"^[A-Za-z0-9-]{1,64}$")
+
+def get_request_id():
+    """Use the caller's X-Request-ID when it is a plain id so profiles can be matched to upstream logs"""
+    if 'request_id' not in g:
+        caller_id = request.headers.get("X-Request-ID", "")
+        g.request_id = caller_id if request_id_pattern.match(caller_id) else uuid.uuid4().hex
+    return g.request_id
+
+def should_profile():
+    token = request.headers.get(profile_header)
+    if token and profile_admin_token and hmac.compare_digest(token, profile_admin_token):
+        return True
+    return profile_sample_rate > 0 and random.random() < profile_sample_rate
+
+def get_profile_dir():
+    profile_dir = os.path.join(tempfile.gettempdir(), 'resumeforge', 'profiles')
+    os.makedirs(profile_dir, exist_ok=True)
+    return profile_dir
+
+def save_profile(profiler, profile_id):
+    """
+    Write the pstats artifact locally and copy it to storage, which survives serverless instances.
+    profile_id is always server-generated: it names a file and a bucket object.
+    """
+    profile_path = os.path.join(get_profile_dir(), f"{profile_id}.pstats")
+    profiler.dump_stats(profile_path)
+
+    storage_path = f"profiles/{profile_id}.pstats"
+    try:
+        with open(profile_path, 'rb') as f:
+            current_app.supabase.storage.from_(supabase_bucket_name).upload(
+                path=storage_path,
+                file=f.read(),
+                file_options={"content-type": "application/octet-stream", "upsert": "true"}
+            )
+    except Exception as e:
+        logger.warning(f"Profile upload failed for {profile_id}: {str(e)}")
+        storage_path = None
+
+    return profile_path, storage_path
+
+def profiled(view):
+    """Run the whole view under cProfile when requested by an admin header or picked by sampling"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        request_id = get_request_id()
+        if not should_profile():
+            response = current_app.make_response(view(*args, **kwargs))
+            response.headers["X-Request-ID"] = request_id
+            return response
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # another profiler is already active in this thread
+            profiler = None
+        try:
+            result = view(*args, **kwargs)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+
+        response = current_app.make_response(result)
+        response.headers["X-Request-ID"] = request_id
+        if profiler is not None:
+            profile_id = uuid.uuid4().hex
+            profile_path, storage_path = save_profile(profiler, profile_id)
+            logger.info(f"[🔬] Profile {profile_id} saved for request {request_id}: {storage_path or profile_path}")
+            response.headers["X-Profile-Id"] = profile_id
+        return response
+
+    return wrapper
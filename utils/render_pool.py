@@ -0,0 +1,73 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from utils.metrics import track_pool_job
+
+logger = logging.getLogger(__name__)
+
+# WeasyPrint layout is CPU-bound and holds the GIL, so the async server hands it to worker processes.
+# spawn rather than fork: forking a process that already runs an event loop and I/O threads is unsafe.
+render_pool_size = int(os.getenv("RENDER_POOL_SIZE", "0")) or os.cpu_count() or 1
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _init_worker():
+    from utils.warmup import warm_template, warmup_enabled
+    from utils.templates import template_names
+
+    # same opt-in as the WSGI workers: pay for fonts and stylesheets before the first real job
+    if not warmup_enabled:
+        return
+    for name in template_names():
+        try:
+            warm_template(name)
+        except Exception as e:
+            logger.error(f"Render pool warmup failed for {name}: {str(e)}")
+
+def make_render_pool(max_workers):
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker
+    )
+
+def get_render_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = make_render_pool(render_pool_size)
+            logger.info(f"[🧵] Render pool started with {render_pool_size} worker(s)")
+    return _pool
+
+def shutdown_render_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+def render_resume(template, data, page=None, measured=None, html_content=None):
+    """
+    Runs in a pool worker: utils.helper.render_pdf, plus the timings it recorded (html, parse,
+    render passes, write_pdf) so the request can report them. measured and html_content are the
+    section-measured height and its HTML, when the caller already took them.
+    """
+    from utils.helper import render_pdf
+    from utils.timing import start_timing
+
+    timings = start_timing(template)
+    result = render_pdf(template, data, page, html_content, measured)
+    result["timings"] = timings
+    result["render_ms"] = (time.perf_counter() - timings["started"]) * 1000
+    return result
+
+async def render_in_pool(template, data, page=None, measured=None, html_content=None):
+    """Await render_resume on the process pool without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    with track_pool_job():
+        return await loop.run_in_executor(get_render_pool(), render_resume, template, data, page, measured, html_content)
@@ -0,0 +1,117 @@
+import json
+import logging
+import os
+import threading
+import time
+from utils.disk_cache import pdf_disk_cache
+from utils.fingerprint import Fingerprint
+from utils.metrics import inc, track_pool_job
+from utils.templates import template_names, template_version
+
+logger = logging.getLogger(__name__)
+
+# Opt-in: REWARM_ON_DEPLOY=1 records which cache entries are in use and, when a template's version
+# changes, re-renders the most recently used ones in the background at a fixed rate. A template
+# deploy then refills the cache gradually instead of every active user hitting a cold render at once.
+rewarm_enabled = os.getenv("REWARM_ON_DEPLOY", "0") == "1"
+rewarm_rate = float(os.getenv("REWARM_RATE", "0.5"))  # re-renders per second, across all templates
+rewarm_limit = int(os.getenv("REWARM_LIMIT", "200"))  # most recently used entries re-rendered per template
+hot_entries_size = int(os.getenv("REWARM_TRACK_SIZE", "1000"))  # entries remembered per template
+hot_payload_ttl = int(os.getenv("REWARM_PAYLOAD_TTL", 14 * 24 * 3600))  # seconds a payload is kept for re-rendering
+rewarm_lock_ttl = 3600
+
+def hot_key(template):
+    return f"hot_{template}"
+
+def hot_payload_key(payload_id):
+    return f"hot_payload_{payload_id}"
+
+def touch_hot(redis, fingerprint):
+    """Mark an entry as just used; scores are timestamps, so the sorted set is ordered by recency"""
+    return redis.zadd(hot_key(fingerprint.template), {fingerprint.payload_hex: time.time()})
+
+def remember_hot(redis, fingerprint):
+    """Keep a freshly rendered entry's payload so it can be re-rendered after a deploy, and trim the set"""
+    payload = json.dumps({"data": fingerprint.data, "page": fingerprint.page})
+    return [
+        redis.set(hot_payload_key(fingerprint.payload_hex), payload, ex=hot_payload_ttl),
+        redis.zremrangebyrank(hot_key(fingerprint.template), 0, -(hot_entries_size + 1)),
+    ]
+
+def changed_templates(redis):
+    """
+    Templates whose version differs from the one recorded by the previous deploy. Exactly one process
+    claims each change, so several workers starting together don't re-render the same entries.
+    """
+    changed = []
+    for template in template_names():
+        version = template_version(template)
+        previous = redis.get(f"template_version_{template}")
+        if previous == version:
+            continue
+        if not redis.set(f"rewarm_lock_{template}_{version}", os.getpid(), nx=True, ex=rewarm_lock_ttl):
+            continue
+        redis.set(f"template_version_{template}", version)
+        if previous:  # first run with tracking: nothing cached under an older version to refill
+            changed.append(template)
+    return changed
+
+def rewarm_template(app, template, pool):
+    from utils.helper import pdf_cache_prefix, pdf_storage_path, store_cached_pdf, store_user_record, upload_pdf_bytes
+    from utils.render_pool import render_resume
+
+    redis = app.redis_client
+    interval = 1 / rewarm_rate if rewarm_rate > 0 else 0
+    # the client is guarded: a command Redis can't serve returns None
+    for payload_id in redis.zrange(hot_key(template), 0, rewarm_limit - 1, rev=True) or []:
+        started = time.perf_counter()
+        payload = redis.get(hot_payload_key(payload_id))
+        if not payload:
+            inc("resumeforge_rewarm_total", template=template, result="expired")
+            continue
+
+        entry = json.loads(payload)
+        fingerprint = Fingerprint(entry["data"], template, entry.get("page"))
+        if redis.get(fingerprint.key(pdf_cache_prefix)):
+            # a real request already re-rendered it under the new version
+            inc("resumeforge_rewarm_total", template=template, result="skipped")
+            continue
+
+        try:
+            with track_pool_job():
+                result = pool.submit(render_resume, template, fingerprint.data, fingerprint.page).result()
+            pdf_disk_cache.put(fingerprint, result["pdf"])
+            with app.app_context():
+                name = fingerprint.data.get('personal', {}).get('name')
+                storage_path = upload_pdf_bytes(pdf_storage_path(name, fingerprint), result["pdf"], template)
+                store_cached_pdf(fingerprint, storage_path)
+                if fingerprint.email and result["content_height"] is not None:
+                    store_user_record(fingerprint.email, template, result["css_height"])
+            inc("resumeforge_rewarm_total", template=template, result="rendered")
+        except Exception as e:
+            logger.error(f"Re-warm failed for {template} entry {payload_id}: {str(e)}")
+            inc("resumeforge_rewarm_total", template=template, result="failed")
+
+        time.sleep(max(0, interval - (time.perf_counter() - started)))
+
+def run_rewarm(app):
+    from utils.render_pool import make_render_pool
+
+    try:
+        changed = changed_templates(app.redis_client)
+    except Exception as e:
+        logger.error(f"Re-warm version check failed: {str(e)}")
+        return
+    if not changed:
+        return
+
+    logger.info(f"[♻️] Template versions changed for {changed}; re-warming up to {rewarm_limit} entries each at {rewarm_rate}/s")
+    # one dedicated worker process: re-warming must never take CPU from more than one live request
+    with make_render_pool(1) as pool:
+        for template in changed:
+            rewarm_template(app, template, pool)
+    logger.info(f"[♻️] Re-warm finished for {changed}")
+
+def init_rewarm(app):
+    if rewarm_enabled:
+        threading.Thread(target=run_rewarm, args=(app,), name="cache-rewarm", daemon=True).start()
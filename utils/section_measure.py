@@ -0,0 +1,199 @@
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from functools import partial
+from utils.metrics import record_cache, track_pool_job
+from utils.templates import get_css_builder, template_version
+from utils.timing import span
+
+logger = logging.getLogger(__name__)
+
+# Opt-in: SECTION_MEASURE=1 sizes the fitted page of a stacked single-column template from its
+# sections. Each section is laid out on its own at the template's content width, in parallel on the
+# render pool, and its height is cached by a hash of its markup; the page height is the empty page
+# plus every section's share. A regeneration that edits one section lays out only that section, and
+# the height search then verifies the sum with a single full render.
+section_measure_enabled = os.getenv("SECTION_MEASURE", "0") == "1"
+section_height_cache_size = int(os.getenv("SECTION_HEIGHT_CACHE_SIZE", 4096))  # max entries
+# WSGI workers each get their own measuring pool; keep it small, gunicorn already runs one per core
+section_measure_workers = int(os.getenv("SECTION_MEASURE_WORKERS", "2"))
+
+# template -> (class of the column the sections stack in, class of one section). Comet isn't listed:
+# it prints on a fixed Legal page, so there is no height to search for.
+stacked_templates = {
+    "cigar": ("classic-main", "classic-section"),
+}
+
+measure_page_height = 20000  # pt; tall enough that any isolated section lays out on one page
+px_to_pt = 0.75
+
+class HeightCache:
+    """Bounded LRU of measured heights keyed by (template, template version, kind, markup digest)"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(template, version, kind, markup):
+        return template, version, kind, hashlib.blake2b(markup.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+    def get(self, key):
+        with self.lock:
+            height = self.entries.get(key)
+            if height is not None:
+                self.entries.move_to_end(key)
+        record_cache("section_height", key[0], hit=height is not None)
+        return height
+
+    def put(self, key, height):
+        with self.lock:
+            self.entries[key] = height
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+section_heights = HeightCache(section_height_cache_size)
+
+def measure_enabled(template):
+    return section_measure_enabled and template in stacked_templates
+
+def split_sections(html_content, template):
+    """
+    (document with the column emptied, [(section markup, document with only that section), ...]),
+    or None when the markup doesn't have the expected column.
+    """
+    column, section = stacked_templates[template]
+    match = re.search(rf'(<(\w+) class="{column}"[^>]*>)(.*?)(</\2>)', html_content, re.DOTALL)
+    if not match:
+        return None
+    before, after = html_content[:match.end(1)], html_content[match.start(4):]
+    fragments = re.findall(rf'<section class="{section}"[^>]*>.*?</section>', match.group(3), re.DOTALL)
+    return before + after, [(fragment, before + fragment + after) for fragment in fragments]
+
+_measure_pool = None
+_measure_pool_lock = threading.Lock()
+
+def get_measure_pool():
+    """Process pool for measurements taken from a WSGI worker, capped at section_measure_workers"""
+    from utils.render_pool import make_render_pool
+
+    global _measure_pool
+    with _measure_pool_lock:
+        if _measure_pool is None:
+            _measure_pool = make_render_pool(section_measure_workers)
+            logger.info(f"[🧵] Section measure pool started with {section_measure_workers} worker(s)")
+    return _measure_pool
+
+def measure_document(template, html_content):
+    """
+    Runs in a pool worker: content height in pt of one document, the bottom of the first box in
+    <body> including its margin, laid out on a page tall enough to hold it. None when the layout
+    tree can't be read: it is WeasyPrint's private _page_box, which a release may change.
+    """
+    from weasyprint import CSS, HTML
+
+    document = HTML(string=html_content).render(
+        stylesheets=[CSS(string=get_css_builder(template)(dynamic_height=measure_page_height))]
+    )
+    try:
+        for box in document.pages[0]._page_box.descendants():
+            if getattr(box, "element_tag", None) == "body" and box.children:
+                outer = box.children[0]
+                return (outer.position_y + outer.margin_height()) * px_to_pt
+    except AttributeError as e:
+        logger.warning(f"[⚠️] WeasyPrint layout tree unavailable, skipping section measurement: {str(e)}")
+        return None
+    raise ValueError(f"No content box found while measuring {template}")
+
+class Measurement:
+    """
+    Cached heights for one resume: the empty page by its markup, each section by its own markup as
+    the height it adds to the page, so editing the header or one section leaves the others cached.
+    """
+
+    def __init__(self, template, html_content):
+        self.template = template
+        self.version = template_version(template)
+        self.split = split_sections(html_content, template)
+        if self.split is None:
+            logger.warning(f"[⚠️] {template} markup has no stacked column; skipping section measurement")
+            return
+        shell, sections = self.split
+        self.shell = section_heights.get(self.key("page", shell))
+        self.added = [section_heights.get(self.key("section", fragment)) for fragment, _ in sections]
+
+    def key(self, kind, markup):
+        return HeightCache.key(self.template, self.version, kind, markup)
+
+    def pending(self):
+        """Documents still to lay out: the empty page first when it's missing, then the sections"""
+        shell, sections = self.split
+        documents = [document for (_, document), added in zip(sections, self.added) if added is None]
+        return ([shell] if self.shell is None else []) + documents
+
+    def complete(self, heights):
+        """
+        Total page height in pt, given the heights of the pending documents in order; None, with
+        nothing cached, if any of them couldn't be measured.
+        """
+        shell, sections = self.split
+        heights = list(heights)
+        if any(height is None for height in heights):
+            return None
+        if self.shell is None:
+            self.shell = heights.pop(0)
+            section_heights.put(self.key("page", shell), self.shell)
+        measured = iter(heights)
+        for i, (fragment, _) in enumerate(sections):
+            if self.added[i] is None:
+                self.added[i] = next(measured) - self.shell
+                section_heights.put(self.key("section", fragment), self.added[i])
+        return self.shell + sum(self.added)
+
+def measured_height(template, html_content, pool=None):
+    """
+    Fitted page height in pt from per-section measurements, or None if they can't be taken (the
+    height search then falls back to its usual seed)
+    """
+    measurement = Measurement(template, html_content)
+    if measurement.split is None:
+        return None
+    pending = measurement.pending()
+    try:
+        with span("measure"):
+            if pending and pool is not None:
+                with track_pool_job():
+                    heights = list(pool.map(partial(measure_document, template), pending))
+            else:
+                heights = [measure_document(template, document) for document in pending]
+    except Exception as e:
+        logger.error(f"Section measurement failed for {template}: {str(e)}")
+        return None
+
+    logger.info(f"[📏] {template}: {len(measurement.added)} sections, {len(pending)} documents laid out")
+    return measurement.complete(heights)
+
+async def measured_height_async(template, html_content):
+    """measured_height for the event loop: pending documents are awaited on the render pool"""
+    from utils.render_pool import get_render_pool
+
+    measurement = Measurement(template, html_content)
+    if measurement.split is None:
+        return None
+    loop = asyncio.get_running_loop()
+    try:
+        with span("measure"), track_pool_job():
+            heights = await asyncio.gather(*(
+                loop.run_in_executor(get_render_pool(), measure_document, template, document)
+                for document in measurement.pending()
+            ))
+    except Exception as e:
+        logger.error(f"Section measurement failed for {template}: {str(e)}")
+        return None
+    return measurement.complete(heights)
@@ -0,0 +1,94 @@
+import hashlib
+import importlib
+import inspect
+from functools import lru_cache
+from importlib import metadata
+from utils.metrics import set_gauge
+
+# template name -> (controller module, CSS builder)
+templates = {
+    "andromeda": ("api.controller.galaxy.andromeda", "get_default_css"),
+    "cigar": ("api.controller.galaxy.cigar", "get_classic_css"),
+    "comet": ("api.controller.galaxy.comet", "get_minimal_css"),
+    "milky_way": ("api.controller.galaxy.milky_way", "get_creative_css"),
+    "zeus": ("api.controller.greek.zeus", "get_zeus_css"),
+    "athena": ("api.controller.greek.athena", "get_athena_css"),
+    "apollo": ("api.controller.greek.apollo", "get_apollo_css"),
+    "artemis": ("api.controller.greek.artemis", "get_artemis_css"),
+}
+
+def template_names():
+    return list(templates)
+
+def load_template(name):
+    """Import and return the controller module for a template"""
+    if name not in templates:
+        raise KeyError(f"Unknown template: {name}")
+    module_path, _ = templates[name]
+    return importlib.import_module(module_path)
+
+def get_css_builder(name):
+    """Return the template's CSS builder, called as css_builder(dynamic_height=...)"""
+    module = load_template(name)
+    _, css_builder = templates[name]
+    return getattr(module, css_builder)
+
+@lru_cache(maxsize=None)
+def template_version(name):
+    """
+    Short hash of everything a template's output depends on: its HTML and CSS builder source
+    (with the render_* section builders the HTML builder calls), the height search and its per-template parameters (fit_params, buff_calc, max_attempts), the shared
+    formatters and page break rules, the height estimator profile when it seeds the height search,
+    and the WeasyPrint version. Editing one template's CSS changes that template's version
+    only, so only its cache entries go stale.
+    """
+    from utils import helper, pagination, text_metrics
+
+    module = load_template(name)
+    version = hashlib.blake2b(digest_size=6)
+    for source in (
+        inspect.getsource(module.generate_resume_html),
+        *_section_sources(module),
+        inspect.getsource(get_css_builder(name)),
+        *_fit_sources(module),
+        inspect.getsource(helper.fit_height),
+        inspect.getsource(helper.loop_process),
+        inspect.getsource(helper.search_height),
+        str(helper.min_increment),
+        inspect.getsource(helper.predict_height),
+        inspect.getsource(helper.increment_calc),
+        inspect.getsource(helper.format_date),
+        inspect.getsource(helper.format_description),
+        pagination.break_rules,
+        text_metrics.version_source(name),
+        _weasyprint_version(),
+    ):
+        version.update(source.encode() + b"\0")
+
+    version = version.hexdigest()
+    set_gauge("resumeforge_template_info", 1, template=name, version=version)
+    return version
+
+def _section_sources(module):
+    """Sources of the template's render_* section builders, in definition order"""
+    return [
+        inspect.getsource(function) for name, function in vars(module).items()
+        if name.startswith("render_") and inspect.isfunction(function)
+    ]
+
+def _fit_sources(module):
+    """Sources that set a fitted template's page height; comet has a fixed page and none"""
+    if not hasattr(module, "fit_params"):
+        return ()
+    sources = [inspect.getsource(module.fit_params), str(module.max_attempts)]
+    buff_calc = getattr(module, "buff_calc", None)
+    if buff_calc is not None:
+        # the whole utils/<template>_helper.py, since buff_calc may lean on its neighbours
+        sources.append(inspect.getsource(inspect.getmodule(buff_calc)))
+    return sources
+
+def _weasyprint_version():
+    try:
+        return metadata.version("weasyprint")
+    except metadata.PackageNotFoundError:
+        return "unknown"
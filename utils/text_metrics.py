@@ -0,0 +1,205 @@
+import logging
+import math
+import os
+import subprocess
+from functools import lru_cache
+from html.parser import HTMLParser
+from utils.timing import span
+
+logger = logging.getLogger(__name__)
+
+# Opt-in: HEIGHT_ESTIMATOR=metrics seeds the single-page height search and sizes previews from a text
+# metrics estimate instead of the template buffer. The estimate wraps every text block against its
+# column width using the template font's advance widths, so it needs no WeasyPrint layout.
+# benchmarks/bench_estimator.py reports its error against real layout and suggests profile values.
+height_estimator = os.getenv("HEIGHT_ESTIMATOR", "buffer")
+estimate_margin = float(os.getenv("HEIGHT_ESTIMATE_MARGIN", "0.05"))  # seed this far below the estimate
+font_dirs = [d for d in os.getenv("TEXT_METRICS_FONT_DIRS", "").split(os.pathsep) if d]
+
+px_to_pt = 0.75
+min_height = 1009  # pt; the height search never returns a page shorter than this
+fallback_advance = 0.5  # em, when no font file is found for the family
+
+# Per template: body font family, size (px) and line height, the width (px) of each text column,
+# keyed by the class that wraps it, the fixed height (px) of everything outside the columns (header,
+# paddings), the vertical gap (px) added per text block, and a scale on the tallest column.
+# Templates missing here (comet: fixed Legal page) keep the buffer heuristic.
+profiles = {
+    "andromeda": {"font": "IBM Plex Serif", "font_size": 16, "line_height": 1.5,
+                  "columns": {"left-column": 420, "right-column": 300}, "fixed": 230, "block_gap": 8, "scale": 1.0},
+    "cigar": {"font": "Georgia", "font_size": 15.5, "line_height": 1.5,
+              "columns": {"classic-main": 752}, "fixed": 180, "block_gap": 6, "scale": 1.0},
+    "milky_way": {"font": "Lato", "font_size": 16, "line_height": 1.5,
+                  "columns": {"mw-main": 752}, "fixed": 210, "block_gap": 6, "scale": 1.0},
+    "zeus": {"font": "DM Serif Text", "font_size": 16, "line_height": 1.6,
+             "columns": {"greek-main": 704}, "fixed": 270, "block_gap": 10, "scale": 1.0},
+    "athena": {"font": "Lexend Deca", "font_size": 16, "line_height": 1.6,
+               "columns": {"resume-sidebar": 288, "resume-main-content": 432}, "fixed": 80, "block_gap": 8, "scale": 1.0},
+    "apollo": {"font": "Fugaz One", "font_size": 14, "line_height": 1.4,
+               "columns": {"resume-sidebar": 242, "resume-main-content": 486}, "fixed": 60, "block_gap": 6, "scale": 1.0},
+    "artemis": {"font": "Playfair Display", "font_size": 12, "line_height": 1.4,
+                "columns": {"resume-left-section": 490, "resume-sidebar": 245}, "fixed": 70, "block_gap": 6, "scale": 1.0},
+}
+
+block_tags = {"div", "p", "li", "ul", "ol", "section", "header", "footer", "article", "aside", "table", "tr", "td",
+              "h1", "h2", "h3", "h4", "h5", "h6"}
+void_tags = {"br", "img", "hr", "meta", "link", "input"}
+skip_tags = {"head", "style", "script", "title"}
+heading_scale = {"h1": 2.0, "h2": 1.4, "h3": 1.15, "h4": 1.0, "h5": 0.85, "h6": 0.75}
+
+def estimator_enabled(template):
+    return height_estimator == "metrics" and template in profiles
+
+def version_source(template):
+    """Part of template_version: with the estimator on, its profile changes the fitted heights"""
+    return repr(profiles[template]) if estimator_enabled(template) else ""
+
+@lru_cache(maxsize=None)
+def font_file(family):
+    """
+    Regular face of the family: the first match in TEXT_METRICS_FONT_DIRS, else whatever fontconfig
+    resolves the family to (the same substitution Pango makes when the web font isn't installed).
+    """
+    compact = family.replace(" ", "").lower()
+    candidates = []
+    for directory in font_dirs:
+        for root, _, files in os.walk(directory):
+            for name in files:
+                plain = name.replace(" ", "").replace("-", "").replace("_", "").lower()
+                if plain.startswith(compact) and plain.endswith((".ttf", ".otf")):
+                    candidates.append(os.path.join(root, name))
+    if candidates:
+        # prefer the Regular face, then the shortest (least decorated) name
+        return min(candidates, key=lambda path: ("regular" not in path.lower(), len(path), path))
+
+    try:
+        result = subprocess.run(["fc-match", "--format=%{file}", f"{family}:style=Regular"],
+                                capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+@lru_cache(maxsize=None)
+def advance_widths(family):
+    """({codepoint: advance in em}, default advance) for the family's regular face"""
+    path = font_file(family)
+    if not path:
+        logger.warning(f"[⚠️] No font file for {family}; estimating with a {fallback_advance}em average advance")
+        return {}, fallback_advance
+
+    from fontTools.ttLib import TTFont
+
+    try:
+        with TTFont(path, lazy=True) as font:
+            units = font["head"].unitsPerEm
+            metrics = font["hmtx"].metrics
+            widths = {codepoint: metrics[glyph][0] / units for codepoint, glyph in font.getBestCmap().items()}
+    except Exception as e:
+        logger.warning(f"[⚠️] Could not read font metrics from {path}: {str(e)}")
+        return {}, fallback_advance
+
+    lowercase = [widths[ord(c)] for c in "abcdefghijklmnopqrstuvwxyz" if ord(c) in widths]
+    return widths, sum(lowercase) / len(lowercase) if lowercase else fallback_advance
+
+class TextBlocks(HTMLParser):
+    """Collects (column, font scale, text) for every block of text inside one of the profile's columns"""
+
+    def __init__(self, columns):
+        super().__init__(convert_charrefs=True)
+        self.columns = columns
+        self.stack = [("", None, 1.0)]  # (tag, column, font scale)
+        self.skipping = 0
+        self.text = []
+        self.blocks = []
+
+    def flush(self):
+        text = " ".join("".join(self.text).split())
+        self.text = []
+        _, column, scale = self.stack[-1]
+        if text and column:
+            self.blocks.append((column, scale, text))
+
+    def handle_starttag(self, tag, attrs):
+        if tag in skip_tags:
+            self.skipping += 1
+            return
+        if tag == "br":
+            self.flush()
+        if tag in void_tags:
+            return
+
+        _, column, scale = self.stack[-1]
+        classes = (dict(attrs).get("class") or "").split()
+        column = next((c for c in classes if c in self.columns), column)
+        if tag in block_tags:
+            self.flush()
+            scale = heading_scale.get(tag, scale)
+        self.stack.append((tag, column, scale))
+
+    def handle_endtag(self, tag):
+        if tag in skip_tags:
+            self.skipping = max(0, self.skipping - 1)
+            return
+        if not any(entry[0] == tag for entry in self.stack[1:]):
+            return  # stray end tag
+        if tag in block_tags:
+            self.flush()
+        while self.stack[-1][0] != tag:
+            self.stack.pop()
+        self.stack.pop()
+
+    def handle_data(self, data):
+        if not self.skipping:
+            self.text.append(data)
+
+def wrapped_lines(text, width_px, font_px, widths, default):
+    """Lines the text takes when greedily wrapped at word boundaries into width_px"""
+    space = widths.get(32, default) * font_px
+    lines, line = 1, 0.0
+    for word in text.split(" "):
+        word_px = sum(widths.get(ord(c), default) for c in word) * font_px
+        if line and line + space + word_px > width_px:
+            lines += 1
+            line = word_px
+        else:
+            line += (space if line else 0) + word_px
+        if line > width_px:  # a word longer than the column breaks across lines
+            extra = math.floor(line / width_px)
+            lines += extra
+            line -= extra * width_px
+    return lines
+
+def column_heights(html_content, template):
+    """{column class: estimated text height in px} for a template with a profile"""
+    profile = profiles[template]
+    widths, default = advance_widths(profile["font"])
+    parser = TextBlocks(profile["columns"])
+    parser.feed(html_content)
+    parser.close()
+    parser.flush()
+
+    heights = dict.fromkeys(profile["columns"], 0.0)
+    for column, scale, text in parser.blocks:
+        font_px = profile["font_size"] * scale
+        lines = wrapped_lines(text, profile["columns"][column], font_px, widths, default)
+        heights[column] += lines * font_px * profile["line_height"] + profile["block_gap"]
+    return heights
+
+def estimate_height(html_content, template):
+    """Estimated single-page height in pt, or None for templates without a profile"""
+    if template not in profiles:
+        return None
+    profile = profiles[template]
+    with span("estimate"):
+        heights = column_heights(html_content, template)
+        return (profile["fixed"] + profile["scale"] * max(heights.values(), default=0)) * px_to_pt
+
+def seed_height(html_content, template):
+    """
+    Height search seed from the estimate, or None when the estimator is off for this template. Seeded
+    slightly low, since the search only grows the page; never below min_height, which fit_height keeps
+    as is when the content already fits there.
+    """
+    if not estimator_enabled(template):
+        return None
+    return max(estimate_height(html_content, template) * (1 - estimate_margin), min_height)
@@ -0,0 +1,98 @@
+import base64
+import logging
+import os
+from io import BytesIO
+from flask import current_app, jsonify, request, send_file
+from utils.fingerprint import Fingerprint
+from utils.helper import parse_html
+from utils.metrics import record_cache
+
+# thumbnails live in their own keyspace, apart from the PDF cache keys
+thumbnail_cache_prefix = "thumbnail_"
+thumbnail_ttl = int(os.getenv("THUMBNAIL_CACHE_TTL", 60 * 60 * 24 * 7))  # 7 days
+
+default_width = 320
+min_width = 64
+max_width = 1200
+# a fitted render is one page as tall as the resume; the thumbnail keeps the top, cut to Letter proportions
+thumbnail_aspect = 792 / 612
+
+image_formats = {
+    'webp': ('WEBP', 'image/webp'),
+    'png': ('PNG', 'image/png'),
+}
+
+def thumbnail_options(args):
+    """Read and validate the width and image format from the query string"""
+    try:
+        width = int(args.get('width', default_width))
+    except ValueError:
+        raise ValueError("width must be an integer")
+    if width < min_width or width > max_width:
+        raise ValueError(f"width must be between {min_width} and {max_width}")
+
+    image_format = args.get('format', 'webp').lower()
+    if image_format not in image_formats:
+        raise ValueError(f"format must be one of: {', '.join(image_formats)}")
+
+    return width, image_format
+
+def rasterize_first_page(html_content, css_str, width, image_format):
+    """Render the resume to PDF and rasterize the first page at the requested pixel width"""
+    from weasyprint import CSS
+
+    pdf_bytes = parse_html(html_content).write_pdf(stylesheets=[CSS(string=css_str)])
+    return rasterize_pdf(pdf_bytes, width, image_format)
+
+def rasterize_pdf(pdf_bytes, width, image_format):
+    """
+    Encode the top of the PDF's first page at the requested pixel width, cropped to at most
+    thumbnail_aspect times the width, so a long fitted page stays within WebP's size limit.
+    """
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(pdf_bytes)
+    try:
+        page = pdf[0]
+        page_width, page_height = page.get_size()
+        # crop is (left, bottom, right, top) in pt, trimmed from the page's edges
+        crop = (0, max(0, page_height - page_width * thumbnail_aspect), 0, 0)
+        image = page.render(scale=width / page_width, crop=crop).to_pil()
+    finally:
+        pdf.close()
+
+    pil_format, _ = image_formats[image_format]
+    image_buffer = BytesIO()
+    if pil_format == 'WEBP':
+        image.save(image_buffer, format=pil_format, quality=80, method=6)
+    else:
+        image.quantize(colors=256).save(image_buffer, format=pil_format, optimize=True)
+    return image_buffer.getvalue()
+
+def thumbnail_response(data, template_name, build_fitted_resume):
+    """
+    Serve a thumbnail from the thumbnail cache tier, rendering it on a miss.
+    build_fitted_resume is only called on a miss and must return (html_content, css).
+    """
+    try:
+        width, image_format = thumbnail_options(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # same resume, template, width, format and crop -> same entry
+    digest = Fingerprint(data, template_name).derive(width, image_format, thumbnail_aspect)
+    cache_key = f"{thumbnail_cache_prefix}{digest}"
+    redis_client = current_app.redis_client
+
+    cached_image = redis_client.getex(cache_key, ex=thumbnail_ttl)
+    record_cache("thumbnail", template_name, hit=bool(cached_image))
+    if cached_image:
+        logging.info(f"[🖼] Thumbnail cache hit: {template_name} {width}px {image_format}")
+        image_bytes = base64.b64decode(cached_image)
+    else:
+        html_content, final_css = build_fitted_resume(data)
+        image_bytes = rasterize_first_page(html_content, final_css, width, image_format)
+        redis_client.set(cache_key, base64.b64encode(image_bytes).decode(), ex=thumbnail_ttl)
+
+    _, mimetype = image_formats[image_format]
+    return send_file(BytesIO(image_bytes), mimetype=mimetype, etag=digest, max_age=thumbnail_ttl)
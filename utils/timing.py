@@ -0,0 +1,96 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import g, has_request_context
+
+logger = logging.getLogger(__name__)
+
+# Outside a Flask request (asgi.py, render pool workers) timings live in a context variable
+# instead of flask.g: every asyncio task has its own, and a pool worker starts one per job
+_timings = ContextVar("timings", default=None)
+
+def start_timing(template):
+    """Begin collecting stage timings for the current request and return them"""
+    timings = {
+        "template": template,
+        "spans": {},
+        "renders": 0,
+        "started": time.perf_counter()
+    }
+    if has_request_context():
+        g.timings = timings
+    else:
+        _timings.set(timings)
+    return timings
+
+def current_timings():
+    if not has_request_context():
+        return _timings.get()
+    return g.get('timings')
+
+@contextmanager
+def span(name):
+    """Time a pipeline stage. Repeated stages (e.g. several renders) add up under one name."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, (time.perf_counter() - start) * 1000)
+
+def record_span(name, duration_ms):
+    timings = current_timings()
+    if timings is None:
+        return
+    timings["spans"][name] = timings["spans"].get(name, 0) + duration_ms
+
+def count_render():
+    """Count one WeasyPrint layout pass for the current request"""
+    timings = current_timings()
+    if timings is not None:
+        timings["renders"] += 1
+
+def merge_timings(timings):
+    """Add the spans and layout passes of work timed elsewhere (a render pool job) to the current request"""
+    current = current_timings()
+    if current is None:
+        return
+    for name, duration_ms in timings["spans"].items():
+        record_span(name, duration_ms)
+    current["renders"] += timings["renders"]
+
+def server_timing_header(timings):
+    """Format collected spans as a Server-Timing header value"""
+    entries = []
+    for name, duration_ms in timings["spans"].items():
+        if name == "render":
+            entries.append(f'render;dur={duration_ms:.1f};desc="{timings["renders"]} pass(es)"')
+        else:
+            entries.append(f"{name};dur={duration_ms:.1f}")
+    total_ms = (time.perf_counter() - timings["started"]) * 1000
+    entries.append(f"total;dur={total_ms:.1f}")
+    return ", ".join(entries)
+
+def init_timing(app):
+    """Attach the Server-Timing header and a structured timing log line to every timed response"""
+    @app.after_request
+    def emit_timings(response):
+        timings = current_timings()
+        if timings is None:
+            return response
+
+        response.headers["Server-Timing"] = server_timing_header(timings)
+        log_timings(timings, response.status_code)
+        return response
+
+def log_timings(timings, status):
+    """One structured log line per timed request"""
+    fields = {
+        "template": timings["template"],
+        "status": status,
+        "renders": timings["renders"],
+        "total_ms": round((time.perf_counter() - timings["started"]) * 1000, 1),
+        **{f"{name}_ms": round(duration_ms, 1) for name, duration_ms in timings["spans"].items()}
+    }
+    logger.info(f"[⏱] {json.dumps(fields)}", extra={"timings": fields})
@@ -0,0 +1,86 @@
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Opt-in: WARMUP_ON_START=1 renders a tiny resume through every template at startup so the
+# first real request doesn't pay for font loading, Pango/HarfBuzz setup and stylesheet parsing.
+warmup_enabled = os.getenv("WARMUP_ON_START", "0") == "1"
+warmup_mode = os.getenv("WARMUP_MODE", "background")  # background | blocking
+
+warmup_resume = {
+    "personal": {
+        "name": "Warm Up",
+        "headline": "Engineer",
+        "email": "warmup@example.com",
+        "location": "Manila, PH",
+        "website": {"name": "example.dev", "link": "https://example.dev"},
+    },
+    "summary": "Short summary used to prime fonts and stylesheets.",
+    "experience": [
+        {"title": "Engineer", "company": "Example", "startDate": "2020-01", "endDate": "", "description": "<ul><li>Built things.</li></ul>"}
+    ],
+    "projects": [{"title": "Project", "technologies": ["Python"], "description": "Plain text\ndescription."}],
+    "education": [{"degree": "BSc", "institution": "University", "startDate": "2014-06", "endDate": "2018-04"}],
+    "skills": [{"name": "Core", "keywords": ["Python", "SQL"]}],
+    "certifications": [{"name": "Certification", "issuingOrganization": "Vendor", "date": "2022-05"}],
+    "references": [{"name": "Reference", "company": "Example", "email": "ref@example.com", "phone": ""}],
+    "awards": [{"title": "Award", "date": "2021-03", "summary": "Award summary."}],
+    "languages": ["English"],
+    "socials": [{"slug": "github", "name": "GitHub", "link": "https://github.com/example"}],
+    "interests": ["Chess"],
+}
+
+def warm_template(name):
+    """One dummy layout and PDF write for a template; no cache or storage calls"""
+    from weasyprint import HTML, CSS
+    from utils.templates import get_css_builder, load_template
+
+    module = load_template(name)
+    html_content = module.generate_resume_html(warmup_resume)
+    css = get_css_builder(name)(dynamic_height=1009)
+    HTML(string=html_content).render(stylesheets=[CSS(string=css)]).write_pdf()
+
+def run_warmup(app):
+    from utils.templates import template_names
+
+    state = app.warmup_state
+    state.update(status="running", pid=os.getpid(), started=time.time(), templates={}, errors={})
+    for name in template_names():
+        start = time.perf_counter()
+        try:
+            warm_template(name)
+            state["templates"][name] = round((time.perf_counter() - start) * 1000, 1)
+        except Exception as e:
+            # a template that fails to warm will still render on demand; don't hold readiness hostage
+            logger.error(f"Warmup failed for {name}: {str(e)}")
+            state["errors"][name] = str(e)
+    state["status"] = "done"
+    logger.info(f"[🔥] Warmup finished in {time.time() - state['started']:.1f}s: {state['templates']}")
+
+def start_warmup(app, blocking=None):
+    """Warm every template in this process, in the background unless blocking"""
+    blocking = warmup_mode == "blocking" if blocking is None else blocking
+    app.warmup_state["status"] = "pending"
+    if blocking:
+        run_warmup(app)
+    else:
+        threading.Thread(target=run_warmup, args=(app,), name="template-warmup", daemon=True).start()
+
+def ensure_warm(app):
+    """For forked workers (gunicorn preload): re-run warmup unless it already completed before the fork"""
+    state = app.warmup_state
+    if state["status"] == "disabled" or state["status"] == "done":
+        return
+    if state.get("pid") != os.getpid():
+        start_warmup(app)
+
+def init_warmup(app):
+    app.warmup_state = {"status": "disabled"}
+    if warmup_enabled:
+        start_warmup(app)
+
+def is_ready(app):
+    return app.warmup_state["status"] in ("disabled", "done")